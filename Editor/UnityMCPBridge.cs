@@ -33,6 +33,7 @@ public static partial class UnityMCPBridge
     private static readonly int unityPort = 6400;       // Unity服务器端口
     private static readonly int mcpPort = 6500;         // MCP服务器端口
     private static bool lastConnectionState = false;     // 上次连接状态（用于只记录状态变化）
+    private static readonly string chatSessionId = Guid.NewGuid().ToString(); // Chat session the MCP server continues across messages
     
     // 模拟响应存储
     private static Dictionary<string, string> simulatedResponses = new Dictionary<string, string>();
@@ -443,6 +444,13 @@ public static partial class UnityMCPBridge
         
         try
         {
+            // Every message goes over a new connection, so chat requests name their session
+            // for the MCP server to continue the model's context from the previous message
+            if (commandType == "process_user_request" && parameters != null && parameters["session_id"] == null)
+            {
+                parameters["session_id"] = chatSessionId;
+            }
+            
             var command = new
             {
                 type = commandType,
@@ -0,0 +1,402 @@
+"""
+Client-side catalog of the project's assets.
+
+Tools that need to know whether an asset exists (a scene before opening it, a
+prefab before instantiating it, an import target before overwriting it) used
+to send a ``GET_ASSET_LIST`` query and scan the reply for the exact path. The
+catalog loads the full asset list once, keys it by path with a secondary
+index by name, and keeps itself current from the commands the
+server sends that create assets (imports, new scenes, prefabs, scripts).
+Assets added or removed outside the server are picked up when the catalog
+expires after ``config.asset_catalog_ttl`` seconds, or on an explicit refresh.
+
+When ``config.project_path`` is set, the on-disk project index loads the
+catalog from the Assets folder instead and pins it: it then never expires,
+is kept current by file-system change detection, and can also serve
+listings. Assets found on disk only carry the type their extension implies,
+so listings filtered by a type the extensions cannot tell apart (e.g.
+``ScriptableObject``) still go to Unity.
+"""
+
+import fnmatch
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, FrozenSet, List, Optional
+from config import config
+from unity_connection import add_command_observer
+from unity_protocol import is_unsupported_error
+
+logger = logging.getLogger("UnityMCP.AssetCatalog")
+
+# Main asset type by file extension, named as AssetDatabase reports it, for
+# assets found on disk and bridges that do not report a type. Extensions whose
+# type depends on the contents (.asset) or import settings (.exr) are left out.
+EXTENSION_TYPES = {
+    ".unity": "SceneAsset", ".prefab": "GameObject", ".mat": "Material", ".cs": "MonoScript",
+    ".shader": "Shader", ".compute": "ComputeShader", ".anim": "AnimationClip",
+    ".controller": "AnimatorController", ".overridecontroller": "AnimatorOverrideController",
+    ".mask": "AvatarMask", ".physicmaterial": "PhysicMaterial",
+    ".rendertexture": "RenderTexture", ".cubemap": "Cubemap",
+    ".png": "Texture2D", ".jpg": "Texture2D", ".jpeg": "Texture2D", ".tga": "Texture2D", ".psd": "Texture2D",
+    ".tif": "Texture2D", ".tiff": "Texture2D", ".bmp": "Texture2D", ".gif": "Texture2D",
+    ".fbx": "GameObject", ".obj": "GameObject", ".blend": "GameObject", ".dae": "GameObject",
+    ".wav": "AudioClip", ".mp3": "AudioClip", ".ogg": "AudioClip", ".aif": "AudioClip", ".aiff": "AudioClip",
+    ".mp4": "VideoClip", ".mov": "VideoClip", ".webm": "VideoClip", ".ttf": "Font", ".otf": "Font",
+    ".txt": "TextAsset", ".json": "TextAsset", ".xml": "TextAsset", ".csv": "TextAsset", ".bytes": "TextAsset",
+    ".html": "TextAsset", ".htm": "TextAsset", ".yaml": "TextAsset"
+}
+
+def _extensions_of(*asset_types: str) -> FrozenSet[str]:
+    return frozenset(extension for extension, asset_type in EXTENSION_TYPES.items() if asset_type in asset_types)
+
+# GET_ASSET_LIST type filters that file extensions answer, by lowercased
+# filter: the extensions of the assets each one selects
+TYPE_FILTER_EXTENSIONS: Dict[str, FrozenSet[str]] = {
+    **{asset_type.lower(): _extensions_of(asset_type) for asset_type in set(EXTENSION_TYPES.values())},
+    # Base types also select their subtypes, as AssetDatabase searches do
+    "texture": _extensions_of("Texture2D", "Cubemap", "RenderTexture"),
+    "textasset": _extensions_of("TextAsset", "MonoScript"),
+    # AssetDatabase search aliases
+    "scene": frozenset({".unity"}),
+    "prefab": frozenset({".prefab"}),
+    "script": frozenset({".cs"}),
+    "model": frozenset({".fbx", ".obj", ".blend", ".dae"})
+}
+
+# Query that lists every asset in the project
+FULL_LISTING = {"type": None, "search_pattern": "*", "folder": "Assets"}
+
+def make_asset(path: str, asset_type: Optional[str] = None, name: Optional[str] = None) -> Dict[str, Any]:
+    """Build a catalog entry in the shape GET_ASSET_LIST returns."""
+    base, extension = os.path.splitext(path.rsplit("/", 1)[-1])
+    return {
+        "name": name or base,
+        "path": path,
+        "type": asset_type or EXTENSION_TYPES.get(extension.lower())
+    }
+
+def _type_key(asset_type: Optional[str]) -> Optional[str]:
+    return asset_type.lower() if asset_type else None
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path.rsplit("/", 1)[-1])[1].lower()
+
+def _type_matches(asset: Dict[str, Any], asset_type: str) -> Optional[bool]:
+    """Whether an asset passes a GET_ASSET_LIST type filter, or None if that cannot be told."""
+    extensions = TYPE_FILTER_EXTENSIONS.get(_type_key(asset_type))
+    if extensions is not None and _extension(asset["path"]) in EXTENSION_TYPES:
+        return _extension(asset["path"]) in extensions
+    known_type = _type_key(asset.get("type"))
+    if known_type == _type_key(asset_type):
+        return True
+    return None if known_type is None or extensions is None else False
+
+def _in_folder(path: str, folder: Optional[str]) -> bool:
+    if not folder:
+        return True
+    folder = folder.rstrip("/")
+    return path == folder or path.startswith(folder + "/")
+
+class AssetCatalog:
+    """Path-keyed copy of the project's asset list with a name index."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_path: Dict[str, Dict[str, Any]] = {}
+        self._by_name: Dict[str, Dict[str, None]] = {}
+        self._loaded_at: Optional[float] = None
+        self._load_failed = False  # The bridge cannot list assets; cleared by invalidate
+        self._retry_at = 0.0  # Monotonic time before which a failed load is not retried
+        self.pinned = False  # Loaded and kept current by the on-disk project index
+        self.stats = {"loads": 0, "lookups": 0, "applied": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the catalog holds an asset list young enough to answer from."""
+        if self._loaded_at is None:
+            return False
+        if self.pinned:
+            return True
+        ttl = config.asset_catalog_ttl
+        return ttl <= 0 or time.monotonic() - self._loaded_at < ttl
+
+    # Loading
+
+    def ensure_fresh(self, unity) -> bool:
+        """Load the full asset list if the catalog is empty or expired.
+
+        A bridge that does not support GET_ASSET_LIST is not asked again until
+        the catalog is invalidated; any other failure is retried once
+        ``config.asset_catalog_retry_backoff`` seconds have passed.
+
+        Returns:
+            True if the catalog can answer lookups
+        """
+        if self.fresh:
+            return True
+        if self._load_failed or time.monotonic() < self._retry_at:
+            return False
+        return self.refresh(unity)
+
+    def refresh(self, unity) -> bool:
+        """Reload the full asset list from Unity now (a pinned catalog is already current)."""
+        if self.pinned:
+            return True
+        try:
+            # Loaded by the command observer like any other full listing
+            unity.send_command("GET_ASSET_LIST", dict(FULL_LISTING))
+        except Exception as e:
+            if is_unsupported_error(e):
+                logger.warning(f"Bridge cannot load the asset catalog: {str(e)}")
+                self._load_failed = True
+            else:
+                logger.warning(f"Could not load the asset catalog, retrying later: {str(e)}")
+                self._retry_at = time.monotonic() + config.asset_catalog_retry_backoff
+            return False
+        return self.fresh
+
+    def invalidate(self):
+        """Forget the catalog; the next lookup reloads it."""
+        if self.pinned:
+            # The project index will see whatever changed on disk
+            return
+        with self._lock:
+            self._clear()
+            self._load_failed = False
+            self.stats["invalidations"] += 1
+
+    def _clear(self):
+        self._by_path.clear()
+        self._by_name.clear()
+        self._loaded_at = None
+
+    def load(self, assets: List[Any], pinned: bool = False):
+        """Replace the catalog with a full asset listing.
+
+        Args:
+            assets: Asset dicts (or bare paths) covering the whole project
+            pinned: Whether the caller keeps the catalog current from now on,
+                so it must not expire or be reloaded from Unity
+        """
+        with self._lock:
+            self._clear()
+            for asset in assets:
+                self._add_raw(asset)
+            self._loaded_at = time.monotonic()
+            self._load_failed = False
+            self._retry_at = 0.0
+            self.pinned = pinned
+            self.stats["loads"] += 1
+        logger.info(f"Asset catalog loaded with {len(self._by_path)} assets")
+
+    def _add_raw(self, asset: Any):
+        if isinstance(asset, str):
+            self.add(make_asset(asset))
+        elif isinstance(asset, dict) and asset.get("path"):
+            self.add({**make_asset(asset["path"], asset.get("type"), asset.get("name")), **asset})
+
+    def add(self, asset: Dict[str, Any]):
+        """Add or replace one entry (built with make_asset)."""
+        with self._lock:
+            path = asset["path"]
+            if path in self._by_path:
+                self.remove(path)
+            self._by_path[path] = asset
+            self._by_name.setdefault(asset.get("name") or "", {})[path] = None
+
+    def remove(self, path: str):
+        with self._lock:
+            asset = self._by_path.pop(path, None)
+            if asset is None:
+                return
+            paths = self._by_name.get(asset.get("name") or "")
+            if paths is not None:
+                paths.pop(path, None)
+                if not paths:
+                    del self._by_name[asset.get("name") or ""]
+
+    # Observer
+
+    def observe(self, command_type: str, params: Dict[str, Any], result: Any):
+        """Keep the catalog in step with a command Unity executed successfully."""
+        result = result if isinstance(result, dict) else {}
+        if command_type == "GET_ASSET_LIST":
+            assets = result.get("assets")
+            if not isinstance(assets, list):
+                if self._is_full_listing(params):
+                    # Not a real listing (e.g. a "not implemented" reply); keep asking Unity per check
+                    logger.warning("Unrecognised GET_ASSET_LIST result; answering asset checks from Unity instead")
+                    self._load_failed = True
+                return
+            if self._is_full_listing(params) and not self.pinned:
+                self.load(assets)
+            elif self._loaded_at is not None:
+                # Anything a narrower query returned exists, whatever the catalog thought
+                with self._lock:
+                    for asset in assets:
+                        self._add_raw(asset)
+            return
+
+        if self._loaded_at is None or result.get("success", True) is False:
+            return
+        created = self._created_asset(command_type, params, result)
+        if created is None:
+            return
+        if created is False:
+            logger.debug(f"Asset catalog invalidated by {command_type}")
+            self.invalidate()
+            return
+        self.add(created)
+        self.stats["applied"] += 1
+
+    @staticmethod
+    def _is_full_listing(params: Dict[str, Any]) -> bool:
+        return (not params.get("type") and params.get("search_pattern") in (None, "", "*")
+                and (params.get("folder") or "Assets").rstrip("/") == "Assets")
+
+    def _created_asset(self, command_type: str, params: Dict[str, Any], result: Dict[str, Any]):
+        """The asset a command created, None if it creates none, or False if it cannot be told."""
+        if command_type == "IMPORT_ASSET":
+            return make_asset(result.get("path") or params["target_path"]) if params.get("target_path") else False
+        if command_type == "NEW_SCENE":
+            return make_asset(params["scene_path"]) if params.get("scene_path") else False
+        if command_type == "CREATE_PREFAB":
+            path = result.get("path") or params.get("prefab_path")
+            return make_asset(path) if path else False
+        if command_type == "CREATE_SCRIPT":
+            path = result.get("path") or result.get("script_path")
+            if not path and params.get("script_name"):
+                folder = (params.get("script_folder") or "Scripts").rstrip("/")
+                if not folder.startswith("Assets"):
+                    folder = f"Assets/{folder}"
+                path = f"{folder}/{params['script_name']}.cs"
+            return make_asset(path) if path else False
+        if command_type == "UPDATE_SCRIPT":
+            return make_asset(params["script_path"]) if params.get("create_if_missing") else None
+        if command_type == "SET_MATERIAL":
+            # A missing material is created, at a path the bridge does not report
+            name = params.get("material_name")
+            return False if name and not self.find_by_name(name, "Material") else None
+        if command_type == "EDITOR_CONTROL" and (params.get("command") or "").upper() == "EXECUTE_COMMAND":
+            return False
+        return None
+
+    # Queries
+
+    def exists(self, path: str, asset_type: Optional[str] = None) -> bool:
+        """Whether an asset is at ``path`` (passing the ``asset_type`` filter, when that can be told)."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            asset = self._by_path.get(path)
+            if asset is None:
+                return False
+            return asset_type is None or _type_matches(asset, asset_type) is not False
+
+    def find_by_name(self, name: str, asset_type: Optional[str] = None, folder: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Assets called exactly ``name``, optionally filtered by type and folder."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            assets = (self._by_path[path] for path in self._by_name.get(name, ()))
+            return [asset for asset in assets
+                    if (asset_type is None or _type_matches(asset, asset_type) is not False)
+                    and _in_folder(asset["path"], folder)]
+
+    @staticmethod
+    def can_list(asset_type: Optional[str]) -> bool:
+        """Whether list_assets answers this type filter exactly (see TYPE_FILTER_EXTENSIONS)."""
+        return not asset_type or _type_key(asset_type) in TYPE_FILTER_EXTENSIONS
+
+    def list_assets(self, asset_type: Optional[str] = None, search_pattern: str = "*",
+                    folder: Optional[str] = "Assets") -> List[Dict[str, Any]]:
+        """Assets under ``folder`` whose name matches ``search_pattern``, like GET_ASSET_LIST.
+
+        Patterns containing ``*``, ``?`` or ``[`` are globs over the file name;
+        anything else matches as a substring of the asset name. Both ignore case.
+        Check can_list first: a type filter it refuses matches nothing here.
+        """
+        with self._lock:
+            self.stats["lookups"] += 1
+            extensions = TYPE_FILTER_EXTENSIONS.get(_type_key(asset_type), frozenset()) if asset_type else None
+            paths = (path for path in self._by_path if extensions is None or _extension(path) in extensions)
+            pattern = (search_pattern or "*").lower()
+            if any(special in pattern for special in "*?["):
+                matches = lambda asset: fnmatch.fnmatchcase(asset["path"].rsplit("/", 1)[-1].lower(), pattern)
+            else:
+                matches = lambda asset: pattern in (asset.get("name") or "").lower()
+            assets = (self._by_path[path] for path in paths if _in_folder(path, folder))
+            return sorted((asset for asset in assets if matches(asset)), key=lambda asset: asset["path"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": config.asset_catalog_enabled, "fresh": self.fresh, "pinned": self.pinned,
+                "assets": len(self._by_path), **self.stats}
+
+# Global asset catalog
+_asset_catalog: Optional[AssetCatalog] = None
+
+def get_asset_catalog() -> Optional[AssetCatalog]:
+    """Retrieve the global asset catalog, or None if it is disabled in the config."""
+    global _asset_catalog
+    if not config.asset_catalog_enabled:
+        return None
+    if _asset_catalog is None:
+        _asset_catalog = AssetCatalog()
+        add_command_observer(_asset_catalog.observe)
+    return _asset_catalog
+
+def _resolved(value: Any) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+def _submit_asset_query(unity, params: Dict[str, Any], predicate) -> Future:
+    """Fallback: ask Unity and resolve to whether any returned asset satisfies ``predicate``."""
+    request = unity.submit("GET_ASSET_LIST", params)
+    future = Future()
+
+    def finish(done: Future):
+        try:
+            assets = done.result().get("assets", [])
+            future.set_result(any(predicate(asset) for asset in assets))
+        except Exception as e:
+            future.set_exception(e)
+
+    request.add_done_callback(finish)
+    return future
+
+def submit_asset_exists(unity, path: str, asset_type: Optional[str] = None) -> Future:
+    """Check whether an asset exists at ``path``, from the catalog when possible.
+
+    Returns:
+        Future resolving to a bool, so tools can issue the check alongside
+        their other pre-checks and wait on it later
+    """
+    catalog = get_asset_catalog()
+    if catalog is not None and catalog.ensure_fresh(unity):
+        return _resolved(catalog.exists(path, asset_type))
+    folder, _, file_name = path.rpartition("/")
+    return _submit_asset_query(unity, {
+        "type": asset_type,
+        "search_pattern": file_name,
+        "folder": folder or "Assets"
+    }, lambda asset: asset.get("path") == path)
+
+def asset_exists(unity, path: str, asset_type: Optional[str] = None) -> bool:
+    """Blocking form of submit_asset_exists."""
+    return unity.wait(submit_asset_exists(unity, path, asset_type))
+
+def submit_named_asset_exists(unity, name: str, asset_type: Optional[str] = None, folder: str = "Assets") -> Future:
+    """Check whether an asset called exactly ``name`` exists under ``folder``; see submit_asset_exists."""
+    catalog = get_asset_catalog()
+    if catalog is not None and catalog.ensure_fresh(unity):
+        return _resolved(bool(catalog.find_by_name(name, asset_type, folder)))
+    return _submit_asset_query(unity, {
+        "type": asset_type,
+        "search_pattern": name,
+        "folder": folder
+    }, lambda asset: asset.get("name") == name)
@@ -0,0 +1,85 @@
+"""
+Benchmark: full vs delta get_hierarchy over a large synthetic scene.
+
+Serves a generated scene (50k objects by default) from the mock bridge, takes a
+full hierarchy, then repeatedly changes a number of objects and asks for the
+delta since the previous version. Reports the size of what the tool hands back
+to the agent and the time per call (which still includes fetching the tree
+from the bridge).
+
+Usage: python benchmarks/bench_hierarchy_delta.py [--objects N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from hierarchy_versions import HierarchyVersions, snapshot_hierarchy
+from mock_bridge import MockUnityBridge, SyntheticScene
+from scene_mirror import hierarchy_roots
+from unity_connection import UnityConnection
+
+CHANGES = [0, 10, 100, 1000]
+
+def apply_delta(snapshot, delta):
+    """Apply a delta to a snapshot the way a client would, returning the new snapshot."""
+    nodes = dict(snapshot)
+    for node in delta["added"]:
+        nodes[node["id"]] = (node["name"], node["parent"])
+    for node in delta["reparented"]:
+        nodes[node["id"]] = (nodes[node["id"]][0], node["parent"])
+    for node in delta["renamed"]:
+        nodes[node["id"]] = (node["name"], nodes[node["id"]][1])
+    # Removals last: nodes moved out of a removed subtree survive it
+    children = {}
+    for key, (_, parent) in nodes.items():
+        children.setdefault(parent, []).append(key)
+    stack = list(delta["removed"])
+    while stack:
+        key = stack.pop()
+        stack.extend(children.get(key, ()))
+        nodes.pop(key, None)
+    return nodes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=50_000)
+    args = parser.parse_args()
+    config.heartbeat_interval = 0
+
+    scene = SyntheticScene(args.objects)
+    bridge = MockUnityBridge()
+    scene.install(bridge)
+    with bridge:
+        unity = UnityConnection(port=bridge.port)
+        versions = HierarchyVersions()
+
+        start = time.perf_counter()
+        full = versions.get_hierarchy(unity)
+        elapsed = time.perf_counter() - start
+        print(f"{'full':>14} {len(json.dumps(full)) / 1e6:9.2f}MB {elapsed * 1000:8.0f}ms ({len(scene)} objects)")
+
+        version = full["version"]
+        for changes in CHANGES:
+            scene.mutate(changes)
+            start = time.perf_counter()
+            delta = versions.get_hierarchy(unity, since=version)
+            elapsed = time.perf_counter() - start
+            assert not delta["full"]
+
+            # Applying the delta must reproduce the new tree
+            expected = snapshot_hierarchy(hierarchy_roots(scene.hierarchy()))
+            assert apply_delta(versions.get(version), delta) == expected
+            print(f"{f'{changes} changes':>14} {len(json.dumps(delta)) / 1e3:8.1f}KB {elapsed * 1000:8.0f}ms "
+                  f"(+{len(delta['added'])} -{len(delta['removed'])} ~{len(delta['renamed'])} "
+                  f">{len(delta['reparented'])})")
+            version = delta["version"]
+        unity.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark: scene mirror lookups vs a linear scan over a large hierarchy.
+
+Builds a synthetic scene (100k objects by default) in a SceneMirror and times
+substring, prefix, glob, exact and tag queries against the same query done as a
+scan over every object, which is what FIND_OBJECTS_BY_NAME costs on the editor's
+main thread (before any socket round trip).
+
+Usage: python benchmarks/bench_hierarchy_index.py [--objects N]
+"""
+
+import argparse
+import fnmatch
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scene_mirror import SceneMirror
+
+KINDS = ["Enemy", "Tree", "Rock", "Crate", "Lamp", "Wall", "Coin", "Spawner"]
+TAGS = ["Untagged", "Enemy", "Environment", "Pickup"]
+QUERIES = [
+    ("substring", "Spawner_12"),
+    ("substring", "Crate"),
+    ("prefix", "Lamp_99"),
+    ("glob", "Wall_1?7*"),
+    ("exact", "Coin_4242"),
+]
+
+def make_hierarchy(count: int):
+    """Build a GET_HIERARCHY-like result with ``count`` objects in groups of 100."""
+    rng = random.Random(1)
+    roots = []
+    for group in range(max(1, count // 100)):
+        children = [{
+            "name": f"{rng.choice(KINDS)}_{rng.randrange(count)}",
+            "tag": rng.choice(TAGS),
+            "children": []
+        } for _ in range(99)]
+        roots.append({"name": f"Group_{group}", "tag": "Untagged", "children": children})
+    return {"hierarchy": roots}
+
+def flatten(hierarchy):
+    stack = list(hierarchy["hierarchy"])
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node["children"])
+
+def scan(objects, match, text):
+    if match == "substring":
+        return [o for o in objects if text in o["name"]]
+    if match == "prefix":
+        return [o for o in objects if o["name"].startswith(text)]
+    if match == "glob":
+        return [o for o in objects if fnmatch.fnmatchcase(o["name"], text)]
+    if match == "exact":
+        return [o for o in objects if o["name"] == text]
+    return [o for o in objects if o["tag"] == text]
+
+def per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100_000)
+    args = parser.parse_args()
+
+    hierarchy = make_hierarchy(args.objects)
+    objects = list(flatten(hierarchy))
+    mirror = SceneMirror()
+    start = time.perf_counter()
+    mirror.load(hierarchy)
+    print(f"Seeded {len(mirror)} objects in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    print(f"{'query':>24} {'matches':>8} {'scan':>10} {'index':>10} {'speedup':>9}")
+    for match, text in QUERIES + [("tag", "Pickup")]:
+        if match == "tag":
+            lookup = lambda: mirror.find_objects_by_tag(text)
+        else:
+            lookup = lambda: mirror.find_objects_by_name(text, match)
+        found = lookup()
+        assert sorted(o["name"] for o in found) == sorted(o["name"] for o in scan(objects, match, text))
+
+        scanned = per_call(lambda: scan(objects, match, text), 5)
+        indexed = per_call(lookup, 200)
+        print(f"{match + ' ' + repr(text):>24} {len(found):>8} {scanned * 1e6:8.0f}us {indexed * 1e6:8.1f}us "
+              f"{scanned / indexed:8.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: per-request overhead of talking to Ollama, fresh client vs pooled client.
+
+Starts the stub Ollama server (no model time by default) and sends the same
+/api/generate request over and over, first the way OllamaConnection used to
+(a new httpx.AsyncClient, and so a new TCP connection, per request) and then
+through OllamaConnection's long-lived pooled client. Reports the mean time per
+request and the number of TCP connections the stub accepted, for sequential
+requests and for a number of concurrent ones.
+
+Usage: python benchmarks/bench_ollama_client.py [--requests N] [--concurrency N] [--latency S]
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+PROMPT = "Create a red cube at the origin"
+_requests = itertools.count()
+
+async def fresh_client_completion(connection: OllamaConnection):
+    """The previous get_completion: a client (and connection) per request."""
+    async with httpx.AsyncClient(timeout=connection.timeout) as client:
+        response = await client.post(f"{connection.base_url}/api/generate", json={
+            "model": connection.model, "prompt": PROMPT, "temperature": 0.7, "stream": False
+        })
+        return response.json().get("response", "")
+
+async def pooled_completion(connection: OllamaConnection):
+    # A distinct prompt per request, so concurrent requests aren't coalesced into one
+    text, _ = await connection.get_completion(f"{PROMPT} ({next(_requests)})")
+    return text
+
+async def run(completion, connection: OllamaConnection, requests: int, concurrency: int) -> float:
+    """Mean seconds per request, with ``concurrency`` requests in flight at a time."""
+    await completion(connection)  # Warm up (and open the pool)
+    start = time.perf_counter()
+    for _ in range(requests // concurrency):
+        texts = await asyncio.gather(*(completion(connection) for _ in range(concurrency)))
+        assert all(texts)
+    return (time.perf_counter() - start) / (requests // concurrency * concurrency)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of simulated model time per request")
+    args = parser.parse_args()
+    config.ollama_cache_enabled = False  # Every request has to reach the stub
+    config.ollama_max_concurrency = args.concurrency  # Measure the client, not the scheduler
+
+    with MockOllamaServer(latency=args.latency) as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        print(f"{'client':>8} {'in flight':>10} {'per request':>12} {'connections':>12}")
+        for concurrency in (1, args.concurrency):
+            for label, completion in (("fresh", fresh_client_completion), ("pooled", pooled_completion)):
+                before = stub.connections
+                elapsed = await run(completion, connection, args.requests, concurrency)
+                print(f"{label:>8} {concurrency:>10} {elapsed * 1000:10.2f}ms {stub.connections - before:>12}")
+        await connection.close()
+
+if __name__ == "__main__":
+    config.log_level = "WARNING"
+    import logging
+    logging.getLogger("UnityMCP.Ollama").setLevel(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Benchmark: duplicate concurrent completion requests, with and without coalescing.
+
+Starts the stub Ollama server with a fixed generation time and serves it from
+a single worker, like one local model, then fires the same prompt several
+times at once (a double-click or a client retry, times N). Without coalescing
+every copy is generated in turn; with it the copies share one generation.
+Reports the wall time until all copies are answered and the number of
+generations the stub ran.
+
+Usage: python benchmarks/bench_ollama_coalescing.py [--copies N] [--latency S]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+PROMPT = "Add a directional light"
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds each generation takes")
+    args = parser.parse_args()
+    config.ollama_cache_enabled = False  # Every generation has to reach the stub
+
+    model = threading.Lock()  # One generation at a time, like a single local model
+    def respond(body):
+        with model:
+            time.sleep(args.latency)
+        return '{"function": "create_light", "arguments": {"type": "DIRECTIONAL"}}'
+
+    with MockOllamaServer(respond=respond) as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        await connection.get_completion("warm up")
+        print(f"{'mode':>10} {'copies':>7} {'all answered':>13} {'generations':>12}")
+        for label in ("separate", "coalesced"):
+            before = len(stub.requests)
+            start = time.perf_counter()
+            # Separate prompts can't share; a trailing space keeps the text equivalent for the stub
+            prompts = [PROMPT + " " * i if label == "separate" else PROMPT for i in range(args.copies)]
+            await asyncio.gather(*(connection.get_completion(prompt) for prompt in prompts))
+            elapsed = time.perf_counter() - start
+            print(f"{label:>10} {args.copies:>7} {elapsed * 1000:11.0f}ms {len(stub.requests) - before:>12}")
+        await connection.close()
+
+if __name__ == "__main__":
+    import logging
+    logging.getLogger("UnityMCP").setLevel(logging.WARNING)
+    asyncio.run(main())
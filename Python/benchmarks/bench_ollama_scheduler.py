@@ -0,0 +1,52 @@
+"""
+Benchmark: chat latency behind a backlog of batch work, with and without priorities.
+
+Starts the stub Ollama server with a fixed generation time, queues a backlog
+of batch requests and then sends one chat request, first in the same class
+as the backlog (first come, first served) and then as "interactive", which
+the scheduler admits ahead of the queued batch work. Reports how long the
+chat request took and the scheduler's wait-time metrics.
+
+Usage: python benchmarks/bench_ollama_scheduler.py [--backlog N] [--latency S] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backlog", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds each generation takes")
+    parser.add_argument("--concurrency", type=int, default=1, help="config.ollama_max_concurrency")
+    args = parser.parse_args()
+    config.ollama_cache_enabled = False  # Every request has to reach the stub
+    config.ollama_max_concurrency = args.concurrency
+
+    with MockOllamaServer(latency=args.latency) as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        print(f"{'chat class':>12} {'backlog':>8} {'chat latency':>13}")
+        for chat_priority in ("batch", "interactive"):
+            backlog = [asyncio.create_task(connection.get_completion(f"batch job {i}", priority="batch"))
+                       for i in range(args.backlog)]
+            await asyncio.sleep(0.01)  # Let the backlog queue up
+            start = time.perf_counter()
+            await connection.get_completion("chat message", priority=chat_priority)
+            chat = time.perf_counter() - start
+            await asyncio.gather(*backlog)
+            print(f"{chat_priority:>12} {args.backlog:>8} {chat * 1000:11.0f}ms")
+        print(connection.scheduler.get_stats())
+        await connection.close()
+
+if __name__ == "__main__":
+    import logging
+    logging.getLogger("UnityMCP").setLevel(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Benchmark: prompt evaluation per turn, independent requests vs a chat session.
+
+Starts the stub Ollama server with a per-token prompt evaluation cost and
+sends a series of follow-up prompts with the long Unity system prompt, first
+as independent requests (the system prompt is evaluated every time) and then
+as turns of one OllamaSession (later turns pass back the previous context and
+only evaluate the new prompt). Reports prompt_eval_count, prompt_eval_duration
+and the wall time of each turn.
+
+Usage: python benchmarks/bench_ollama_sessions.py [--prompt-token-latency S]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from fastmcp.ollama_prompt import get_system_prompt
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+PROMPTS = [
+    "Create a red cube at the origin",
+    "Make it twice as big",
+    "Now move it up by two units",
+    "Add a directional light above it",
+    "Save the scene",
+]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompt-token-latency", type=float, default=0.001,
+                        help="Seconds to evaluate each prompt token")
+    args = parser.parse_args()
+    config.ollama_cache_enabled = False  # Every request has to reach the stub
+
+    system_prompt = get_system_prompt()
+    with MockOllamaServer(prompt_token_latency=args.prompt_token_latency) as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        print(f"{'mode':>12} {'turn':>5} {'prompt tokens':>14} {'prompt eval':>12} {'wall':>9}")
+        for label in ("independent", "session"):
+            session = connection.session("bench") if label == "session" else None
+            for turn, prompt in enumerate(PROMPTS, 1):
+                start = time.perf_counter()
+                _, data = await connection.get_completion(prompt, system_prompt, session=session)
+                wall = time.perf_counter() - start
+                print(f"{label:>12} {turn:>5} {data['prompt_eval_count']:>14} "
+                      f"{data['prompt_eval_duration'] / 1e6:10.1f}ms {wall * 1000:7.1f}ms")
+        await connection.close()
+
+if __name__ == "__main__":
+    import logging
+    logging.getLogger("UnityMCP").setLevel(logging.WARNING)
+    asyncio.run(main())
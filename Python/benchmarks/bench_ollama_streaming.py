@@ -0,0 +1,110 @@
+"""
+Benchmark: time to the first scene change, streamed completion vs whole completion.
+
+Starts the stub Ollama server, generating a response of N create_object
+commands at a steady token rate, and the mock Unity bridge. Each request is
+run the way process_user_request does it: either the whole completion is
+awaited and its commands executed in one batch, or the completion is streamed
+and each command is executed as soon as it has been generated, with commands
+that arrive while a batch is in flight sent as the next batch. Reports the
+time from the request to the first command, to the first command reaching
+Unity, and to the last one.
+
+Usage: python benchmarks/bench_ollama_streaming.py [--commands N] [--latency S] [--token-latency S]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from mock_bridge import MockUnityBridge
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+from unity_connection import AsyncUnityConnection
+
+PROMPT = "Create a row of cubes"
+
+def response(count: int) -> str:
+    lines = [json.dumps({"function": "create_object",
+                         "arguments": {"type": "CUBE", "name": f"Cube{i}", "location": [i * 2, 0, 0]}})
+             for i in range(count)]
+    return "Here are the cubes:\n```json\n" + "\n".join(lines) + "\n```\nEach cube is two units apart."
+
+def as_batch(commands):
+    return [{"type": cmd["function"], "params": cmd["arguments"]} for cmd in commands]
+
+async def whole(ollama: OllamaConnection, unity: AsyncUnityConnection, marks: dict, start: float):
+    text, _ = await ollama.get_completion(PROMPT)
+    commands = await ollama.extract_mcp_commands(text)
+    marks["first_command"] = time.perf_counter() - start
+    await unity.send_batch(as_batch(commands))
+
+async def streamed(ollama: OllamaConnection, unity: AsyncUnityConnection, marks: dict, start: float):
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_command(command):
+        marks.setdefault("first_command", time.perf_counter() - start)
+        queue.put_nowait(command)
+
+    async def execute():
+        while True:
+            chunk = [await queue.get()]
+            while not queue.empty():
+                chunk.append(queue.get_nowait())
+            commands = [cmd for cmd in chunk if cmd is not None]
+            if commands:
+                await unity.send_batch(as_batch(commands))
+            if chunk[-1] is None:
+                return
+
+    worker = asyncio.create_task(execute())
+    await ollama.stream_commands(PROMPT, on_command=on_command)
+    queue.put_nowait(None)
+    await worker
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.005, help="Seconds per further token")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    config.ollama_cache_enabled = False  # Every request has to reach the stub
+
+    changes = []  # Arrival time of every command at the bridge
+    bridge = MockUnityBridge()
+    bridge.register("create_object", lambda params: changes.append(time.perf_counter()) or {"name": params["name"]})
+    with bridge, MockOllamaServer(latency=args.latency, token_latency=args.token_latency,
+                                  respond=lambda body: response(args.commands)) as stub:
+        ollama = OllamaConnection(port=stub.port, model=stub.models[0])
+        unity = AsyncUnityConnection(port=bridge.port)
+        await unity.connect()
+        print(f"{'mode':>8} {'first command':>14} {'first change':>13} {'last change':>12}")
+        for label, run in (("whole", whole), ("streamed", streamed)):
+            totals = {"first_command": 0.0, "first_change": 0.0, "last_change": 0.0}
+            for _ in range(args.runs):
+                changes.clear()
+                marks = {}
+                start = time.perf_counter()
+                await run(ollama, unity, marks, start)
+                assert len(changes) == args.commands
+                totals["first_command"] += marks["first_command"]
+                totals["first_change"] += changes[0] - start
+                totals["last_change"] += changes[-1] - start
+            mean = {name: total / args.runs * 1000 for name, total in totals.items()}
+            print(f"{label:>8} {mean['first_command']:12.0f}ms {mean['first_change']:11.0f}ms "
+                  f"{mean['last_change']:10.0f}ms")
+        await unity.disconnect()
+        await ollama.close()
+
+if __name__ == "__main__":
+    config.heartbeat_interval = 0
+    import logging
+    logging.getLogger("UnityMCP").setLevel(logging.WARNING)
+    asyncio.run(main())
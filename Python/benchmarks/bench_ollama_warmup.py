@@ -0,0 +1,69 @@
+"""
+Benchmark: first-request latency with and without model warm-up and the keeper.
+
+Starts the stub Ollama server with a model load cost and times one request:
+
+* cold: the first request after startup, which has to load the model
+* warmed: the first request after the startup warm-up has loaded the model
+* idle gap: a request after an idle gap longer than keep_alive, without and
+  with the keeper renewing residency (the editor counts as in use throughout)
+
+Usage: python benchmarks/bench_ollama_warmup.py [--load-latency S] [--idle S]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+PROMPT = "Add a directional light"
+
+async def timed_request(connection: OllamaConnection) -> float:
+    start = time.perf_counter()
+    text, _ = await connection.get_completion(PROMPT)
+    assert text
+    return time.perf_counter() - start
+
+async def wait_loaded(connection: OllamaConnection):
+    while not (await connection.model_status())["loaded"]:
+        await asyncio.sleep(0.05)
+
+async def scenario(label: str, load_latency: float, warm_up: bool, idle: float = 0.0):
+    with MockOllamaServer(load_latency=load_latency) as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        if warm_up:
+            connection.start_keeper()
+            await wait_loaded(connection)
+        if idle:
+            await timed_request(connection)
+            await asyncio.sleep(idle)
+        elapsed = await timed_request(connection)
+        print(f"{label:>22} {elapsed * 1000:9.0f}ms {stub.loads:>6}")
+        await connection.close()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--load-latency", type=float, default=2.0, help="Seconds to load the model")
+    parser.add_argument("--idle", type=float, default=3.0, help="Seconds of idle time in the idle-gap runs")
+    args = parser.parse_args()
+    config.ollama_cache_enabled = False  # Every request has to reach the stub
+    config.ollama_keep_alive = f"{args.idle / 2}s"
+    config.ollama_keeper_interval = args.idle / 4
+
+    print(f"{'':>22} {'request':>11} {'loads':>6}")
+    await scenario("cold", args.load_latency, warm_up=False)
+    await scenario("warmed", args.load_latency, warm_up=True)
+    await scenario("idle gap, no keeper", args.load_latency, warm_up=False, idle=args.idle)
+    await scenario("idle gap, keeper", args.load_latency, warm_up=True, idle=args.idle)
+
+if __name__ == "__main__":
+    import logging
+    logging.getLogger("UnityMCP").setLevel(logging.WARNING)
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: the on-disk project index over a large Assets folder.
+
+Generates a synthetic project (50k assets by default, with a .meta file next to
+each) in a temporary directory and times the initial walk, a poll with nothing
+changed, a poll after a few files were added and removed, a filtered listing and
+an existence check. Polling uses directory mtimes unless --watchdog is given
+and the watchdog package is installed.
+
+Usage: python benchmarks/bench_project_index.py [--assets N] [--watchdog]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import project_index
+from asset_catalog import AssetCatalog
+from project_index import ProjectIndex
+
+EXTENSIONS = [".cs", ".prefab", ".mat", ".png", ".fbx", ".unity", ".asset"]
+FILES_PER_FOLDER = 100
+
+def make_project(root: str, count: int):
+    """Write ``count`` empty assets (plus .meta files) under ``root``/Assets."""
+    rng = random.Random(1)
+    for folder in range(max(1, count // FILES_PER_FOLDER)):
+        directory = os.path.join(root, "Assets", f"Area_{folder // 20}", f"Folder_{folder}")
+        os.makedirs(directory)
+        for i in range(FILES_PER_FOLDER):
+            name = f"Asset_{folder}_{i}{rng.choice(EXTENSIONS)}"
+            for path in (name, name + ".meta"):
+                open(os.path.join(directory, path), "w").close()
+
+def backdate(root: str):
+    """Age every directory past the index's mtime settle window."""
+    past = time.time() - 60
+    for directory, _, _ in os.walk(os.path.join(root, "Assets")):
+        os.utime(directory, (past, past))
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=50_000)
+    parser.add_argument("--watchdog", action="store_true", help="Use file-system events if watchdog is installed")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="unity-mcp-bench-")
+    try:
+        make_project(root, args.assets)
+        backdate(root)
+        index = ProjectIndex(root, AssetCatalog())
+        if args.watchdog and project_index.Observer is not None:
+            index.start()
+            index.ready.wait()
+            index._stop.set()  # Drive poll() by hand below
+            time.sleep(0.2)
+        else:
+            index.build()
+        mode = "watchdog" if index.watching else "mtime polling"
+        print(f"Walked {index.stats['files']} assets in {index.stats['directories']} folders "
+              f"in {index.stats['walk_seconds'] * 1000:.0f}ms ({mode})")
+
+        print(f"{'no-change poll':>22} {timed(index.poll, 20) * 1000:8.2f}ms")
+
+        changed = os.path.join(root, "Assets", "Area_0", "Folder_3")
+        removed = next(name for name in sorted(os.listdir(changed)) if not name.endswith(".meta"))
+        os.remove(os.path.join(changed, removed))
+        for i in range(5):
+            open(os.path.join(changed, f"New_{i}.mat"), "w").close()
+        os.makedirs(os.path.join(root, "Assets", "Fresh"))
+        open(os.path.join(root, "Assets", "Fresh", "Fresh.prefab"), "w").close()
+        time.sleep(0.2)  # Let file-system events arrive
+        print(f"{'poll after changes':>22} {timed(index.poll) * 1000:8.2f}ms")
+        assert index.catalog.exists("Assets/Area_0/Folder_3/New_4.mat")
+        assert index.catalog.exists("Assets/Fresh/Fresh.prefab")
+        assert not index.catalog.exists(f"Assets/Area_0/Folder_3/{removed}")
+
+        listing = lambda: index.catalog.list_assets("Material", "New_*", "Assets/Area_0")
+        print(f"{'filtered listing':>22} {timed(listing, 20) * 1000:8.2f}ms ({len(listing())} matches)")
+        exists = lambda: index.catalog.exists("Assets/Area_0/Folder_3/New_2.mat", "Material")
+        print(f"{'existence check':>22} {timed(exists, 10_000) * 1e6:8.2f}us")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
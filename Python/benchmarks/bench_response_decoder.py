@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: legacy trial-parse receive loop vs IncrementalJsonDecoder.
+
+Feeds synthetic Unity replies of 1 KB to 50 MB to both decoders in 4 KB chunks
+and reports the time each needs to find the end of the response. The legacy
+loop re-joins, re-decodes and re-parses everything received so far after every
+chunk, so it is skipped above --legacy-max bytes.
+
+Usage: python benchmarks/bench_response_decoder.py [--legacy-max BYTES]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unity_protocol import IncrementalJsonDecoder
+
+SIZES = [1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024]
+CHUNK_SIZE = 4096
+
+def make_response(size: int) -> bytes:
+    """Build a GET_HIERARCHY-like reply of roughly ``size`` bytes."""
+    node = {
+        "name": "Enemy \"Grunt\" (Clone)",
+        "path": "Level/Spawns/Enemy",
+        "tag": "Enemy",
+        "components": ["Transform", "MeshRenderer", "Rigidbody"],
+        "children": []
+    }
+    node_size = len(json.dumps(node)) + 2
+    nodes = [dict(node, name=f"{node['name']} {i}") for i in range(max(1, size // node_size))]
+    return json.dumps({"status": "success", "result": {"hierarchy": nodes}}).encode('utf-8')
+
+def legacy_decode(chunks) -> bytes:
+    """The previous receive loop: join and trial-parse after every chunk."""
+    received = []
+    for chunk in chunks:
+        received.append(chunk)
+        data = b''.join(received)
+        try:
+            json.loads(data.decode('utf-8'))
+            return data
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            continue
+    raise ValueError("Incomplete response")
+
+def incremental_decode(chunks) -> bytes:
+    """Receive path used by UnityConnection, with recv_into replaced by a copy into the view."""
+    decoder = IncrementalJsonDecoder()
+    for chunk in chunks:
+        decoder.write_view(len(chunk))[:len(chunk)] = chunk
+        if decoder.commit(len(chunk)):
+            return decoder.message()
+    raise ValueError("Incomplete response")
+
+def timed(decode, chunks) -> float:
+    start = time.perf_counter()
+    decode(chunks)
+    return time.perf_counter() - start
+
+def format_size(size: int) -> str:
+    return f"{size // (1024 * 1024)} MB" if size >= 1024 * 1024 else f"{size // 1024} KB"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--legacy-max", type=int, default=2 * 1024 * 1024,
+                        help="Largest reply to run through the quadratic legacy loop")
+    args = parser.parse_args()
+
+    print(f"{'reply':>8} {'chunks':>7} {'legacy':>12} {'incremental':>12} {'speedup':>9}")
+    for size in SIZES:
+        data = make_response(size)
+        chunks = [data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+        assert incremental_decode(chunks) == data
+
+        incremental = timed(incremental_decode, chunks)
+        if len(data) <= args.legacy_max:
+            legacy = timed(legacy_decode, chunks)
+            legacy_text, speedup = f"{legacy * 1000:10.1f}ms", f"{legacy / incremental:8.1f}x"
+        else:
+            legacy_text, speedup = f"{'skipped':>12}", f"{'-':>9}"
+        print(f"{format_size(size):>8} {len(chunks):>7} {legacy_text} {incremental * 1000:10.1f}ms {speedup}")
+
+if __name__ == "__main__":
+    main()
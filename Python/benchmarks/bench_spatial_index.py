@@ -0,0 +1,88 @@
+"""
+Benchmark: radius and box queries against the spatial index over a large scene.
+
+Serves a generated scene (100k objects by default) with positions from the
+mock bridge, loads the spatial index once, then times find_near / find_in_box
+at several radii against a brute-force NumPy scan of every position (both
+build the same result list), checking that they return the same objects.
+Also times following a batch of moves.
+
+Usage: python benchmarks/bench_spatial_index.py [--objects N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from config import config
+from mock_bridge import MockUnityBridge, SyntheticScene
+from spatial_index import SpatialIndex
+from unity_connection import UnityConnection
+
+RADII = [5, 25, 100, 500]
+QUERIES = 50
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100_000)
+    args = parser.parse_args()
+    config.heartbeat_interval = 0
+    config.spatial_index_max_age = 0
+
+    scene = SyntheticScene(args.objects)
+    bridge = MockUnityBridge()
+    scene.install(bridge)
+    with bridge:
+        unity = UnityConnection(port=bridge.port)
+        index = SpatialIndex()
+        start = time.perf_counter()
+        index.ensure_fresh(unity)
+        print(f"Loaded {len(index)} objects in {(time.perf_counter() - start) * 1000:.0f}ms (including GET_HIERARCHY)")
+        unity.disconnect()
+
+    ids = list(scene.positions)
+    rng = random.Random(1)
+    centers = [scene.positions[rng.choice(ids)] for _ in range(QUERIES)]
+
+    def brute_near(center, radius):
+        """The same query as one distance pass over every position, formatted the same way."""
+        distances = np.linalg.norm(index._positions - center, axis=1)
+        rows = np.flatnonzero(distances <= radius)
+        order = np.argsort(distances[rows], kind="stable")
+        return index._describe(rows[order], distances[rows][order])
+
+    timed(lambda: index.find_near(centers[0], 1))  # Build the grid
+    print(f"{'radius':>8} {'index':>10} {'scan':>10} {'matches':>9}")
+    for radius in RADII:
+        for center in centers[:5]:
+            assert index.find_near(center, radius) == brute_near(center, radius)
+        found = sum(len(index.find_near(center, radius)) for center in centers) / QUERIES
+        grid = timed(lambda: [index.find_near(center, radius) for center in centers]) / QUERIES
+        scan = timed(lambda: [brute_near(center, radius) for center in centers]) / QUERIES
+        print(f"{radius:>8} {grid * 1000:8.2f}ms {scan * 1000:8.2f}ms {found:9.0f}")
+
+    low, high = np.array(centers[0]) - 50, np.array(centers[0]) + 50
+    box = timed(lambda: index.find_in_box(low, high), 20)
+    print(f"{'box 100^3':>8} {box * 1000:8.2f}ms ({len(index.find_in_box(low, high))} matches)")
+
+    moves = [("MODIFY_OBJECT", {"name": scene.names[rng.choice(ids)], "location": [rng.uniform(-1000, 1000), 0,
+                                                                                   rng.uniform(-1000, 1000)]}, {})
+             for _ in range(1000)]
+    elapsed = timed(lambda: [index.observe(*move) for move in moves])
+    print(f"{'1000 moves':>8} {elapsed * 1000:8.2f}ms, then query {timed(lambda: index.find_near(centers[0], 25)) * 1000:.2f}ms "
+          f"(grid rebuild)")
+
+if __name__ == "__main__":
+    main()
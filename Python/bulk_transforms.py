@@ -0,0 +1,98 @@
+"""
+Array helpers for tools that place or move many objects in one call.
+
+``modify_object`` moves one object per call, behind a ``FIND_OBJECTS_BY_NAME``
+pre-check. The bulk tools take the transforms of every object as N x 3
+arrays instead. They validate all of them in one vectorized pass, check
+existence against the scene mirror, and send the updates as ``BATCH``
+commands of ``config.batch_max_commands`` items each (pipelined on bridges
+without BATCH). Bad rows fail individually; the rest still go out.
+"""
+
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+from scene_mirror import get_scene_mirror
+
+def vector_array(values: Any, count: int, label: str) -> np.ndarray:
+    """Coerce ``values`` to a ``count`` x 3 float array.
+
+    Args:
+        values: N x 3 nested list, or a single [x, y, z] used for every row
+        count: Number of rows expected
+        label: Parameter name, for error messages
+
+    Raises:
+        ValueError: If the values are not numeric or have the wrong shape
+    """
+    try:
+        array = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} must be numbers in [x, y, z] rows")
+    if array.shape == (3,):
+        return np.broadcast_to(array, (count, 3))
+    if array.shape != (count, 3):
+        raise ValueError(f"{label} must have shape ({count}, 3) or (3,), got {array.shape}")
+    return array
+
+def non_finite_rows(arrays: Dict[str, np.ndarray]) -> Dict[int, str]:
+    """Rows holding NaN or infinite values, mapped to an error naming the first bad field."""
+    errors: Dict[int, str] = {}
+    for label, array in arrays.items():
+        for row in np.flatnonzero(~np.isfinite(array).all(axis=1)).tolist():
+            errors.setdefault(row, f"{label} has non-finite values")
+    return errors
+
+def missing_objects(unity, names: Sequence[str]) -> Optional[List[bool]]:
+    """Which names the scene mirror does not know, or None if the mirror cannot tell."""
+    mirror = get_scene_mirror()
+    if mirror is None or not mirror.ensure_fresh(unity):
+        return None
+    return [not mirror.exists(name) for name in names]
+
+def row_commands(command_type: str, base: List[Dict[str, Any]], arrays: Dict[str, np.ndarray],
+                 skip: Dict[int, str]) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """One command per row not in ``skip``, with each array's row added to its params.
+
+    Returns:
+        The row indices sent and their batch commands, in the same order
+    """
+    columns = {label: array.tolist() for label, array in arrays.items()}
+    rows, commands = [], []
+    for row, params in enumerate(base):
+        if row in skip:
+            continue
+        rows.append(row)
+        commands.append({"type": command_type,
+                         "params": {**params, **{label: values[row] for label, values in columns.items()}}})
+    return rows, commands
+
+def run_rows(unity, command_type: str, base: List[Dict[str, Any]], arrays: Dict[str, np.ndarray],
+             skip: Dict[int, str], action: str) -> Dict[str, Any]:
+    """Send one command per row and summarise the outcome.
+
+    Args:
+        unity: Connection to send the batch over
+        command_type: Command run for each row
+        base: Per-row parameters other than the arrays (e.g. the object name)
+        arrays: Transform arrays, one row per command
+        skip: Rows already failed, with their error
+        action: Past-tense verb for the summary line (e.g. "Updated")
+
+    Returns:
+        Dict with a ``summary`` line, the ``requested`` and ``succeeded``
+        counts and a ``failed`` list of ``{"index", "name", "error"}``
+    """
+    rows, commands = row_commands(command_type, base, arrays, skip)
+    outcomes = unity.send_batch(commands) if commands else []
+    errors = dict(skip)
+    for row, outcome in zip(rows, outcomes):
+        if outcome.get("status") == "error":
+            errors[row] = outcome.get("error") or "Unknown error"
+    failed = [{"index": row, "name": base[row].get("name"), "error": errors[row]} for row in sorted(errors)]
+    succeeded = len(base) - len(failed)
+    return {
+        "summary": f"{action} {succeeded} of {len(base)} objects",
+        "requested": len(base),
+        "succeeded": succeeded,
+        "failed": failed
+    }
@@ -0,0 +1,425 @@
+"""
+Client-side cache of per-object component and property data.
+
+``modify_object`` and ``attach_script`` only need to know whether a component
+type is already on an object, and callers of ``get_object_properties`` usually
+only need the transform or one component, yet every lookup used to fetch the
+object's full property dump (every serialized value of every component). The
+cache asks for less and remembers what it got:
+
+* component type checks send ``GET_OBJECT_PROPERTIES`` with ``components_only``
+  set, which bridges that support it answer with just the component types,
+* property lookups pass a ``fields`` / ``components`` projection to the bridge
+  and apply the same projection locally, so bridges that ignore it still
+  yield the small view; a cached full dump serves any projection of it,
+* views are kept per object, keyed by object identity: the mirrored object's
+  ID when the scene mirror can resolve the name, otherwise the name or path,
+* concurrent lookups of the same view share one request,
+* any command that mutates an object drops that object's views, and a
+  transform change also drops the property views of its descendants (their
+  world transforms follow it); commands the cache cannot follow (undo, scene
+  changes, script edits) drop everything,
+* callers get a copy of each view, so changing a result leaves the cache alone,
+* component types are kept for ``config.component_cache_ttl`` seconds; property
+  values, which the editor changes behind the server's back, only for the much
+  shorter ``config.property_cache_ttl``, and not at all while the editor is in
+  play mode (scripts change them every frame).
+"""
+
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from config import config
+from unity_connection import add_command_observer
+from scene_mirror import get_scene_mirror
+
+logger = logging.getLogger("UnityMCP.ComponentCache")
+
+# Commands that never add or remove components or change property values
+COMPONENT_NEUTRAL_COMMANDS = frozenset({
+    "ping", "HANDSHAKE", "GET_SCENE_INFO", "GET_HIERARCHY", "GET_OBJECT_INFO", "GET_OBJECT_PROPERTIES",
+    "GET_COMPONENT_PROPERTIES", "FIND_OBJECTS_BY_NAME", "FIND_OBJECTS_BY_TAG", "GET_SELECTED_OBJECT",
+    "SELECT_OBJECT", "SAVE_SCENE", "GET_ASSET_LIST", "IMPORT_ASSET", "LIST_SCRIPTS", "VIEW_SCRIPT",
+    "CREATE_SCRIPT", "CREATE_PREFAB"
+})
+
+# Commands that mutate one object, and the parameter naming it
+OBJECT_MUTATING_COMMANDS = {
+    "MODIFY_OBJECT": "name",
+    "ATTACH_SCRIPT": "object_name",
+    "SET_MATERIAL": "object_name",
+    "APPLY_PREFAB": "object_name"
+}
+
+# Commands that add an object, which can change what a name resolves to
+OBJECT_CREATING_COMMANDS = {"CREATE_OBJECT": "name", "INSTANTIATE_PREFAB": "instance_name"}
+
+# MODIFY_OBJECT parameters that move an object's children along with it
+TRANSFORM_PARAMS = ("location", "rotation", "scale")
+
+# Commands that can enter or leave play mode, and the parameter holding the action
+PLAY_MODE_COMMANDS = {"EDITOR_CONTROL": "command", "editor_action": "action"}
+
+# Keys of a GET_COMPONENT_PROPERTIES result that identify the component rather than hold a value
+_COMPONENT_ID_KEYS = frozenset({"type", "name", "object_name", "component_type"})
+
+# Cached views of an object
+TYPES_VIEW = ("types",)
+
+def _properties_view(fields: Optional[List[str]], components: Optional[List[str]]) -> Tuple:
+    return ("properties",
+            tuple(sorted(fields)) if fields is not None else None,
+            tuple(sorted(components)) if components is not None else None)
+
+def _component_view(component_type: str, fields: Optional[List[str]]) -> Tuple:
+    return ("component", component_type, tuple(sorted(fields)) if fields is not None else None)
+
+def _leaf(name_or_path: str) -> str:
+    return name_or_path.rstrip("/").rsplit("/", 1)[-1]
+
+def _component_type(component: Any) -> Optional[str]:
+    if isinstance(component, dict):
+        component = component.get("type")
+    return component if isinstance(component, str) else None
+
+def component_types(properties: Any) -> Optional[List[str]]:
+    """Component type names from a GET_OBJECT_PROPERTIES result, or None if it lists none."""
+    components = properties.get("components") if isinstance(properties, dict) else None
+    if not isinstance(components, list):
+        return None
+    return [t for t in map(_component_type, components) if t is not None]
+
+def project_properties(properties: Any, fields: Optional[List[str]] = None,
+                       components: Optional[List[str]] = None) -> Any:
+    """Cut a GET_OBJECT_PROPERTIES result down to a projection.
+
+    Args:
+        properties: The result, full or already projected by the bridge
+        fields: Top-level keys to keep (``name`` is always kept); None keeps all
+        components: Component types to keep in ``components``; None keeps all
+
+    Returns:
+        The projected result
+    """
+    if not isinstance(properties, dict) or (fields is None and components is None):
+        return properties
+    if fields is None:
+        projected = dict(properties)
+    else:
+        wanted = set(fields) | {"name"}
+        projected = {key: value for key, value in properties.items() if key in wanted}
+    if components is not None and isinstance(properties.get("components"), list):
+        wanted_types = set(components)
+        projected["components"] = [c for c in properties["components"] if _component_type(c) in wanted_types]
+    return projected
+
+def project_component(properties: Any, fields: Optional[List[str]] = None) -> Any:
+    """Cut a GET_COMPONENT_PROPERTIES result down to the named properties."""
+    if not isinstance(properties, dict) or fields is None:
+        return properties
+    wanted = set(fields)
+    values = properties.get("properties")
+    if isinstance(values, dict):
+        return {**properties, "properties": {key: value for key, value in values.items() if key in wanted}}
+    return {key: value for key, value in properties.items() if key in wanted or key in _COMPONENT_ID_KEYS}
+
+def _types_result(name: str, types: List[str]) -> Dict[str, Any]:
+    """The GET_OBJECT_PROPERTIES shape for a component-types-only view."""
+    return {"name": name, "components": [{"type": t} for t in types]}
+
+class ComponentCache:
+    """Component types and property views per object, kept in step with the commands the server sends."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, Dict[Tuple, Tuple[float, Any]]] = {}  # Identity -> view -> (cached at, result)
+        self._inflight: Dict[Tuple[Any, Tuple], Future] = {}
+        self._keys_by_leaf: Dict[str, Set[Any]] = {}  # Object name -> identities looked up under it
+        self._generation = 0  # Bumped on every invalidation, so late replies are not cached
+        self.playing = False  # Whether the editor was last put in play mode
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "projected": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _identity(name: str) -> Any:
+        mirror = get_scene_mirror()
+        if mirror is not None and mirror.fresh:
+            node = mirror.resolve(name)
+            if node is not None:
+                return ("object", node.id)
+        return ("name", name)
+
+    @staticmethod
+    def _fresh(view: Tuple, cached_at: float) -> bool:
+        ttl = config.component_cache_ttl if view == TYPES_VIEW else config.property_cache_ttl
+        return not ttl or time.monotonic() - cached_at < ttl
+
+    def _cached(self, key: Any, view: Tuple) -> Optional[Any]:
+        """A fresh cached view, or None (call with the lock held)."""
+        entry = self._entries.get(key, {}).get(view)
+        if entry is not None and self._fresh(view, entry[0]):
+            return entry[1]
+        return None
+
+    def _store(self, key: Any, view: Tuple, result: Any):
+        self._entries.setdefault(key, {})[view] = (time.monotonic(), result)
+
+    def _cacheable(self, view: Tuple) -> bool:
+        """Whether a view may be served from and kept in the cache right now."""
+        return view == TYPES_VIEW or not self.playing
+
+    def _lookup(self, unity, name: str, view: Tuple, derive: Callable[[Any], Optional[Any]],
+                command_type: str, params: Dict[str, Any], extract: Callable[[Any], Optional[Any]]) -> Future:
+        """Serve a view from the cache, derive it from a cached view, or fetch it from Unity.
+
+        Args:
+            unity: Connection to fetch over on a miss
+            name: Object name or path, as the caller gave it
+            view: Key of the wanted view
+            derive: Builds the view from whatever else is cached for the object, or returns None
+            command_type: Command fetching the view
+            params: Its parameters
+            extract: Builds the view from the command's result, or returns None if it cannot
+
+        Returns:
+            Future resolving to a copy of the view, or to Unity's raw result if it could not be read
+        """
+        key = self._identity(name)
+        future = Future()  # Resolves to what is cached; callers only ever see copies of it
+        with self._lock:
+            cacheable = self._cacheable(view)
+            cached = self._cached(key, view) if cacheable else None
+            if cached is None and cacheable:
+                cached = derive(key)
+                if cached is not None:
+                    self._store(key, view, cached)
+                    self.stats["projected"] += 1
+            if cached is not None:
+                self.stats["hits"] += 1
+                future.set_result(copy.deepcopy(cached))
+                return future
+            inflight = self._inflight.get((key, view))
+            if inflight is not None:
+                self.stats["shared"] += 1
+                return _projected(inflight, copy.deepcopy)
+            self.stats["misses"] += 1
+            generation = self._generation
+            self._inflight[(key, view)] = future
+            self._keys_by_leaf.setdefault(_leaf(name), set()).add(key)
+
+        def finish(request: Future):
+            error = request.exception()
+            result = None if error is not None else extract(request.result())
+            with self._lock:
+                if self._inflight.get((key, view)) is future:
+                    del self._inflight[(key, view)]
+                if result is not None and cacheable and self._generation == generation:
+                    self._store(key, view, result)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result if result is not None else request.result())
+
+        try:
+            request = unity.submit(command_type, params)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop((key, view), None)
+            future.set_exception(e)
+            return future
+        request.add_done_callback(finish)
+        return _projected(future, copy.deepcopy)
+
+    def submit(self, unity, name: str) -> Future:
+        """Look up an object's component types.
+
+        Returns:
+            Future resolving to ``{"name": ..., "components": [{"type": ...}, ...]}``,
+            the shape of a GET_OBJECT_PROPERTIES result
+        """
+        def derive(key):
+            for view, (cached_at, result) in self._entries.get(key, {}).items():
+                if view[0] == "properties" and view[2] is None and (view[1] is None or "components" in view[1]) \
+                        and self._fresh(view, cached_at):
+                    types = component_types(result)
+                    if types is not None:
+                        return _types_result(name, types)
+            return None
+
+        def extract(result):
+            types = component_types(result)
+            return _types_result(name, types) if types is not None else None
+
+        return self._lookup(unity, name, TYPES_VIEW, derive, "GET_OBJECT_PROPERTIES",
+                            {"name": name, "components_only": True}, extract)
+
+    def submit_properties(self, unity, name: str, fields: Optional[List[str]] = None,
+                          components: Optional[List[str]] = None) -> Future:
+        """Look up a projection of an object's properties (see project_properties)."""
+        view = _properties_view(fields, components)
+        full = _properties_view(None, None)
+
+        def derive(key):
+            cached = self._cached(key, full) if view != full else None
+            return project_properties(cached, fields, components) if cached is not None else None
+
+        params: Dict[str, Any] = {"name": name}
+        if fields is not None:
+            params["fields"] = list(fields)
+        if components is not None:
+            params["components"] = list(components)
+        return self._lookup(unity, name, view, derive, "GET_OBJECT_PROPERTIES", params,
+                            lambda result: project_properties(result, fields, components)
+                            if isinstance(result, dict) else None)
+
+    def submit_component_properties(self, unity, object_name: str, component_type: str,
+                                    fields: Optional[List[str]] = None) -> Future:
+        """Look up some or all property values of one component on an object."""
+        view = _component_view(component_type, fields)
+        full = _component_view(component_type, None)
+
+        def derive(key):
+            cached = self._cached(key, full) if view != full else None
+            return project_component(cached, fields) if cached is not None else None
+
+        params: Dict[str, Any] = {"object_name": object_name, "component_type": component_type}
+        if fields is not None:
+            params["fields"] = list(fields)
+        return self._lookup(unity, object_name, view, derive, "GET_COMPONENT_PROPERTIES", params,
+                            lambda result: project_component(result, fields) if isinstance(result, dict) else None)
+
+    def forget(self, name: str):
+        """Drop every view an object called ``name`` (or at this path) may be cached under."""
+        with self._lock:
+            self._generation += 1
+            for key in self._keys_by_leaf.pop(_leaf(name), ()):
+                self._entries.pop(key, None)
+                for inflight in [k for k in self._inflight if k[0] == key]:
+                    del self._inflight[inflight]
+
+    def forget_descendants(self, name: str):
+        """Drop the property views of everything below an object; its component types stay valid.
+
+        Without a fresh scene mirror to list the descendants, every object's property views go.
+        """
+        mirror = get_scene_mirror()
+        descendants = mirror.descendants(name) if mirror is not None else None
+        with self._lock:
+            self._generation += 1
+            if descendants is None:
+                keys = list(self._entries)
+            else:
+                keys = {key for node in descendants for key in self._keys_by_leaf.get(node.name, ())}
+            for key in keys:
+                views = self._entries.get(key)
+                if views is not None:
+                    for view in [v for v in views if v != TYPES_VIEW]:
+                        del views[view]
+                for inflight in [k for k in self._inflight if k[0] == key and k[1] != TYPES_VIEW]:
+                    del self._inflight[inflight]
+
+    def invalidate(self):
+        """Drop everything."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._inflight.clear()
+            self._keys_by_leaf.clear()
+            self.stats["invalidations"] += 1
+
+    def observe(self, command_type: str, params: Dict[str, Any], result: Any):
+        """Drop the views a command Unity executed may have made stale."""
+        if command_type in COMPONENT_NEUTRAL_COMMANDS:
+            return
+        if command_type in OBJECT_MUTATING_COMMANDS and not params.get("set_parent"):
+            name = str(params.get(OBJECT_MUTATING_COMMANDS[command_type]) or "")
+            self.forget(name)
+            if command_type == "MODIFY_OBJECT" and any(params.get(p) is not None for p in TRANSFORM_PARAMS):
+                self.forget_descendants(name)
+            return
+        if command_type in OBJECT_CREATING_COMMANDS:
+            name = result.get("name") if isinstance(result, dict) else None
+            self.forget(str(name or params.get(OBJECT_CREATING_COMMANDS[command_type]) or ""))
+            return
+        if command_type in PLAY_MODE_COMMANDS:
+            action = str(params.get(PLAY_MODE_COMMANDS[command_type]) or "").upper()
+            if action in ("PLAY", "STOP"):
+                self.playing = action == "PLAY"
+        # Deletes and reparenting change paths; undo, scene and script changes, play mode anything
+        self.invalidate()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": config.component_cache_enabled, "objects": len(self._entries),
+                "playing": self.playing, **self.stats}
+
+# Global component cache
+_component_cache: Optional[ComponentCache] = None
+
+def get_component_cache() -> Optional[ComponentCache]:
+    """Retrieve the global component cache, or None if it is disabled in the config."""
+    global _component_cache
+    if not config.component_cache_enabled:
+        return None
+    if _component_cache is None:
+        _component_cache = ComponentCache()
+        add_command_observer(_component_cache.observe)
+    return _component_cache
+
+def _projected(request: Future, project: Callable[[Any], Any]) -> Future:
+    """A Future resolving to ``project`` applied to a request's result."""
+    future = Future()
+
+    def finish(done: Future):
+        if done.exception() is not None:
+            future.set_exception(done.exception())
+        else:
+            future.set_result(project(done.result()))
+
+    request.add_done_callback(finish)
+    return future
+
+def submit_component_types(unity, name: str) -> Future:
+    """Look up an object's component types, from the cache when possible.
+
+    Drop-in replacement for ``unity.submit("GET_OBJECT_PROPERTIES", ...)`` in
+    pre-checks that only look at ``components[*].type``.
+    """
+    cache = get_component_cache()
+    if cache is not None:
+        return cache.submit(unity, name)
+    return unity.submit("GET_OBJECT_PROPERTIES", {"name": name, "components_only": True})
+
+def submit_object_properties(unity, name: str, fields: Optional[List[str]] = None,
+                             components: Optional[List[str]] = None) -> Future:
+    """Look up a projection of an object's properties, from the cache when possible."""
+    cache = get_component_cache()
+    if cache is not None:
+        return cache.submit_properties(unity, name, fields, components)
+    params: Dict[str, Any] = {"name": name}
+    if fields is not None:
+        params["fields"] = list(fields)
+    if components is not None:
+        params["components"] = list(components)
+    return _projected(unity.submit("GET_OBJECT_PROPERTIES", params),
+                      lambda result: project_properties(result, fields, components))
+
+def submit_component_properties(unity, object_name: str, component_type: str,
+                                fields: Optional[List[str]] = None) -> Future:
+    """Look up property values of one component on an object, from the cache when possible."""
+    cache = get_component_cache()
+    if cache is not None:
+        return cache.submit_component_properties(unity, object_name, component_type, fields)
+    params: Dict[str, Any] = {"object_name": object_name, "component_type": component_type}
+    if fields is not None:
+        params["fields"] = list(fields)
+    return _projected(unity.submit("GET_COMPONENT_PROPERTIES", params),
+                      lambda result: project_component(result, fields))
+
+def has_component(properties: Dict[str, Any], component_type: str) -> bool:
+    """Whether a GET_OBJECT_PROPERTIES result lists a component of this type."""
+    return component_type in (component_types(properties) or ())
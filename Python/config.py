@@ -20,6 +20,35 @@ class ServerConfig:
     # Connection settings
     connection_timeout: float = 15.0
     buffer_size: int = 32768
+    unity_framing: str = "auto"  # "auto" negotiates length-prefixed framing, "legacy" skips the handshake
+    unity_multiplex: bool = True  # Ask the bridge for request-ID multiplexing on framed connections
+    heartbeat_interval: float = 5.0  # Seconds between idle liveness pings (0 disables the heartbeat)
+    batch_max_commands: int = 100  # Commands per BATCH frame; longer lists are split into chunks
+    stream_queue_items: int = 1000  # Items a streamed listing may read ahead of the tool consuming it
+    default_page_size: int = 200  # Page size when a listing tool is given a cursor but no limit
+    listing_history_size: int = 8  # Paged asset, script and name listings kept for their cursors
+    
+    # Scene mirror settings
+    scene_mirror_enabled: bool = True  # Answer object lookups from a local copy of the hierarchy
+    scene_mirror_max_age: float = 30.0  # Seconds before the mirror is re-seeded to pick up manual edits (0 = never)
+    scene_mirror_retry_backoff: float = 5.0  # Seconds before a seed that failed (timeout, dropped socket) is tried again
+    hierarchy_history_size: int = 4  # Hierarchy versions kept for get_hierarchy(since=...) deltas
+    
+    # Asset catalog settings
+    asset_catalog_enabled: bool = True  # Answer asset existence checks from a cached asset list
+    asset_catalog_ttl: float = 60.0  # Seconds before the asset list is reloaded (0 = only on refresh_asset_catalog)
+    asset_catalog_retry_backoff: float = 5.0  # Seconds before a load that failed (timeout, dropped socket) is tried again
+    project_path: str = ""  # Unity project root on this machine; enables the on-disk Assets index
+    project_index_poll_interval: float = 2.0  # Seconds between checks of the Assets folder for changes
+    
+    # Component cache settings
+    component_cache_enabled: bool = True  # Answer component checks and property lookups from per-object caches
+    component_cache_ttl: float = 10.0  # Seconds before an object's component types are fetched again (0 = never)
+    property_cache_ttl: float = 1.0  # Seconds before cached property values are fetched again; kept short, the editor changes them unseen (0 = never)
+    
+    # Spatial index settings
+    spatial_index_max_age: float = 30.0  # Seconds before object positions are reloaded to pick up manual edits (0 = never)
+    spatial_grid_cell_size: float = 0.0  # Grid cell edge in world units (0 = pick from object density)
     
     # Logging settings
     log_level: str = "DEBUG"
@@ -34,7 +63,27 @@ class ServerConfig:
     ollama_port: int = 11434
     ollama_model: str = "qwen2:0.5b"  # Default model
     ollama_timeout: float = 120.0  # Longer timeout for LLM operations
+    ollama_connect_timeout: float = 5.0  # Seconds to wait for a TCP connection to Ollama
+    ollama_max_connections: int = 10  # Concurrent HTTP connections to Ollama per event loop
+    ollama_max_keepalive_connections: int = 10  # Idle connections kept open for reuse
+    ollama_keepalive_expiry: float = 60.0  # Seconds an idle connection stays open
     ollama_temperature: float = 0.7
+    ollama_stream: bool = False  # Stream completions and run each command as soon as it has been generated (opt-in)
+    ollama_cache_enabled: bool = True  # Answer repeated prompts from a completion cache
+    ollama_cache_path: str = ""  # SQLite file the completion cache persists to ("" = the user's cache directory)
+    ollama_cache_max_bytes: int = 32 * 1024 * 1024  # Size bound of the completion cache; least recently used go first
+    ollama_cache_sampled: bool = False  # Also cache completions sampled at temperature > 0 (repeats get the same text)
+    ollama_session_ttl: float = 1800.0  # Seconds an idle chat session keeps its model context
+    ollama_session_max_context: int = 4096  # Context tokens after which a session starts over (keep below num_ctx)
+    ollama_keep_alive: str = "10m"  # How long Ollama keeps the model loaded after each request (negative = forever)
+    ollama_warm_up: bool = True  # Load the model at startup and keep it loaded while the editor is in use
+    ollama_keeper_interval: float = 240.0  # Seconds between keep-alive renewals (keep below ollama_keep_alive; 0 = never)
+    ollama_active_window: float = 1800.0  # Seconds after the last request or Unity command that the editor counts as in use
+    ollama_model_registry_ttl: float = 60.0  # Seconds the Ollama model list is used before refreshing it in the background
+    ollama_status_ttl: float = 30.0  # Seconds status checks answer from the last observed liveness and residency before refreshing them
+    ollama_max_concurrency: int = 1  # Generations sent to Ollama at once (match OLLAMA_NUM_PARALLEL); the rest queue
+    ollama_queue_timeout: float = 120.0  # Seconds a request may wait in the queue before it fails
+    ollama_abandon_grace: float = 5.0  # Seconds a generation keeps running after its last request gave up, for a retry to pick up
     ollama_system_prompt: str = """You are a Unity development assistant that helps control the Unity Editor via commands.
     
 When asked to perform an action in Unity, you should call the appropriate function.
@@ -0,0 +1,161 @@
+"""
+Name and tag indexes over the mirrored scene hierarchy.
+
+``FIND_OBJECTS_BY_NAME`` and ``FIND_OBJECTS_BY_TAG`` make Unity walk every
+GameObject on the editor's main thread. The scene mirror keeps a
+HierarchyIndex next to its nodes so those queries can be answered locally:
+
+* exact names map to object IDs,
+* every distinct name is broken into trigrams, so a substring query only
+  verifies the names sharing all of the query's trigrams,
+* a lazily sorted name list serves prefix queries by bisection,
+* glob patterns are narrowed by their literal prefix or longest literal run
+  before the pattern itself is matched,
+* tags map to object IDs.
+
+Scenes repeat names a lot (``Enemy (Clone)``), so the n-gram postings hold
+distinct names rather than objects. Matching is case-sensitive, like the
+bridge's ``string.Contains``.
+"""
+
+import bisect
+import fnmatch
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+NGRAM_SIZE = 3
+
+# Wildcards and character classes in fnmatch-style patterns
+_GLOB_SPECIALS = re.compile(r'\*|\?|\[[^\]]*\]')
+
+def longest_glob_literal(pattern: str) -> str:
+    """The longest run of literal characters in a glob pattern."""
+    return max(_GLOB_SPECIALS.split(pattern), key=len)
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+class HierarchyIndex:
+    """Exact, substring, prefix, glob and tag lookups over object names."""
+
+    def __init__(self):
+        self._ids_by_name: Dict[str, Dict[Any, None]] = {}  # Insertion-ordered sets of IDs
+        self._names_by_gram: Dict[str, Set[str]] = {}
+        self._ids_by_tag: Dict[str, Dict[Any, None]] = {}
+        self._sorted_names: Optional[List[str]] = []  # None until the next prefix query re-sorts
+        self._unknown_tags = 0  # Objects whose tag the bridge did not report
+
+    def __len__(self) -> int:
+        """Number of distinct names."""
+        return len(self._ids_by_name)
+
+    @property
+    def tags_complete(self) -> bool:
+        """Whether every indexed object has a known tag, so tag queries are exact."""
+        return self._unknown_tags == 0
+
+    def clear(self):
+        self._ids_by_name.clear()
+        self._names_by_gram.clear()
+        self._ids_by_tag.clear()
+        self._sorted_names = []
+        self._unknown_tags = 0
+
+    def add(self, node_id: Any, name: str, tag: Optional[str] = None):
+        """Index one object."""
+        ids = self._ids_by_name.get(name)
+        if ids is None:
+            ids = self._ids_by_name[name] = {}
+            for gram in _ngrams(name):
+                self._names_by_gram.setdefault(gram, set()).add(name)
+            self._sorted_names = None
+        ids[node_id] = None
+
+        if tag is None:
+            self._unknown_tags += 1
+        else:
+            self._ids_by_tag.setdefault(tag, {})[node_id] = None
+
+    def remove(self, node_id: Any, name: str, tag: Optional[str] = None):
+        """Drop one object from the index."""
+        ids = self._ids_by_name.get(name)
+        if ids is not None and node_id in ids:
+            del ids[node_id]
+            if not ids:
+                del self._ids_by_name[name]
+                for gram in _ngrams(name):
+                    names = self._names_by_gram.get(gram)
+                    if names is not None:
+                        names.discard(name)
+                        if not names:
+                            del self._names_by_gram[gram]
+                self._sorted_names = None
+
+        if tag is None:
+            self._unknown_tags = max(0, self._unknown_tags - 1)
+        else:
+            tagged = self._ids_by_tag.get(tag)
+            if tagged is not None:
+                tagged.pop(node_id, None)
+                if not tagged:
+                    del self._ids_by_tag[tag]
+
+    # Name queries, returning distinct names
+
+    def names_containing(self, text: str) -> List[str]:
+        """Names that contain ``text`` (all names for an empty string)."""
+        if not text:
+            return list(self._ids_by_name)
+        if len(text) < NGRAM_SIZE:
+            # Too short to have a trigram; scan the distinct names
+            return [name for name in self._ids_by_name if text in name]
+
+        postings = sorted((self._names_by_gram.get(gram) for gram in _ngrams(text)),
+                          key=lambda names: len(names) if names else 0)
+        if not postings[0]:
+            return []
+        candidates = postings[0].intersection(*postings[1:])
+        # Sharing every trigram does not guarantee the trigrams are adjacent
+        return [name for name in candidates if text in name]
+
+    def names_starting_with(self, prefix: str) -> List[str]:
+        """Names that start with ``prefix``."""
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._ids_by_name)
+        names = self._sorted_names
+        matches = []
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            matches.append(names[i])
+        return matches
+
+    def names_matching(self, pattern: str) -> List[str]:
+        """Names matching an fnmatch-style glob (``*``, ``?``, ``[...]``), case-sensitively."""
+        if not _GLOB_SPECIALS.search(pattern):
+            return [pattern] if pattern in self._ids_by_name else []
+
+        prefix = _GLOB_SPECIALS.split(pattern, 1)[0]
+        longest = longest_glob_literal(pattern)
+        if len(longest) >= NGRAM_SIZE and len(longest) > len(prefix):
+            candidates: Iterable[str] = self.names_containing(longest)
+        elif prefix:
+            candidates = self.names_starting_with(prefix)
+        else:
+            candidates = self._ids_by_name
+        regex = re.compile(fnmatch.translate(pattern))
+        return [name for name in candidates if regex.match(name)]
+
+    # ID lookups
+
+    def ids_named(self, name: str) -> List[Any]:
+        """IDs of the objects called exactly ``name``, in the order they were indexed."""
+        return list(self._ids_by_name.get(name, ()))
+
+    def ids_for_names(self, names: Iterable[str]) -> List[Any]:
+        """IDs of every object carrying one of ``names``."""
+        return [node_id for name in names for node_id in self._ids_by_name.get(name, ())]
+
+    def ids_tagged(self, tag: str) -> List[Any]:
+        """IDs of the objects with this tag."""
+        return list(self._ids_by_tag.get(tag, ()))
@@ -0,0 +1,216 @@
+"""
+Versioned snapshots of the scene hierarchy for delta ``get_hierarchy`` calls.
+
+Agents call ``get_hierarchy`` over and over during a session, and a large
+scene's tree is megabytes of JSON that barely changes between calls. Each
+hierarchy handed out is tagged with a version, and a flat snapshot of it
+(node -> name and parent) is kept for the last ``config.hierarchy_history_size``
+versions. ``get_hierarchy(since=version)`` then returns only the nodes added,
+reparented, renamed or removed since that version, to be applied in that
+order. A full tree is returned
+instead when the version is unknown (too old, or from before a server restart)
+or when the delta would not be much smaller than the tree.
+
+Nodes are identified by the instance ID the bridge reports. Bridges that send
+no IDs get path keys (``Level/Spawns/Enemy``, with ``#2``, ``#3``... appended
+to repeated paths), so with them a rename or a move shows up as a removal
+plus an addition.
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from config import config
+from scene_mirror import hierarchy_roots, CHILD_KEYS, NODE_ID_KEYS
+from pagination import decode_cursor, paginate
+
+logger = logging.getLogger("UnityMCP.HierarchyVersions")
+
+# Node key -> (name, parent key), in pre-order so parents come before their children
+Snapshot = Dict[Any, Tuple[str, Any]]
+
+def snapshot_hierarchy(roots: List[Any]) -> Snapshot:
+    """Flatten a GET_HIERARCHY root list into a snapshot."""
+    snapshot: Snapshot = {}
+    paths: Dict[Any, str] = {}  # Only built for nodes without an instance ID
+    seen_paths: Dict[str, int] = {}
+    # The ID and child keys this bridge uses, found on the first node that has them
+    id_key = child_key = None
+    # Iterative walk: deep hierarchies must not hit the recursion limit
+    stack = [(raw, None) for raw in reversed(roots)]
+    while stack:
+        raw, parent_key = stack.pop()
+        key = children = None
+        if isinstance(raw, dict):
+            name = raw.get("name")
+            key = raw.get(id_key) if id_key else None
+            if key is None:
+                id_key = next((k for k in NODE_ID_KEYS if raw.get(k) is not None), id_key)
+                key = raw.get(id_key) if id_key else None
+            children = raw.get(child_key) if child_key else None
+            if children is None:
+                child_key = next((k for k in CHILD_KEYS if isinstance(raw.get(k), list)), child_key)
+                children = raw.get(child_key) if child_key else None
+        else:
+            name = raw
+        if not name or not isinstance(name, (str, int, float)):
+            continue
+        name = str(name)
+        if key is None or key in snapshot:
+            parent_path = _path(snapshot, parent_key, paths) if parent_key is not None else None
+            path = name if parent_path is None else f"{parent_path}/{name}"
+            count = seen_paths.get(path, 0) + 1
+            seen_paths[path] = count
+            key = path if count == 1 else f"{path}#{count}"
+            paths[key] = path
+        snapshot[key] = (name, parent_key)
+        if children:
+            stack.extend((child, key) for child in reversed(children))
+    return snapshot
+
+def _path(snapshot: Snapshot, key: Any, paths: Dict[Any, str]) -> str:
+    """Hierarchy path of a node, memoised in ``paths``."""
+    chain = []
+    while key is not None and key not in paths:
+        chain.append(key)
+        key = snapshot[key][1]
+    path = paths.get(key) if key is not None else None
+    for node in reversed(chain):
+        name = snapshot[node][0]
+        path = name if path is None else f"{path}/{name}"
+        paths[node] = path
+    return path
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Dict[str, List[Any]]:
+    """Changes that turn ``old`` into ``new``.
+
+    Returns:
+        Dict with ``added`` (every new node, parents first), ``removed`` (the
+        roots of removed subtrees), ``renamed`` and ``reparented`` lists. They
+        apply in the order added, reparented, renamed, removed: a node moved
+        out of a subtree that was then removed is only reparented.
+    """
+    paths: Dict[Any, str] = {}
+    added, renamed, reparented = [], [], []
+    for key, (name, parent) in new.items():
+        previous = old.get(key)
+        if previous is None:
+            added.append({"id": key, "name": name, "parent": parent, "path": _path(new, key, paths)})
+            continue
+        if previous[0] != name:
+            renamed.append({"id": key, "name": name, "path": _path(new, key, paths)})
+        if previous[1] != parent:
+            reparented.append({"id": key, "parent": parent, "path": _path(new, key, paths)})
+    # Removing a node removes its subtree, so only report the topmost removed nodes
+    removed = [key for key, (_, parent) in old.items()
+               if key not in new and (parent is None or parent in new)]
+    return {"added": added, "removed": removed, "renamed": renamed, "reparented": reparented}
+
+class HierarchyVersions:
+    """Recent hierarchy snapshots, by version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex[:8]  # Versions from an earlier server run never match
+        self._counter = 0
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self.stats = {"full": 0, "deltas": 0, "resyncs": 0}
+
+    @property
+    def latest(self) -> Optional[str]:
+        return next(reversed(self._snapshots), None)
+
+    def record(self, snapshot: Snapshot) -> str:
+        """Store a snapshot and return its version (the latest one, if nothing changed)."""
+        with self._lock:
+            latest = self.latest
+            if latest is not None and self._snapshots[latest] == snapshot:
+                return latest
+            self._counter += 1
+            version = f"{self._epoch}-{self._counter}"
+            self._snapshots[version] = snapshot
+            while len(self._snapshots) > max(1, config.hierarchy_history_size):
+                self._snapshots.popitem(last=False)
+            return version
+
+    def get(self, version: str) -> Optional[Snapshot]:
+        with self._lock:
+            return self._snapshots.get(version)
+
+    def get_hierarchy(self, unity, since: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch the hierarchy, as a delta against ``since`` when possible.
+
+        Args:
+            unity: Connection to fetch GET_HIERARCHY over
+            since: Version returned by an earlier call
+
+        Returns:
+            The GET_HIERARCHY result plus ``version`` and ``full: True``, or
+            ``{"version", "since", "full": False, "added", "removed", "renamed",
+            "reparented"}`` when a delta against ``since`` is smaller
+        """
+        result = unity.send_command("GET_HIERARCHY")
+        roots = hierarchy_roots(result)
+        if roots is None:
+            # Nothing to version; hand back whatever the bridge said
+            return result
+
+        snapshot = snapshot_hierarchy(roots)
+        version = self.record(snapshot)
+        previous = self.get(since) if since else None
+        if previous is not None:
+            delta = diff_snapshots(previous, snapshot)
+            changes = sum(len(items) for items in delta.values())
+            if changes <= len(snapshot) // 2:
+                self.stats["deltas"] += 1
+                return {"version": version, "since": since, "full": False, **delta}
+        if since:
+            self.stats["resyncs"] += 1
+            logger.debug(f"Full hierarchy resync for version {since}")
+
+        self.stats["full"] += 1
+        full = dict(result) if isinstance(result, dict) else {"hierarchy": result}
+        full.update({"version": version, "full": True})
+        return full
+
+    def get_hierarchy_page(self, unity, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of the hierarchy as flat nodes, parents before their children.
+
+        The first page fetches the hierarchy and records a version; the cursor
+        carries that version, so later pages come from the same snapshot
+        without asking Unity again.
+
+        Returns:
+            Dict with the ``version``, the page's ``items`` (id, name, parent
+            id and path of each node) and the ``next_cursor``
+        """
+        version, _ = decode_cursor(cursor)
+        if version is None:
+            roots = hierarchy_roots(unity.send_command("GET_HIERARCHY"))
+            if roots is None:
+                raise ValueError("Unity did not return a hierarchy")
+            version = self.record(snapshot_hierarchy(roots))
+        snapshot = self.get(version)
+        if snapshot is None:
+            raise ValueError(f"Hierarchy version {version} has expired; start again without a cursor")
+
+        page = paginate(snapshot.items(), limit, cursor, version)
+        paths: Dict[Any, str] = {}
+        page["items"] = [{"id": key, "name": name, "parent": parent, "path": _path(snapshot, key, paths)}
+                         for key, (name, parent) in page["items"]]
+        return {"version": version, **page}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"versions": len(self._snapshots), "latest": self.latest, **self.stats}
+
+# Global hierarchy versions
+_hierarchy_versions: Optional[HierarchyVersions] = None
+
+def get_hierarchy_versions() -> HierarchyVersions:
+    """Retrieve the global hierarchy version history."""
+    global _hierarchy_versions
+    if _hierarchy_versions is None:
+        _hierarchy_versions = HierarchyVersions()
+    return _hierarchy_versions
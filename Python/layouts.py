@@ -0,0 +1,177 @@
+"""
+Procedural placement layouts for bulk object creation.
+
+Each layout turns a handful of parameters into an N x 3 array of world
+positions (and, where the layout implies one, an N x 3 array of rotations),
+computed with NumPy. Layouts lie in the XZ plane around ``origin``; only the
+heightmap layout varies Y.
+
+* ``grid``: ``count`` points in rows of ``columns``, ``spacing`` apart
+* ``ring``: ``count`` points on a circle of ``radius``, each turned to face outwards
+* ``poisson``: up to ``count`` random points in a ``size`` rectangle, no two
+  closer than ``min_distance`` (Poisson-disk sampling, Bridson's algorithm)
+* ``heightmap``: one point per cell of a 2D ``heights`` array, ``spacing`` apart,
+  raised by ``height * height_scale``
+"""
+
+import inspect
+import math
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Refuse layouts larger than this; the bridge would take minutes to create them anyway
+MAX_LAYOUT_POINTS = 100_000
+
+# Candidates tried around each active point before it is retired (Bridson's k)
+_POISSON_ATTEMPTS = 30
+
+# Grid cells around an active point that can hold a point within min_distance of one of its
+# candidates (candidates lie up to 2 * min_distance away, and a cell is min_distance / sqrt(2) wide)
+_WINDOW = 5
+
+Layout = Tuple[np.ndarray, Optional[np.ndarray]]  # Positions, rotations (or None)
+
+def _origin(origin: Optional[Sequence[float]]) -> np.ndarray:
+    point = np.zeros(3) if origin is None else np.asarray(origin, dtype=float)
+    if point.shape != (3,) or not np.isfinite(point).all():
+        raise ValueError("origin must be [x, y, z]")
+    return point
+
+def _count(count: int) -> int:
+    if not 1 <= int(count) <= MAX_LAYOUT_POINTS:
+        raise ValueError(f"count must be between 1 and {MAX_LAYOUT_POINTS}")
+    return int(count)
+
+def grid_layout(count: int, spacing: float = 2.0, columns: Optional[int] = None,
+                origin: Optional[Sequence[float]] = None) -> Layout:
+    """Rows of ``columns`` points (square by default), centred on ``origin``."""
+    count = _count(count)
+    columns = int(columns) if columns else math.ceil(math.sqrt(count))
+    if columns < 1:
+        raise ValueError("columns must be at least 1")
+    rows = math.ceil(count / columns)
+    row, column = np.divmod(np.arange(count), columns)
+    positions = np.zeros((count, 3))
+    positions[:, 0] = (column - (columns - 1) / 2) * spacing
+    positions[:, 2] = (row - (rows - 1) / 2) * spacing
+    return positions + _origin(origin), None
+
+def ring_layout(count: int, radius: float = 10.0, start_angle: float = 0.0,
+                origin: Optional[Sequence[float]] = None) -> Layout:
+    """Points evenly spaced on a circle around ``origin``, rotated to face away from it."""
+    count = _count(count)
+    angles = np.radians(start_angle) + np.arange(count) * (2 * math.pi / count)
+    positions = np.zeros((count, 3))
+    positions[:, 0] = radius * np.sin(angles)
+    positions[:, 2] = radius * np.cos(angles)
+    rotations = np.zeros((count, 3))
+    rotations[:, 1] = np.degrees(angles) % 360
+    return positions + _origin(origin), rotations
+
+def poisson_layout(count: int, min_distance: float = 2.0, size: Sequence[float] = (50.0, 50.0),
+                   seed: Optional[int] = None, origin: Optional[Sequence[float]] = None) -> Layout:
+    """Up to ``count`` points in a ``size`` = [width, depth] rectangle centred on ``origin``.
+
+    Fewer points come back when the rectangle cannot fit ``count`` of them.
+    """
+    count = _count(count)
+    if min_distance <= 0:
+        raise ValueError("min_distance must be positive")
+    width, depth = (float(v) for v in size)
+    if width <= 0 or depth <= 0:
+        raise ValueError("size must be a positive [width, depth]")
+    rng = np.random.default_rng(seed)
+    cell = min_distance / math.sqrt(2)  # At most one point per cell
+    grid = np.full((math.ceil(width / cell), math.ceil(depth / cell)), -1, dtype=np.int64)
+    points = np.empty((count, 2))
+    accepted = 0
+
+    def accept(point) -> int:
+        nonlocal accepted
+        points[accepted] = point
+        grid[int(point[0] / cell), int(point[1] / cell)] = accepted
+        accepted += 1
+        return accepted - 1
+
+    active = [accept(rng.uniform((0, 0), (width, depth)))]
+    while active and accepted < count:
+        slot = int(rng.integers(len(active)))
+        base = points[active[slot]]
+        # All candidates around this point at once, in the annulus [r, 2r)
+        angles = rng.uniform(0, 2 * math.pi, _POISSON_ATTEMPTS)
+        radii = min_distance * np.sqrt(rng.uniform(1, 4, _POISSON_ATTEMPTS))
+        candidates = base + np.column_stack((radii * np.cos(angles), radii * np.sin(angles)))
+        inside = (candidates >= 0).all(axis=1) & (candidates[:, 0] < width) & (candidates[:, 1] < depth)
+        candidates = candidates[inside]
+        # Every accepted point that could be too close to any candidate, tested in one pass
+        gx, gy = int(base[0] / cell), int(base[1] / cell)
+        neighbours = grid[max(gx - _WINDOW, 0):gx + _WINDOW + 1, max(gy - _WINDOW, 0):gy + _WINDOW + 1].ravel()
+        neighbours = neighbours[neighbours >= 0]
+        distances = ((candidates[:, None, :] - points[neighbours][None, :, :]) ** 2).sum(axis=2)
+        free = np.flatnonzero((distances >= min_distance ** 2).all(axis=1))
+        if len(free):
+            active.append(accept(candidates[free[0]]))
+        else:
+            active[slot] = active[-1]
+            active.pop()
+
+    positions = np.zeros((accepted, 3))
+    positions[:, 0] = points[:accepted, 0] - width / 2
+    positions[:, 2] = points[:accepted, 1] - depth / 2
+    return positions + _origin(origin), None
+
+def heightmap_layout(heights: Sequence[Sequence[float]], spacing: float = 1.0, height_scale: float = 1.0,
+                     origin: Optional[Sequence[float]] = None) -> Layout:
+    """One point per cell of ``heights`` (rows along Z, columns along X), centred on ``origin``."""
+    values = np.asarray(heights, dtype=float)
+    if values.ndim != 2 or not values.size:
+        raise ValueError("heights must be a non-empty 2D array")
+    if not np.isfinite(values).all():
+        raise ValueError("heights must be finite")
+    _count(values.size)
+    rows, columns = values.shape
+    row, column = np.meshgrid(np.arange(rows), np.arange(columns), indexing="ij")
+    positions = np.column_stack((
+        ((column - (columns - 1) / 2) * spacing).ravel(),
+        (values * height_scale).ravel(),
+        ((row - (rows - 1) / 2) * spacing).ravel()
+    ))
+    return positions + _origin(origin), None
+
+LAYOUTS = {
+    "grid": grid_layout,
+    "ring": ring_layout,
+    "poisson": poisson_layout,
+    "heightmap": heightmap_layout
+}
+
+def generate_layout(spec: Dict[str, Any]) -> Layout:
+    """Compute a layout from a ``{"kind": ..., **parameters}`` dict.
+
+    Raises:
+        ValueError: For an unknown kind, unknown parameters or invalid values
+    """
+    params = dict(spec or {})
+    kind = params.pop("kind", None)
+    layout = LAYOUTS.get(kind)
+    if layout is None:
+        raise ValueError(f"Unknown layout kind '{kind}'; expected one of {', '.join(LAYOUTS)}")
+    accepted = inspect.signature(layout).parameters
+    unknown = sorted(set(params) - set(accepted))
+    if unknown:
+        raise ValueError(f"Unknown {kind} layout parameters: {', '.join(unknown)}; "
+                         f"expected {', '.join(accepted)}")
+    missing = [name for name, param in accepted.items() if param.default is param.empty and name not in params]
+    if missing:
+        raise ValueError(f"The {kind} layout needs {', '.join(missing)}")
+    positions, rotations = layout(**params)
+    # Drop floating-point noise such as sin(pi) = 1.2e-16 before it reaches the scene
+    return np.round(positions, 6) + 0.0, None if rotations is None else np.round(rotations, 6) + 0.0
+
+def layout_to_lists(layout: Layout, decimals: int = 4) -> Dict[str, List[List[float]]]:
+    """A layout as JSON-ready lists, rounded to ``decimals``."""
+    positions, rotations = layout
+    result = {"positions": np.round(positions, decimals).tolist()}
+    if rotations is not None:
+        result["rotations"] = np.round(rotations, decimals).tolist()
+    return result
@@ -0,0 +1,363 @@
+"""
+Mock Unity bridge for exercising the Python side without a running editor.
+
+The mock listens on a TCP port and speaks the same wire protocol as the Unity
+MCP bridge: legacy unframed JSON by default, switching to length-prefixed
+framing (and optionally request-ID multiplexing and ``BATCH`` commands) when a
+client sends a ``HANDSHAKE`` and the feature is enabled. Commands are dispatched to plain
+Python handlers registered per command type; an optional per-command latency
+stands in for the editor's main-thread queue.
+
+Run it standalone with ``python mock_bridge.py --port 6400`` to point the MCP
+server at it. ``SyntheticScene`` serves a generated hierarchy of any size
+(``--scene-objects``) and can change part of it between calls, for
+benchmarking hierarchy queries.
+"""
+
+import argparse
+import json
+import logging
+import random
+import socket
+import socketserver
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+from unity_protocol import (
+    FRAMING_LEGACY, FRAMING_LENGTH_PREFIX, FRAME_HEADER, HANDSHAKE_COMMAND, BATCH_COMMAND,
+    PING_PAYLOAD, PONG_RESPONSE, PROTOCOL_VERSION, encode_frame, decode_frame_header
+)
+
+logger = logging.getLogger("UnityMCP.MockBridge")
+
+CommandHandler = Callable[[Dict[str, Any]], Any]
+
+class _BridgeRequestHandler(socketserver.BaseRequestHandler):
+    """Serves one client connection for a MockUnityBridge."""
+
+    def setup(self):
+        self.server.bridge._track(self.request)
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.framing = FRAMING_LEGACY
+        self.multiplexed = False
+        self.buffer = bytearray()
+        self.write_lock = threading.Lock()
+
+    def _read_more(self) -> bool:
+        chunk = self.request.recv(65536)
+        if not chunk:
+            return False
+        self.buffer.extend(chunk)
+        return True
+
+    def _read_legacy_message(self) -> Optional[bytes]:
+        """Read one bare JSON document (or ``ping``) from the stream."""
+        decoder = json.JSONDecoder()
+        while True:
+            text = bytes(self.buffer).lstrip()
+            skipped = len(self.buffer) - len(text)
+            if text.startswith(PING_PAYLOAD):
+                del self.buffer[:skipped + len(PING_PAYLOAD)]
+                return PING_PAYLOAD
+            if text:
+                try:
+                    decoded = text.decode('utf-8')
+                    _, end = decoder.raw_decode(decoded)
+                    consumed = len(decoded[:end].encode('utf-8'))
+                    del self.buffer[:skipped + consumed]
+                    return text[:consumed]
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    pass
+            if not self._read_more():
+                return None
+
+    def _read_framed_message(self) -> Optional[bytes]:
+        """Read one length-prefixed message from the stream."""
+        while len(self.buffer) < FRAME_HEADER.size:
+            if not self._read_more():
+                return None
+        length = decode_frame_header(bytes(self.buffer[:FRAME_HEADER.size]))
+        while len(self.buffer) < FRAME_HEADER.size + length:
+            if not self._read_more():
+                return None
+        payload = bytes(self.buffer[FRAME_HEADER.size:FRAME_HEADER.size + length])
+        del self.buffer[:FRAME_HEADER.size + length]
+        return payload
+
+    def _write(self, response: Dict[str, Any]):
+        data = json.dumps(response).encode('utf-8')
+        if self.framing == FRAMING_LENGTH_PREFIX:
+            data = encode_frame(data)
+        with self.write_lock:
+            self.request.sendall(data)
+
+    def _dispatch(self, command: Dict[str, Any]):
+        try:
+            self._write(self.server.bridge.handle_command(command))
+        except OSError:
+            pass
+
+    def handle(self):
+        bridge: MockUnityBridge = self.server.bridge
+        while True:
+            try:
+                if self.framing == FRAMING_LENGTH_PREFIX:
+                    message = self._read_framed_message()
+                else:
+                    message = self._read_legacy_message()
+            except (ConnectionError, OSError):
+                return
+            if message is None:
+                return
+
+            if message.strip() == PING_PAYLOAD:
+                self._write(PONG_RESPONSE)
+                continue
+
+            try:
+                command = json.loads(message.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                self._write({"status": "error", "error": "Invalid JSON format"})
+                continue
+
+            if command.get("type") == HANDSHAKE_COMMAND and bridge.supports_framing:
+                params = command.get("params", {})
+                framing = FRAMING_LENGTH_PREFIX if FRAMING_LENGTH_PREFIX in params.get("framing", []) else FRAMING_LEGACY
+                multiplexed = (framing == FRAMING_LENGTH_PREFIX and bridge.supports_multiplex
+                               and bool(params.get("multiplex")))
+                # The handshake reply still goes out in the old framing
+                self._write({"status": "success", "result": {
+                    "protocol_version": PROTOCOL_VERSION,
+                    "framing": framing,
+                    "multiplex": multiplexed,
+                    "batch": framing == FRAMING_LENGTH_PREFIX and bridge.supports_batch
+                }})
+                self.framing = framing
+                self.multiplexed = multiplexed
+                continue
+
+            if self.multiplexed:
+                # Replies go out as each command finishes, possibly out of order
+                threading.Thread(target=self._dispatch, args=(command,), daemon=True).start()
+            else:
+                self._write(bridge.handle_command(command))
+
+class MockUnityBridge:
+    """In-process stand-in for the Unity MCP bridge."""
+
+    def __init__(self, host: str = "localhost", port: int = 0, supports_framing: bool = True,
+                 supports_multiplex: bool = True, supports_batch: bool = True, latency: float = 0.0):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            supports_framing: Whether to accept the length-prefixed framing handshake
+            supports_multiplex: Whether to accept request-ID multiplexing on framed connections
+            supports_batch: Whether to execute BATCH commands
+            latency: Seconds each command takes to execute
+        """
+        self.host = host
+        self.port = port
+        self.supports_framing = supports_framing
+        self.supports_multiplex = supports_multiplex
+        self.supports_batch = supports_batch
+        self.latency = latency
+        self.handlers: Dict[str, CommandHandler] = {"ping": lambda params: {"message": "pong"}}
+        self.received: List[Dict[str, Any]] = []  # Every command seen, in arrival order
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, command_type: str, handler: CommandHandler):
+        """Register a handler returning the ``result`` payload for a command type."""
+        self.handlers[command_type] = handler
+
+    def handle_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one command through its handler and build the response envelope."""
+        with self._lock:
+            self.received.append(command)
+        if self.latency:
+            time.sleep(self.latency)
+
+        response = self._execute(command)
+        # Echo the request ID so multiplexed clients can match the reply
+        if "id" in command:
+            response["id"] = command["id"]
+        return response
+
+    def _execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        command_type = command.get("type")
+        params = command.get("params") or {}
+
+        # A batch runs all of its items in one editor tick, each isolated from the others
+        if command_type == BATCH_COMMAND and self.supports_batch:
+            results = [self._execute(item) for item in params.get("commands", [])]
+            return {"status": "success", "result": {"results": results}}
+
+        handler = self.handlers.get(command_type)
+        if handler is None:
+            return {"status": "error", "error": f"Unknown command type: {command_type}"}
+        try:
+            return {"status": "success", "result": handler(params)}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    def _track(self, conn):
+        with self._lock:
+            self._connections.add(conn)
+
+    def start(self) -> int:
+        """Start serving in a background thread and return the bound port."""
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), _BridgeRequestHandler)
+        self._server.daemon_threads = True
+        self._server.bridge = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Unity bridge listening on {self.host}:{self.port}")
+        return self.port
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        # Drop live client connections too, like an editor that went away
+        self.drop_connections()
+
+    def drop_connections(self):
+        """Close every client connection but keep listening, like the editor during a domain reload."""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+                conn.close()
+            except OSError:
+                pass
+
+    def __enter__(self) -> "MockUnityBridge":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class SyntheticScene:
+    """A generated scene hierarchy, served through GET_HIERARCHY."""
+
+    NAMES = ["Enemy", "Tree", "Rock", "Crate", "Lamp", "Wall", "Coin", "Spawner", "Light", "Trigger"]
+
+    def __init__(self, objects: int = 50_000, roots: int = 100, seed: int = 0):
+        """
+        Args:
+            objects: Number of GameObjects to generate
+            roots: How many of them sit at the scene root
+            seed: Random seed, so runs are repeatable
+        """
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self._next_id = 1000
+        self.names: Dict[int, str] = {}
+        self.positions: Dict[int, List[float]] = {}  # World positions
+        self.parents: Dict[int, Optional[int]] = {}
+        self.children: Dict[Optional[int], List[int]] = {None: []}
+        ids = []
+        for i in range(objects):
+            # Attach to a recent object, which gives a mix of deep chains and wide groups
+            parent = None if i < roots else ids[self.rng.randrange(max(0, i - 2000), i)]
+            ids.append(self._add(parent))
+
+    def _add(self, parent: Optional[int]) -> int:
+        node_id = self._next_id
+        self._next_id += 1
+        self.names[node_id] = f"{self.rng.choice(self.NAMES)}_{node_id}"
+        # Roots spread over a 2km square, children scattered around their parent
+        if parent is None:
+            x, y, z = self.rng.uniform(-1000, 1000), self.rng.uniform(0, 50), self.rng.uniform(-1000, 1000)
+        else:
+            x, y, z = (v + self.rng.uniform(-10, 10) for v in self.positions[parent])
+        self.positions[node_id] = [round(x, 3), round(y, 3), round(z, 3)]
+        self.parents[node_id] = parent
+        self.children[node_id] = []
+        self.children[parent].append(node_id)
+        return node_id
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def hierarchy(self, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """GET_HIERARCHY handler: the tree with names, instance IDs and children (and positions if asked)."""
+        transforms = bool((params or {}).get("include_transforms"))
+        with self.lock:
+            def build(node_id):
+                node = {"name": self.names[node_id], "instanceID": node_id,
+                        "children": [build(child) for child in self.children[node_id]]}
+                if transforms:
+                    node["position"] = self.positions[node_id]
+                return node
+            return {"hierarchy": [build(root) for root in self.children[None]]}
+
+    def _in_subtree(self, node_id: Optional[int], root: int) -> bool:
+        while node_id is not None:
+            if node_id == root:
+                return True
+            node_id = self.parents[node_id]
+        return False
+
+    def _remove(self, node_id: int):
+        self.children[self.parents[node_id]].remove(node_id)
+        stack = [node_id]
+        while stack:
+            current = stack.pop()
+            stack.extend(self.children.pop(current))
+            del self.names[current]
+            del self.positions[current]
+            del self.parents[current]
+
+    def mutate(self, changes: int):
+        """Apply ``changes`` random adds, removes, renames and reparents."""
+        with self.lock:
+            for _ in range(changes):
+                ids = list(self.names)
+                node_id = self.rng.choice(ids)
+                kind = self.rng.randrange(4)
+                if kind == 0:
+                    self._add(node_id)
+                elif kind == 1 and not self.children[node_id]:
+                    self._remove(node_id)
+                elif kind == 2:
+                    self.names[node_id] = f"{self.rng.choice(self.NAMES)}_{node_id}_renamed"
+                else:
+                    parent = self.rng.choice(ids)
+                    if self._in_subtree(parent, node_id):
+                        continue
+                    self.children[self.parents[node_id]].remove(node_id)
+                    self.parents[node_id] = parent
+                    self.children[parent].append(node_id)
+
+    def install(self, bridge: "MockUnityBridge"):
+        """Serve this scene from a bridge."""
+        bridge.register("GET_HIERARCHY", self.hierarchy)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Unity MCP bridge")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6400)
+    parser.add_argument("--legacy", action="store_true", help="Reject the framing handshake")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each command takes")
+    parser.add_argument("--scene-objects", type=int, default=0, help="Serve a synthetic scene of this many objects")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    bridge = MockUnityBridge(args.host, args.port, supports_framing=not args.legacy, latency=args.latency)
+    if args.scene_objects:
+        SyntheticScene(args.scene_objects).install(bridge)
+    bridge.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        bridge.stop()
@@ -0,0 +1,265 @@
+"""
+Stub Ollama server for exercising the Python side without a running model.
+
+The stub speaks enough of the Ollama HTTP API for ``OllamaConnection``:
+``GET /`` answers that the server is running, ``GET /api/tags`` lists the
+configured models and ``POST /api/generate``
+answers with a canned completion. ``latency`` stands in for prompt
+processing (time to the first token) and ``token_latency`` for generating
+each further token; as with Ollama, the completion is streamed as NDJSON
+chunks unless the request sets ``"stream": false``. Prompt evaluation costs
+``prompt_token_latency`` per prompt token; like Ollama, the final response
+carries a ``context`` token array, and a request that passes it back only
+pays for its own new tokens. A model that is not loaded first costs
+``load_latency``; it then stays loaded for the request's ``keep_alive``
+(five minutes by default), and ``GET /api/ps`` lists the loaded models. A
+generate without a prompt only loads the model. It speaks HTTP/1.1 with keep-alive, and counts the TCP
+connections it accepts so benchmarks can see whether clients reuse them.
+
+Run it standalone with ``python mock_ollama.py --port 11434`` to point the MCP
+server at it.
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger("UnityMCP.MockOllama")
+
+# Builds the completion text for a /api/generate request body
+ResponseFactory = Callable[[Dict[str, Any]], str]
+
+# Rough stand-in for a tokenizer: words with their trailing whitespace, and punctuation on its own
+_TOKEN_PATTERN = re.compile(r'\w+\s*|[^\w\s]\s*|\s+')
+
+_DURATION_UNITS = {"": 1.0, "ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def _keep_alive_seconds(value: Any) -> float:
+    """Seconds a keep_alive value (5, "30s", "10m", "-1m") keeps a model loaded."""
+    if value is None:
+        return 300.0
+    match = re.fullmatch(r'(-?[\d.]+)(ms|s|m|h|)', str(value).strip())
+    seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2)] if match else 300.0
+    return math.inf if seconds < 0 else seconds
+
+class _OllamaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't stall the body
+
+    def setup(self):
+        super().setup()
+        self.server.stub._count_connection()
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up on the request
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return {}
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, payload: Any):
+        line = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _stream_completion(self, model: str, tokens: List[str], token_latency: float, final: Dict[str, Any]):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        start = time.perf_counter()
+        for index, token in enumerate(tokens):
+            # Keep to a steady token rate, however long each write took
+            delay = start + index * token_latency - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._send_chunk({"model": model, "response": token, "done": False})
+        self._send_chunk({**final, "eval_duration": int((time.perf_counter() - start) * 1e9)})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        stub: MockOllamaServer = self.server.stub
+        stub._record("GET", self.path, {})
+        if self.path == "/":
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": name, "model": name, "size": 0, "details": {}}
+                                             for name in stub.models]})
+        elif self.path == "/api/ps":
+            self._send_json(200, {"models": [{"name": name, "model": name, "expires_at": expires_at, "size_vram": 0}
+                                             for name, expires_at in stub.loaded_models().items()]})
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        stub: MockOllamaServer = self.server.stub
+        body = self._read_body()
+        stub._record("POST", self.path, body)
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        if body.get("model") not in stub.models:
+            self._send_json(404, {"error": f"model '{body.get('model')}' not found"})
+            return
+        load_duration = stub._load(body["model"], body.get("keep_alive"))
+        if not body.get("prompt"):
+            self._send_json(200, {"model": body["model"], "response": "", "done": True, "done_reason": "load",
+                                  "load_duration": load_duration})
+            return
+        start = time.perf_counter()
+        # Only the tokens not already in the passed-back context need evaluating
+        context = [token for token in body.get("context") or [] if isinstance(token, int)]
+        prompt_tokens = len(_TOKEN_PATTERN.findall(body.get("system") or "")) + \
+            len(_TOKEN_PATTERN.findall(body.get("prompt") or ""))
+        time.sleep(stub.latency + prompt_tokens * stub.prompt_token_latency)
+        prompt_eval_duration = int((time.perf_counter() - start) * 1e9)
+        tokens = _TOKEN_PATTERN.findall(stub.respond(body))
+        final = {
+            "model": body["model"], "response": "", "done": True,
+            "context": context + list(range(len(context), len(context) + prompt_tokens + len(tokens))),
+            "load_duration": load_duration,
+            "prompt_eval_count": prompt_tokens, "prompt_eval_duration": prompt_eval_duration,
+            "eval_count": len(tokens)
+        }
+        if body.get("stream", True):
+            self._stream_completion(body["model"], tokens, stub.token_latency, final)
+            return
+        if stub.token_latency:
+            time.sleep(stub.token_latency * max(len(tokens) - 1, 0))
+        self._send_json(200, {**final, "response": "".join(tokens),
+                              "eval_duration": int((time.perf_counter() - start) * 1e9) - prompt_eval_duration})
+
+class MockOllamaServer:
+    """In-process stand-in for an Ollama server."""
+
+    def __init__(self, host: str = "localhost", port: int = 0, models: Optional[List[str]] = None,
+                 latency: float = 0.0, respond: Optional[ResponseFactory] = None,
+                 token_latency: float = 0.0, prompt_token_latency: float = 0.0, load_latency: float = 0.0):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            models: Model names to report and accept (default: the qwen2:0.5b default model)
+            latency: Seconds before the first token of each completion
+            respond: Builds the completion text for a request (default: a fixed function call)
+            token_latency: Seconds to generate each token after the first
+            prompt_token_latency: Seconds to evaluate each prompt token not in the passed context
+            load_latency: Seconds to load a model that is not loaded
+        """
+        self.host = host
+        self.port = port
+        self.models = models or ["qwen2:0.5b"]
+        self.latency = latency
+        self.token_latency = token_latency
+        self.prompt_token_latency = prompt_token_latency
+        self.load_latency = load_latency
+        self.loads = 0  # Times a model was loaded
+        self._loaded: Dict[str, float] = {}  # Model -> time.time() it unloads at
+        self._load_lock = threading.Lock()
+        self.respond = respond or (lambda body: '```json\n{"function": "get_scene_info", "arguments": {}}\n```')
+        self.requests: List[Dict[str, Any]] = []  # Every request seen, in arrival order
+        self.connections = 0  # TCP connections accepted
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def _load(self, model: str, keep_alive: Any) -> int:
+        """Load a model unless it is loaded, then keep it for ``keep_alive``; return the load time in ns."""
+        with self._load_lock:  # Like Ollama, load one model at a time
+            start = time.perf_counter()
+            if self._loaded.get(model, 0) <= time.time():
+                time.sleep(self.load_latency)
+                self.loads += 1
+            self._loaded[model] = time.time() + _keep_alive_seconds(keep_alive)
+            return int((time.perf_counter() - start) * 1e9)
+
+    def loaded_models(self) -> Dict[str, str]:
+        """Loaded models and when they unload, as ISO timestamps."""
+        now = time.time()
+        with self._load_lock:
+            return {model: "forever" if math.isinf(until) else time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(until))
+                    for model, until in self._loaded.items() if until > now}
+
+    def _record(self, method: str, path: str, body: Dict[str, Any]):
+        with self._lock:
+            self.requests.append({"method": method, "path": path, "body": body})
+
+    def start(self) -> int:
+        """Start serving in a background thread and return the bound port."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _OllamaRequestHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stub Ollama server listening on {self.host}:{self.port}")
+        return self.port
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockOllamaServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub Ollama server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--model", action="append", help="Model name to serve (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds per further token")
+    parser.add_argument("--prompt-token-latency", type=float, default=0.0, help="Seconds per new prompt token")
+    parser.add_argument("--load-latency", type=float, default=0.0, help="Seconds to load a model")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stub = MockOllamaServer(args.host, args.port, models=args.model, latency=args.latency,
+                            token_latency=args.token_latency, prompt_token_latency=args.prompt_token_latency,
+                            load_latency=args.load_latency)
+    stub.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -3,16 +3,476 @@ Ollama connection module for Unity MCP.
 This module handles communication with local LLMs via Ollama.
 """
 
+import asyncio
+import hashlib
+import heapq
+import itertools
 import json
 import logging
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+import weakref
 import httpx
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Tuple
 from config import config
+from unity_connection import add_command_observer, remove_command_observer
 
 # Configure logging
 logger = logging.getLogger("UnityMCP.Ollama")
 
+def as_mcp_command(parsed: Any) -> Optional[Dict[str, Any]]:
+    """Normalize a parsed JSON object to ``{"function", "arguments"}``, or None if it is not a command."""
+    if not isinstance(parsed, dict) or not ('function' in parsed or 'name' in parsed):
+        return None
+    function_name = parsed.get('function') or parsed.get('name')
+    args = parsed.get('arguments') or parsed.get('params') or parsed.get('args') or {}
+    return {"function": function_name, "arguments": args}
+
+class CommandStreamDetector:
+    """Picks command objects out of model output while it is still being generated.
+
+    Text is fed in as it arrives. Every outermost ``{...}`` is tracked through
+    nested objects, arrays and strings, and parsed the moment its closing brace
+    arrives, so a command is available before the rest of the output has been
+    generated. Objects in a JSON array count as outermost objects; text
+    around them (prose, code fences) is ignored.
+    """
+
+    def __init__(self):
+        self._object: List[str] = []  # Pieces of the object being read
+        self._depth = 0  # Nesting depth inside that object; 0 when between objects
+        self._in_string = False
+        self._escape = False
+        self.commands: List[Dict[str, Any]] = []
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume more output; return the commands completed by it."""
+        found = []
+        start = 0 if self._depth else None
+        for index, char in enumerate(text):
+            if not self._depth:
+                if char == '{':
+                    self._depth, start = 1, index
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if not self._depth:
+                    self._object.append(text[start:index + 1])
+                    command = self._parse(''.join(self._object))
+                    self._object = []
+                    if command is not None:
+                        found.append(command)
+        if self._depth:
+            self._object.append(text[start:])
+        self.commands.extend(found)
+        return found
+
+    @staticmethod
+    def _parse(candidate: str) -> Optional[Dict[str, Any]]:
+        try:
+            return as_mcp_command(json.loads(candidate))
+        except json.JSONDecodeError:
+            return None
+
+def completion_key(model: str, system_prompt: Optional[str], prompt: str, temperature: float,
+                   options: Optional[Dict[str, Any]], context: Optional[List[int]] = None) -> str:
+    """Key for a completion request: everything that can change the completion."""
+    system_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()
+    fields = [model, system_hash, prompt, temperature, options or {}]
+    if context:
+        fields.append(hashlib.sha256(json.dumps(context).encode("utf-8")).hexdigest())
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+class _RequestCancelled(Exception):
+    """The generation others were waiting on was cancelled before it finished."""
+
+class _Flight:
+    """A generation in flight for one completion key, and how many requests wait for it."""
+
+    __slots__ = ("result", "waiters", "loop", "task", "abandon")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.result: Future = Future()  # Shared with the requests of every event loop
+        self.waiters = 1
+        self.loop = loop  # The loop running the generation task
+        self.task: Optional[asyncio.Task] = None
+        self.abandon: Optional[asyncio.TimerHandle] = None  # Cancels the task once nobody waits
+
+# Scheduling classes, most urgent first: a person waiting in a chat window goes before
+# background work, which goes before bulk batch jobs
+PRIORITIES = {"interactive": 0, "background": 1, "batch": 2}
+
+class QueueTimeout(Exception):
+    """A completion request waited in the queue past its deadline."""
+
+class CompletionScheduler:
+    """Admits generations to Ollama at most ``config.ollama_max_concurrency`` at a time.
+
+    Requests beyond the limit wait in a queue ordered by priority class, then
+    arrival. A request still queued when its deadline passes fails with
+    QueueTimeout. A cancelled request (e.g. its client disconnected) leaves
+    the queue, or gives up its slot at once if it was already running.
+    Grants are concurrent.futures.Futures, so requests from the MCP and TCP
+    servers' event loops share one queue.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue: List[Tuple[int, int, Future, str]] = []  # Heap of (rank, arrival, grant, priority)
+        self._order = itertools.count()
+        self._running = 0
+        self._waiting: Counter = Counter()  # Queued requests per priority name
+        self._waits: Dict[str, deque] = {name: deque(maxlen=1000) for name in PRIORITIES}  # Recent waits, seconds
+        self.stats = {"admitted": 0, "expired": 0, "cancelled": 0}
+
+    async def acquire(self, priority: str = "interactive", deadline: Optional[float] = None):
+        """Wait for a generation slot.
+        
+        Args:
+            priority: One of PRIORITIES
+            deadline: Seconds the request may wait (default: config.ollama_queue_timeout)
+            
+        Raises:
+            ValueError: For an unknown priority
+            QueueTimeout: If no slot came free before the deadline
+        """
+        rank = PRIORITIES.get(priority)
+        if rank is None:
+            raise ValueError(f"Unknown priority '{priority}'; expected one of {', '.join(PRIORITIES)}")
+        start = time.monotonic()
+        with self._lock:
+            if self._running < max(1, config.ollama_max_concurrency) and not any(self._waiting.values()):
+                self._running += 1
+                self._admitted(priority, 0.0)
+                return
+            grant = Future()
+            heapq.heappush(self._queue, (rank, next(self._order), grant, priority))
+            self._waiting[priority] += 1
+        try:
+            # Shielded, so giving up goes through the lock below instead of cancelling the grant directly
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(grant)),
+                                   config.ollama_queue_timeout if deadline is None else deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = not grant.cancel()  # A grant that already went through can't be cancelled
+                if not granted:
+                    self._waiting[priority] -= 1
+                    self.stats["expired" if isinstance(e, asyncio.TimeoutError) else "cancelled"] += 1
+            if not (granted and isinstance(e, asyncio.TimeoutError)):  # Else the slot came free just in time
+                if granted:
+                    self.release()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise QueueTimeout(f"No Ollama slot came free within {time.monotonic() - start:.1f}s "
+                                       f"({priority} priority)")
+                raise
+        with self._lock:
+            self._admitted(priority, time.monotonic() - start)
+
+    def _admitted(self, priority: str, waited: float):
+        self.stats["admitted"] += 1
+        self._waits[priority].append(waited)
+
+    def release(self):
+        """Give a slot back, admitting the most urgent queued request."""
+        with self._lock:
+            self._running -= 1
+            while self._queue and self._running < max(1, config.ollama_max_concurrency):
+                _, _, grant, priority = heapq.heappop(self._queue)
+                if grant.cancelled():
+                    continue  # Gave up while queued
+                self._running += 1
+                self._waiting[priority] -= 1
+                grant.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = {}
+            for name, recent in self._waits.items():
+                if recent:
+                    ordered = sorted(recent)
+                    waits[name] = {"count": len(ordered), "mean": round(sum(ordered) / len(ordered), 3),
+                                   "p95": round(ordered[math.ceil(0.95 * len(ordered)) - 1], 3),
+                                   "max": round(ordered[-1], 3)}
+            return {
+                "limit": max(1, config.ollama_max_concurrency),
+                "running": self._running,
+                "queue_depth": sum(self._waiting.values()),
+                "queued": {name: count for name, count in self._waiting.items() if count},
+                "wait_seconds": waits,
+                **self.stats
+            }
+
+class CompletionCache:
+    """Completions keyed by request, in an LRU bounded by size and persisted to SQLite.
+
+    Entries are kept in memory in least-recently-used order and written
+    through to a SQLite file, so the cache survives restarts. When the file
+    cannot be opened the cache still works, in memory only. The ``context``
+    token array of a response is not stored: it is large and only of use to
+    the session that produced it.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Key -> (text, response data as JSON, size in bytes), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+        self._open()
+
+    def _open(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS completions "
+                       "(key TEXT PRIMARY KEY, response TEXT NOT NULL, data TEXT NOT NULL, used REAL NOT NULL)")
+            rows = db.execute("SELECT key, response, data FROM completions ORDER BY used").fetchall()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Completion cache file {self.path} unavailable, caching in memory only: {str(e)}")
+            return
+        self._db = db
+        for key, text, data in rows:
+            self._add(key, text, data)
+        self._delete(self._evict())
+        logger.info(f"Loaded {len(self._entries)} cached completions ({self._bytes} bytes) from {self.path}")
+
+    def _add(self, key: str, text: str, data: str):
+        size = len(key) + len(text.encode("utf-8")) + len(data.encode("utf-8"))
+        self._entries[key] = (text, data, size)
+        self._bytes += size
+
+    def _evict(self) -> List[str]:
+        """Drop least recently used entries until the cache fits; return their keys."""
+        evicted = []
+        while self._bytes > self.max_bytes and self._entries:
+            key, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            evicted.append(key)
+        self.stats["evictions"] += len(evicted)
+        return evicted
+
+    def _write(self, sql: str, rows: List[Tuple]):
+        if self._db is None or not rows:
+            return
+        try:
+            self._db.executemany(sql, rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update completion cache file {self.path}: {str(e)}")
+
+    def _delete(self, keys: List[str]):
+        self._write("DELETE FROM completions WHERE key = ?", [(key,) for key in keys])
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """The cached (text, response data) for a key, marked as most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            self._write("UPDATE completions SET used = ? WHERE key = ?", [(time.time(), key)])
+        text, data, _ = entry
+        return text, {**json.loads(data), "cached": True}
+
+    def put(self, key: str, text: str, data: Dict[str, Any]):
+        """Store a completion, evicting the least recently used ones beyond the size bound."""
+        encoded = json.dumps({name: value for name, value in data.items() if name != "context"})
+        if len(key) + len(text.encode("utf-8")) + len(encoded.encode("utf-8")) > self.max_bytes:
+            return  # Would only evict everything else
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._add(key, text, encoded)
+            self.stats["stores"] += 1
+            evicted = self._evict()
+            if key not in evicted:
+                self._write("INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)",
+                            [(key, text, encoded, time.time())])
+            self._delete(evicted)
+
+    def clear(self):
+        """Forget every cached completion, on disk as well."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._write("DELETE FROM completions", [()])
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": config.ollama_cache_enabled,
+            "path": self.path if self._db is not None else None,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            **self.stats
+        }
+
+# Evaluation statistics of a completion, as reported by Ollama (durations in nanoseconds)
+_EVAL_FIELDS = ("prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration",
+                "load_duration", "total_duration")
+
+class OllamaSession:
+    """A conversation with the model that continues from Ollama's ``context`` each turn.
+
+    /api/generate returns the conversation so far as a ``context`` token
+    array. Passing it back with the next prompt lets Ollama reuse the state
+    it has already computed for the system prompt and earlier turns and
+    evaluate only the new prompt. The system prompt therefore goes with the
+    first turn only. The session starts over when the system prompt changes
+    or the context grows beyond ``config.ollama_session_max_context`` tokens.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.context: Optional[List[int]] = None
+        self.turns: List[Dict[str, Any]] = []  # Evaluation statistics of each finished turn
+        self.last_used = time.monotonic()
+        self._system_hash: Optional[str] = None
+        self._continued = False
+
+    def prepare(self, system_prompt: Optional[str]) -> Tuple[Optional[str], Optional[List[int]]]:
+        """The system prompt and context to send with the next turn."""
+        self.last_used = time.monotonic()
+        system_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()
+        if self.context is not None and (system_hash != self._system_hash
+                                         or len(self.context) > config.ollama_session_max_context):
+            logger.info(f"Starting session {self.session_id} over after {len(self.context)} context tokens")
+            self.context = None
+        self._system_hash = system_hash
+        self._continued = self.context is not None
+        return (None, self.context) if self._continued else (system_prompt, None)
+
+    def record(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the context a finished turn returned; return the turn's evaluation statistics."""
+        if isinstance(data.get("context"), list):
+            self.context = data["context"]
+        turn = {
+            "turn": len(self.turns) + 1,
+            "continued": self._continued,
+            **{name: data[name] for name in _EVAL_FIELDS if name in data},
+            "context_tokens": len(self.context or [])
+        }
+        self.turns.append(turn)
+        return turn
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"id": self.session_id, "turns": len(self.turns), "context_tokens": len(self.context or []),
+                "idle_seconds": round(time.monotonic() - self.last_used, 1)}
+
+# Global completion cache
+_completion_cache: Optional[CompletionCache] = None
+
+def default_cache_path() -> str:
+    """Where the completion cache persists to when ``config.ollama_cache_path`` is empty: the user's cache directory."""
+    if os.name == "nt":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/AppData/Local")
+        return os.path.join(root, "UnityMCP", "Cache", "ollama_cache.sqlite3")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/UnityMCP/ollama_cache.sqlite3")
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(root, "unity-mcp", "ollama_cache.sqlite3")
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Retrieve the global completion cache, or None if it is disabled in the config."""
+    global _completion_cache
+    if not config.ollama_cache_enabled:
+        return None
+    if _completion_cache is None:
+        _completion_cache = CompletionCache(config.ollama_cache_path or default_cache_path(),
+                                            config.ollama_cache_max_bytes)
+    return _completion_cache
+
+# A model missing from the cached list may just have been pulled; look again at most this often
+_MISSING_MODEL_REFETCH_SECONDS = 1.0
+
+class ModelRegistry:
+    """An Ollama server's model list (``/api/tags``), cached between lookups.
+
+    Once the list has been fetched, lookups never wait for Ollama: a list older
+    than ``config.ollama_model_registry_ttl`` is still answered from while a
+    refresh runs in the background. Only the first lookup, and a lookup of a
+    model the list doesn't have, fetch it on the spot.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[Dict[str, Dict[str, Any]]]]):
+        self._fetch = fetch
+        self.models: Optional[Dict[str, Dict[str, Any]]] = None  # Name -> /api/tags entry
+        self.fetched_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.stats = {"fetches": 0, "background_refreshes": 0, "failures": 0}
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self.models is None else time.monotonic() - self.fetched_at
+
+    async def refresh(self) -> bool:
+        """Fetch the model list now, keeping the previous one if that fails."""
+        self.stats["fetches"] += 1
+        try:
+            models = await self._fetch()
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"Could not list Ollama models: {str(e)}")
+            return False
+        self.models, self.fetched_at = models, time.monotonic()
+        return True
+
+    def _refresh_in_background(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self.stats["background_refreshes"] += 1
+        self._refresh_task = asyncio.get_running_loop().create_task(self.refresh())
+
+    async def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """The ``/api/tags`` entry of a model, or None if the server doesn't have it."""
+        if self.models is None or (name not in self.models and self.age > _MISSING_MODEL_REFETCH_SECONDS):
+            await self.refresh()
+        elif self.age > config.ollama_model_registry_ttl:
+            self._refresh_in_background()
+        return self.cached(name)
+
+    def cached(self, name: str) -> Optional[Dict[str, Any]]:
+        """A model's entry in the list as last fetched, without contacting Ollama."""
+        return (self.models or {}).get(name)
+
+    def current(self, name: str) -> Optional[Dict[str, Any]]:
+        """Like cached, but a list older than the TTL is refreshed in the background for next time."""
+        if self.models is not None and self.age > config.ollama_model_registry_ttl:
+            self._refresh_in_background()
+        return self.cached(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        age = self.age
+        return {"models": len(self.models or {}), "age_seconds": None if age is None else round(age, 1),
+                **self.stats}
+
 @dataclass
 class OllamaConnection:
     """Manages the connection to Ollama service."""
@@ -24,34 +484,257 @@ class OllamaConnection:
     
     def __post_init__(self):
         self.base_url = f"http://{self.host}:{self.port}"
+        # One pooled client per event loop: the MCP server and the TCP server run separate loops,
+        # and an httpx client's connections belong to the loop that opened them
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+        self._sessions: Dict[str, OllamaSession] = {}
+        # Keep-alive task per event loop, like the clients
+        self._keepers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = \
+            weakref.WeakKeyDictionary()
+        self.last_activity = time.monotonic()  # Last Ollama request or Unity command
+        self.registry = ModelRegistry(self._fetch_models)
+        # Completion requests being generated, by completion_key
+        self._in_flight: Dict[str, _Flight] = {}
+        self.request_stats = {"generations": 0, "coalesced": 0, "abandoned": 0}
+        self.scheduler = CompletionScheduler()
+        # Liveness and model residency as last observed, for status checks
+        self.reachable: Optional[bool] = None
+        self.residency: Dict[str, Any] = {"loaded": None}
+        self._reachable_at: Optional[float] = None
+        self._residency_at = 0.0
+        self._status_task: Optional[asyncio.Task] = None
         logger.info(f"Initialized Ollama connection to {self.base_url} using model {self.model}")
     
-    async def test_connection(self) -> bool:
-        """Test if Ollama is reachable and the model is available."""
+    def _client(self) -> httpx.AsyncClient:
+        """The long-lived HTTP client for the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=httpx.Timeout(self.timeout, connect=config.ollama_connect_timeout),
+                    limits=httpx.Limits(
+                        max_connections=config.ollama_max_connections,
+                        max_keepalive_connections=config.ollama_max_keepalive_connections,
+                        keepalive_expiry=config.ollama_keepalive_expiry
+                    )
+                )
+                self._clients[loop] = client
+            return client
+    
+    async def close(self):
+        """Stop the running event loop's keeper and close its HTTP client and pooled connections."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.pop(loop, None)
+            keeper = self._keepers.pop(loop, None)
+            if not self._keepers:
+                remove_command_observer(self._observe)
+        if keeper is not None:
+            keeper.cancel()
+        if client is not None:
+            await client.aclose()
+    
+    def _observed(self, reachable: bool, residency: Optional[Dict[str, Any]] = None):
+        """Record what a response, or the failure to get one, showed about Ollama and the model."""
+        now = time.monotonic()
+        self.reachable, self._reachable_at = reachable, now
+        if residency is not None:
+            self.residency, self._residency_at = residency, now
+
+    def _loaded(self) -> Dict[str, Any]:
+        """Residency once the model has just answered a request; the expiry is only known from /api/ps."""
+        return {"loaded": True, "size_vram": self.residency.get("size_vram")}
+
+    def _observe(self, command_type: str, params: Dict[str, Any], result: Any):
+        """Command observer: any Unity command except heartbeats means the editor is in use."""
+        if command_type != "ping":
+            self.last_activity = time.monotonic()
+    
+    async def warm_up(self) -> bool:
+        """Load the model into memory, or renew its residency, with an empty generate.
+        
+        Ollama keeps it loaded for config.ollama_keep_alive afterwards.
+        """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                # Check if the Ollama server is up
-                response = await client.get(f"{self.base_url}/api/tags")
-                if response.status_code != 200:
-                    logger.error(f"Ollama server returned status {response.status_code}")
-                    return False
-                
-                # Check if our model is available
-                models = response.json().get("models", [])
-                for model_info in models:
-                    if model_info.get("name") == self.model:
-                        logger.info(f"Successfully connected to Ollama, model {self.model} is available")
-                        return True
-                
-                logger.error(f"Model {self.model} not found in Ollama")
+            response = await self._client().post("/api/generate", json={
+                "model": self.model,
+                "keep_alive": config.ollama_keep_alive
+            })
+            if response.status_code != 200:
+                logger.warning(f"Could not load model {self.model}: Ollama returned status {response.status_code}")
+                self._observed(True)
                 return False
-                
+            load_seconds = response.json().get("load_duration", 0) / 1e9
+            logger.info(f"Model {self.model} is loaded (load took {load_seconds:.2f}s)")
+            self._observed(True, self._loaded())
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load model {self.model}: {str(e)}")
+            self._observed(False)
+            return False
+    
+    def start_keeper(self) -> asyncio.Task:
+        """Warm the model up and keep it loaded while the editor is in use, from a task on the running loop.
+        
+        Every config.ollama_keeper_interval seconds the keeper renews the model's
+        residency, as long as there has been an Ollama request or a Unity command
+        within config.ollama_active_window seconds; once the editor goes idle,
+        Ollama is left to unload the model when keep_alive runs out.
+        """
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            keeper = self._keepers.get(loop)
+            if keeper is None or keeper.done():
+                keeper = self._keepers[loop] = loop.create_task(self._keep_loaded())
+        add_command_observer(self._observe)
+        return keeper
+    
+    async def _keep_loaded(self):
+        await self.warm_up()
+        while config.ollama_keeper_interval > 0:
+            await asyncio.sleep(config.ollama_keeper_interval)
+            if time.monotonic() - self.last_activity <= config.ollama_active_window:
+                await self.warm_up()
+    
+    async def model_status(self) -> Dict[str, Any]:
+        """Whether the model is loaded right now, and until when, from Ollama's /api/ps."""
+        try:
+            response = await self._client().get("/api/ps")
+            if response.status_code != 200:
+                return {"loaded": None, "error": f"Ollama returned status {response.status_code}"}
+            status = {"loaded": False}
+            for model_info in response.json().get("models", []):
+                if self.model in (model_info.get("name"), model_info.get("model")):
+                    status = {"loaded": True, "expires_at": model_info.get("expires_at"),
+                              "size_vram": model_info.get("size_vram")}
+                    break
+            self._observed(True, status)
+            return status
+        except Exception as e:
+            self._observed(False)
+            return {"loaded": None, "error": str(e)}
+    
+    def session(self, session_id: str) -> OllamaSession:
+        """The chat session with this ID, started on first use; idle sessions are dropped."""
+        now = time.monotonic()
+        with self._clients_lock:
+            for stale in [key for key, session in self._sessions.items()
+                          if now - session.last_used > config.ollama_session_ttl]:
+                del self._sessions[stale]
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = OllamaSession(session_id)
+            return session
+
+    def end_session(self, session_id: str):
+        """Forget a chat session and its context."""
+        with self._clients_lock:
+            self._sessions.pop(session_id, None)
+
+    def get_session_stats(self) -> List[Dict[str, Any]]:
+        with self._clients_lock:
+            return [session.get_stats() for session in self._sessions.values()]
+
+    async def ping(self) -> bool:
+        """Check that Ollama is up, without listing its models."""
+        try:
+            # The root URL answers "Ollama is running" without touching any model
+            response = await self._client().get("/")
+            if response.status_code != 200:
+                logger.error(f"Ollama server returned status {response.status_code}")
+                self._observed(False)
+                return False
+            self._observed(True)
+            return True
         except Exception as e:
             logger.error(f"Failed to connect to Ollama: {str(e)}")
+            self._observed(False)
+            return False
+
+    async def _fetch_models(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            response = await self._client().get("/api/tags")
+        except httpx.TransportError:
+            self._observed(False)
+            raise
+        self._observed(True)
+        response.raise_for_status()
+        return {model_info.get("name"): model_info for model_info in response.json().get("models", [])}
+
+    async def model_info(self) -> Optional[Dict[str, Any]]:
+        """The model's ``/api/tags`` entry (size, digest, details) from the registry, or None if it's missing."""
+        return await self.registry.lookup(self.model)
+
+    async def test_connection(self) -> bool:
+        """Test if Ollama is reachable and the model is available.
+        
+        Reachability is probed every time; the model is looked up in the cached registry.
+        """
+        if not await self.ping():
+            return False
+        if await self.model_info() is None:
+            logger.error(f"Model {self.model} not found in Ollama")
             return False
+        logger.debug(f"Connected to Ollama, model {self.model} is available")
+        return True
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Whether Ollama is up and the model available and loaded, as last observed.
+        
+        Generations, keeper renewals and model list fetches keep this state
+        current, so a status check normally sends no request. State older than
+        config.ollama_status_ttl is refreshed in the background and answered
+        from meanwhile; only the first check waits for Ollama. A failed probe
+        counts as observed state too, so checks while Ollama is down answer
+        at once instead of each waiting for the connection to be refused.
+        """
+        if self._reachable_at is None or (self.reachable and self.registry.models is None):
+            await self._refresh_status()
+        else:
+            # Residency is only known, and only goes stale, while Ollama answers
+            checked = min(self._reachable_at, self._residency_at) if self.reachable else self._reachable_at
+            if time.monotonic() - checked > config.ollama_status_ttl and \
+                    (self._status_task is None or self._status_task.done()):
+                self._status_task = asyncio.get_running_loop().create_task(self._refresh_status())
+        model_info = self.registry.current(self.model)
+        return {
+            "connected": bool(self.reachable) and model_info is not None,
+            "model_status": self.residency,
+            "model_info": model_info,
+            "checked_seconds_ago": round(time.monotonic() - self._reachable_at, 1)
+        }
+
+    async def _refresh_status(self):
+        if not await self.ping():
+            return
+        await self.model_status()
+        if self.registry.models is None:
+            await self.registry.refresh()
+
+    def _cache_for(self, temperature: float, cache: Optional[bool]) -> Optional[CompletionCache]:
+        """The completion cache a request may use, or None.
+        
+        Sampled requests (temperature > 0) only use it when they opt in with
+        ``cache=True`` or config.ollama_cache_sampled; ``cache=False`` bypasses it.
+        """
+        completions = get_completion_cache()
+        if completions is None:
+            return None
+        if cache is False or (cache is None and temperature > 0 and not config.ollama_cache_sampled):
+            completions.stats["bypassed"] += 1
+            return None
+        return completions
 
     async def get_completion(self, prompt: str, system_prompt: Optional[str] = None, 
-                           temperature: float = 0.7) -> Tuple[str, Dict[str, Any]]:
+                           temperature: float = 0.7, options: Optional[Dict[str, Any]] = None,
+                           cache: Optional[bool] = None,
+                           session: Optional[OllamaSession] = None,
+                           priority: str = "interactive",
+                           deadline: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
         """
         Get a completion from Ollama.
         
@@ -59,29 +742,40 @@ class OllamaConnection:
             prompt: The user's prompt
             system_prompt: Optional system instructions
             temperature: Controls randomness (0-1)
+            options: Ollama model options (e.g. ``{"seed": 1, "num_predict": 256}``)
+            cache: True to use the completion cache even when sampling (temperature > 0),
+                False to bypass it; by default only deterministic requests use it
+            session: Chat session to continue; the turn's evaluation statistics are
+                returned as ``"turn"`` in the response data
+            priority: Scheduling class, one of PRIORITIES ("interactive", "background", "batch")
+            deadline: Seconds the request may wait for a free slot (default: config.ollama_queue_timeout)
             
         Returns:
-            Tuple of (generated_text, full_response_data)
+            Tuple of (generated_text, full_response_data); data served from the
+            cache has ``"cached": True``, and data shared from an identical request
+            that was already being generated has ``"coalesced": True``
         """
-        try:
-            request_data = {
-                "model": self.model,
-                "prompt": prompt,
-                "temperature": temperature,
-                "stream": False,
-            }
-            
-            if system_prompt:
-                request_data["system"] = system_prompt
+        context = None
+        if session is not None:
+            system_prompt, context = session.prepare(system_prompt)
+        self.last_activity = time.monotonic()
+        key = completion_key(self.model, system_prompt, prompt, temperature, options, context)
+        # A continued session's answer depends on the whole conversation, not just the prompt
+        completions = self._cache_for(temperature, cache) if context is None else None
+        if completions is not None:
+            hit = completions.get(key)
+            if hit is not None:
+                logger.info(f"Answered completion request for model {self.model} from the cache")
+                return self._finish_turn(session, *hit)
+        
+        async def generate() -> Tuple[str, Dict[str, Any]]:
+            try:
+                request_data = self._request_data(prompt, system_prompt, temperature, options, context, stream=False)
+                    
+                logger.info(f"Sending completion request to Ollama for model {self.model}")
+                logger.debug(f"Request data: {request_data}")
                 
-            logger.info(f"Sending completion request to Ollama for model {self.model}")
-            logger.debug(f"Request data: {request_data}")
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json=request_data
-                )
+                response = await self._client().post("/api/generate", json=request_data)
                 
                 if response.status_code != 200:
                     error_msg = f"Ollama API returned status {response.status_code}: {response.text}"
@@ -91,13 +785,262 @@ class OllamaConnection:
                 result = response.json()
                 generated_text = result.get("response", "")
                 logger.info(f"Received {len(generated_text)} chars from Ollama")
+                if completions is not None and generated_text:
+                    completions.put(key, generated_text, result)
                 
                 return generated_text, result
+                    
+            except Exception as e:
+                error_msg = f"Error getting completion from Ollama: {str(e)}"
+                logger.error(error_msg)
+                return "", {"error": error_msg}
+        
+        (generated_text, result), _ = await self._single_flight(key, generate, priority, deadline)
+        return self._finish_turn(session, generated_text, result)
+
+    async def stream_commands(self, prompt: str, system_prompt: Optional[str] = None,
+                              temperature: float = 0.7, options: Optional[Dict[str, Any]] = None,
+                              cache: Optional[bool] = None, session: Optional[OllamaSession] = None,
+                              priority: str = "interactive", deadline: Optional[float] = None,
+                              on_command: Callable[[Dict[str, Any]], None] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get a streamed completion from Ollama, reporting commands as soon as they are written.
+        
+        Ollama's NDJSON token stream is fed to a CommandStreamDetector, and
+        ``on_command`` is called with each complete command object while the
+        model is still generating the rest. If the finished output holds no
+        command objects, the patterns extract_mcp_commands also understands
+        (such as ``func(arg=1)`` calls) are reported at the end instead.
+        A completion answered from the cache, or shared with an identical
+        request already in flight, reports all of its commands at once.
+        
+        Args:
+            prompt: The user's prompt
+            system_prompt: Optional system instructions
+            temperature: Controls randomness (0-1)
+            options: Ollama model options, as for get_completion
+            cache: Whether to use the completion cache, as for get_completion
+            session: Chat session to continue, as for get_completion
+            priority: Scheduling class, as for get_completion
+            deadline: Seconds the request may wait for a free slot, as for get_completion
+            on_command: Called with each ``{"function", "arguments"}`` command, in order
+            
+        Returns:
+            Tuple of (generated_text, final_response_data); on failure the text
+            generated so far and ``{"error": ...}``
+        """
+        detector = CommandStreamDetector()
+        report = on_command or (lambda command: None)
+        context = None
+        if session is not None:
+            system_prompt, context = session.prepare(system_prompt)
+        self.last_activity = time.monotonic()
+        key = completion_key(self.model, system_prompt, prompt, temperature, options, context)
+        completions = self._cache_for(temperature, cache) if context is None else None
+        if completions is not None:
+            hit = completions.get(key)
+            if hit is not None:
+                logger.info(f"Answered completion request for model {self.model} from the cache")
+                await self._report_all(detector, report, hit[0])
+                return self._finish_turn(session, *hit)
+        
+        async def generate() -> Tuple[str, Dict[str, Any]]:
+            pieces: List[str] = []
+            final = {}
+            try:
+                request_data = self._request_data(prompt, system_prompt, temperature, options, context, stream=True)
+                logger.info(f"Streaming completion from Ollama for model {self.model}")
                 
+                async with self._client().stream("POST", "/api/generate", json=request_data) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", "replace")
+                        error_msg = f"Ollama API returned status {response.status_code}: {body}"
+                        logger.error(error_msg)
+                        return "", {"error": error_msg}
+                    
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise Exception(chunk["error"])
+                        text = chunk.get("response", "")
+                        if text:
+                            pieces.append(text)
+                            for command in detector.feed(text):
+                                report(command)
+                        if chunk.get("done"):
+                            final = chunk
+                            break
+            except Exception as e:
+                error_msg = f"Error streaming completion from Ollama: {str(e)}"
+                logger.error(error_msg)
+                return "".join(pieces), {"error": error_msg}
+            
+            generated_text = "".join(pieces)
+            logger.info(f"Streamed {len(generated_text)} chars from Ollama, {len(detector.commands)} commands")
+            if not detector.commands:
+                for command in await self.extract_mcp_commands(generated_text):
+                    report(command)
+            final = {**final, "response": generated_text}
+            if completions is not None and generated_text:
+                completions.put(key, generated_text, final)
+            return generated_text, final
+        
+        (generated_text, final), shared = await self._single_flight(key, generate, priority, deadline)
+        if shared:
+            # Another request generated it; its commands arrive all at once, as from the cache
+            await self._report_all(detector, report, generated_text)
+        return self._finish_turn(session, generated_text, final)
+
+    async def _report_all(self, detector: CommandStreamDetector, report: Callable[[Dict[str, Any]], None],
+                          generated_text: str):
+        """Report every command in an already finished completion."""
+        for command in detector.feed(generated_text) or await self.extract_mcp_commands(generated_text):
+            report(command)
+
+    async def _single_flight(self, key: str, generate: Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]],
+                             priority: str, deadline: Optional[float]) -> Tuple[Tuple[str, Dict[str, Any]], bool]:
+        """Run ``generate``, unless an identical request is in flight; then wait for its result instead.
+        
+        Double-clicks and client retries would otherwise each start a full
+        generation on the one local model. The generation runs in a task of its
+        own, so the request that started it can give up without stopping it for
+        the others; it is only cancelled once nobody has waited for it for
+        config.ollama_abandon_grace seconds, which leaves a client that timed
+        out time to retry and pick it up. The in-flight result is a
+        concurrent.futures.Future, so requests from the TCP server's event loop
+        and the MCP server's share it too. Generations run once the scheduler
+        admits them; one that is refused (deadline passed, unknown priority)
+        results in ``("", {"error": ...})``.
+        
+        Returns:
+            The result, and whether it came from another request
+        """
+        while True:
+            with self._clients_lock:
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._in_flight[key] = _Flight(asyncio.get_running_loop())
+                else:
+                    flight.waiters += 1
+            if leader:
+                self.request_stats["generations"] += 1
+                flight.task = flight.loop.create_task(self._fly(key, flight, generate, priority, deadline))
+            else:
+                self.request_stats["coalesced"] += 1
+            waiting = asyncio.wrap_future(flight.result)
+            try:
+                # Shielded, so a request giving up doesn't cancel the generation for everyone else
+                generated_text, data = await asyncio.shield(waiting)
+            except _RequestCancelled:
+                continue  # Run it again, perhaps as the new leader
+            except asyncio.CancelledError:
+                # Nobody will look at the outcome through this request any more
+                waiting.add_done_callback(lambda done: done.cancelled() or done.exception())
+                self._leave(key, flight)
+                raise
+            if leader:
+                return (generated_text, data), False
+            return (generated_text, {**data, "coalesced": True}), True
+
+    async def _fly(self, key: str, flight: _Flight, generate: Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]],
+                   priority: str, deadline: Optional[float]):
+        """Run a generation and hand its outcome to the requests waiting for it."""
+        try:
+            result = await self._scheduled(generate, priority, deadline)
+        except asyncio.CancelledError:
+            self._land(key, flight)
+            flight.result.set_exception(_RequestCancelled())
+            raise
         except Exception as e:
-            error_msg = f"Error getting completion from Ollama: {str(e)}"
-            logger.error(error_msg)
-            return "", {"error": error_msg}
+            self._land(key, flight)
+            flight.result.set_exception(e)
+            return
+        self._land(key, flight)
+        flight.result.set_result(result)
+
+    def _leave(self, key: str, flight: _Flight):
+        """A request stopped waiting; if it was the last one, abandon the generation after the grace period."""
+        with self._clients_lock:
+            flight.waiters -= 1
+            if flight.waiters > 0 or flight.result.done():
+                return
+        try:
+            flight.loop.call_soon_threadsafe(self._schedule_abandon, key, flight)
+        except RuntimeError:
+            pass  # The generation's loop is closed, and the generation with it
+
+    def _schedule_abandon(self, key: str, flight: _Flight):
+        if flight.abandon is not None:
+            flight.abandon.cancel()
+        flight.abandon = flight.loop.call_later(config.ollama_abandon_grace, self._abandon, key, flight)
+
+    def _abandon(self, key: str, flight: _Flight):
+        with self._clients_lock:
+            if flight.waiters > 0 or flight.result.done():
+                return  # Someone joined during the grace period, or it finished
+            # Identical requests from now on start a generation of their own
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+        self.request_stats["abandoned"] += 1
+        logger.info(f"Cancelling a generation no request has waited for in {config.ollama_abandon_grace}s")
+        flight.task.cancel()
+
+    async def _scheduled(self, generate: Callable[[], Awaitable[Tuple[str, Dict[str, Any]]]],
+                         priority: str, deadline: Optional[float]) -> Tuple[str, Dict[str, Any]]:
+        """Run ``generate`` in a scheduler slot."""
+        try:
+            await self.scheduler.acquire(priority, deadline)
+        except (ValueError, QueueTimeout) as e:
+            logger.warning(f"Completion request not run: {str(e)}")
+            return "", {"error": str(e)}
+        try:
+            generated_text, data = await generate()
+        finally:
+            self.scheduler.release()
+        if "error" not in data:
+            self._observed(True, self._loaded())
+        return generated_text, data
+
+    def _land(self, key: str, flight: _Flight):
+        with self._clients_lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+        if flight.abandon is not None:
+            flight.abandon.cancel()
+
+    def get_request_stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._in_flight), **self.request_stats}
+
+    @staticmethod
+    def _finish_turn(session: Optional[OllamaSession], generated_text: str,
+                     data: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Move a session on past a completed turn, adding the turn's statistics to the data."""
+        if session is None:
+            return generated_text, data
+        return generated_text, {**data, "turn": session.record(data)}
+
+    def _request_data(self, prompt: str, system_prompt: Optional[str], temperature: float,
+                      options: Optional[Dict[str, Any]], context: Optional[List[int]],
+                      stream: bool) -> Dict[str, Any]:
+        """Body of an /api/generate request."""
+        request_data = {
+            "model": self.model,
+            "prompt": prompt,
+            "temperature": temperature,
+            "stream": stream,
+        }
+        if system_prompt:
+            request_data["system"] = system_prompt
+        if options:
+            request_data["options"] = options
+        if config.ollama_keep_alive:
+            request_data["keep_alive"] = config.ollama_keep_alive
+        if context:
+            request_data["context"] = context
+        return request_data
 
     async def extract_mcp_commands(self, llm_response: str) -> List[Dict[str, Any]]:
         """
@@ -125,16 +1068,8 @@ class OllamaConnection:
                 try:
                     json_data = json.loads(block.strip())
                     # Check if it's a command or array of commands
-                    if isinstance(json_data, list):
-                        for item in json_data:
-                            if isinstance(item, dict) and ('function' in item or 'name' in item):
-                                function_name = item.get('function') or item.get('name')
-                                args = item.get('arguments') or item.get('params') or item.get('args') or {}
-                                commands.append({"function": function_name, "arguments": args})
-                    elif isinstance(json_data, dict) and ('function' in json_data or 'name' in json_data):
-                        function_name = json_data.get('function') or json_data.get('name')
-                        args = json_data.get('arguments') or json_data.get('params') or json_data.get('args') or {}
-                        commands.append({"function": function_name, "arguments": args})
+                    items = json_data if isinstance(json_data, list) else [json_data]
+                    commands.extend(filter(None, map(as_mcp_command, items)))
                 except json.JSONDecodeError:
                     # Not valid JSON, try other patterns
                     pass
@@ -149,11 +1084,9 @@ class OllamaConnection:
             
             for json_str in json_matches:
                 try:
-                    parsed = json.loads(json_str)
-                    if isinstance(parsed, dict) and ('function' in parsed or 'name' in parsed):
-                        function_name = parsed.get('function') or parsed.get('name')
-                        args = parsed.get('arguments') or parsed.get('params') or parsed.get('args') or {}
-                        commands.append({"function": function_name, "arguments": args})
+                    command = as_mcp_command(json.loads(json_str))
+                    if command is not None:
+                        commands.append(command)
                 except json.JSONDecodeError:
                     # Not valid JSON, ignore
                     pass
@@ -0,0 +1,118 @@
+"""
+Cursor pagination for the listing tools.
+
+Listing tools (``get_asset_list``, ``find_objects_by_name``, ``list_scripts``,
+``get_hierarchy``) return everything at once by default. Given a ``limit``
+they return one page instead, as ``{"items": [...], "next_cursor": ...}``;
+passing ``next_cursor`` back as ``cursor`` fetches the following page and a
+``None`` cursor means the listing is exhausted.
+
+Cursors are opaque to callers. They hold an offset into the listing, plus the
+snapshot version for listings served from a stored snapshot, so that every
+page of a hierarchy comes from the same tree. Listings without versions of
+their own (assets, scripts, name searches) are pinned by paginate_listing
+when they span more than one page: later pages slice the pinned copy
+instead of querying again and skipping ``offset`` items, which would cost
+O(N^2 / limit) to page through N items.
+"""
+
+import threading
+from collections import OrderedDict
+from itertools import count, islice
+from typing import Callable, Dict, Any, Iterable, List, Optional, Sequence, Tuple
+from config import config
+
+def encode_cursor(offset: int, version: Optional[str] = None) -> str:
+    """Build the cursor for the page starting at ``offset``."""
+    return f"{version}:{offset}" if version else str(offset)
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Optional[str], int]:
+    """Split a cursor into its snapshot version (or None) and offset."""
+    if not cursor:
+        return None, 0
+    version, _, offset = str(cursor).rpartition(":")
+    try:
+        value = int(offset)
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    if value < 0:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return version or None, value
+
+def paginate(items: Iterable[Any], limit: int, cursor: Optional[str] = None,
+             version: Optional[str] = None) -> Dict[str, Any]:
+    """Take the page ``cursor`` points at from ``items``.
+
+    Only the page (plus one item, to tell whether there is another page) is
+    pulled from ``items``; a generator is closed afterwards, so a streamed
+    listing stops being consumed there.
+
+    Args:
+        items: The listing, in a stable order
+        limit: Page size
+        cursor: Cursor from the previous page, or None for the first page
+        version: Snapshot version to carry in the next cursor
+
+    Returns:
+        Dict with the page's ``items`` and the ``next_cursor`` (None on the last page)
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    _, offset = decode_cursor(cursor)
+    if isinstance(items, Sequence):
+        page = list(items[offset:offset + limit + 1])
+    else:
+        iterator = iter(items)
+        try:
+            page = list(islice(iterator, offset, offset + limit + 1))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+    next_cursor = encode_cursor(offset + limit, version) if len(page) > limit else None
+    return {"items": page[:limit], "next_cursor": next_cursor}
+
+class ListingSnapshots:
+    """Listings pinned for paging, the oldest dropped past ``config.listing_history_size``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listings: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._versions = count(1)
+
+    def pin(self, items: List[Any]) -> str:
+        """Keep a listing and return the version its cursors carry."""
+        with self._lock:
+            version = f"L{next(self._versions)}"
+            self._listings[version] = items
+            while len(self._listings) > max(config.listing_history_size, 1):
+                self._listings.popitem(last=False)
+            return version
+
+    def get(self, version: str) -> Optional[List[Any]]:
+        with self._lock:
+            return self._listings.get(version)
+
+# Global pinned listings
+_listing_snapshots = ListingSnapshots()
+
+def paginate_listing(fetch: Callable[[], Iterable[Any]], limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Take a page of a listing that has no version of its own.
+
+    The first page runs ``fetch`` and, if the listing spans more pages,
+    pins it; the cursor carries the pinned version, so later pages come
+    from the same listing without running ``fetch`` again.
+
+    Raises:
+        ValueError: If the cursor's listing has been dropped
+    """
+    version, _ = decode_cursor(cursor)
+    if version is None:
+        items = list(fetch())
+        if len(items) > limit:
+            version = _listing_snapshots.pin(items)
+    else:
+        items = _listing_snapshots.get(version)
+        if items is None:
+            raise ValueError(f"Listing {version} has expired; start again without a cursor")
+    return paginate(items, limit, cursor, version)
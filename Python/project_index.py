@@ -0,0 +1,335 @@
+"""
+On-disk index of the Unity project's ``Assets`` folder.
+
+The MCP server normally runs on the same machine as the Unity project, so
+asset listings and existence checks do not have to go through the editor's
+main thread. When ``config.project_path`` points at the project root, a
+background thread walks ``Assets/`` once, loads the result into the asset
+catalog (pinning it, so it never expires or reloads from Unity) and then
+keeps the catalog current:
+
+* Without extra packages it polls directory mtimes every
+  ``config.project_index_poll_interval`` seconds. Creating, deleting or
+  renaming a file changes its directory's mtime, so only changed directories
+  are re-listed, and a poll of a project with tens of thousands of assets
+  costs one ``stat`` per directory.
+* If the optional ``watchdog`` package is installed, inotify (or the
+  platform's equivalent) reports the changed directories and polling only
+  re-lists those.
+
+Like Unity, the index skips ``.meta`` files, hidden entries and folders whose
+names end in ``~``. The catalog holds each file's path, name and type, none
+of which an edit to its contents changes, so files themselves are never
+stat'ed. Listings filtered by a type the catalog cannot answer from file
+extensions are still sent to Unity.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from config import config
+from asset_catalog import AssetCatalog, get_asset_catalog, make_asset
+from unity_connection import get_unity_connection
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    # Fall back to polling directory mtimes
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger("UnityMCP.ProjectIndex")
+
+ASSETS_FOLDER = "Assets"
+
+# A directory modified this recently is re-listed on the next poll as well, in
+# case a change landed within the file system's mtime granularity
+_MTIME_SETTLE_SECONDS = 2.0
+
+def _ignored(name: str) -> bool:
+    return name.startswith(".") or name.endswith("~") or name.endswith(".meta")
+
+class _DirtyDirectoryHandler(FileSystemEventHandler):
+    """Records which directories a file-system watcher saw change."""
+
+    def __init__(self, index: "ProjectIndex"):
+        super().__init__()
+        self.index = index
+
+    def on_any_event(self, event):
+        for path in (event.src_path, getattr(event, "dest_path", None)):
+            if path:
+                path = os.fsdecode(path)
+                self.index.mark_dirty(path if event.is_directory else os.path.dirname(path))
+                if event.is_directory:
+                    self.index.mark_dirty(os.path.dirname(path))
+
+class ProjectIndex:
+    """Walks a Unity project's Assets folder and mirrors it into an AssetCatalog."""
+
+    def __init__(self, project_path: str, catalog: AssetCatalog):
+        self.project_path = os.path.abspath(project_path)
+        self.catalog = catalog
+        # Per directory ("Assets/Art"): mtime when last listed, files and subdirectories
+        self._dirs: Dict[str, Tuple[int, Set[str], Set[str]]] = {}
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self.ready = threading.Event()  # Set once the first walk is in the catalog
+        self.stats = {"files": 0, "directories": 0, "polls": 0, "rescans": 0, "walk_seconds": 0.0}
+
+    @property
+    def watching(self) -> bool:
+        """Whether a file-system watcher (rather than mtime polling) reports changes."""
+        return self._observer is not None
+
+    # Paths
+
+    def _abs(self, rel_dir: str) -> str:
+        return os.path.join(self.project_path, *rel_dir.split("/"))
+
+    def _rel(self, abs_path: str) -> Optional[str]:
+        rel = os.path.relpath(os.path.abspath(abs_path), self.project_path).replace(os.sep, "/")
+        if rel == ASSETS_FOLDER or rel.startswith(ASSETS_FOLDER + "/"):
+            return rel
+        return None
+
+    # Walking
+
+    def _list_dir(self, rel_dir: str) -> Optional[Tuple[int, Set[str], Set[str]]]:
+        """List one directory; None if it is gone."""
+        try:
+            mtime = os.stat(self._abs(rel_dir)).st_mtime_ns
+            files, dirs = set(), set()
+            with os.scandir(self._abs(rel_dir)) as entries:
+                for entry in entries:
+                    if _ignored(entry.name):
+                        continue
+                    if entry.is_dir(follow_symlinks=True):
+                        dirs.add(entry.name)
+                    else:
+                        files.add(entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if time.time() - mtime / 1e9 < _MTIME_SETTLE_SECONDS:
+            mtime = -1  # Force another look next poll
+        return mtime, files, dirs
+
+    def _walk(self, rel_root: str) -> List[str]:
+        """List ``rel_root`` and everything below it into ``_dirs``; return the file paths found."""
+        found = []
+        stack = [rel_root]
+        while stack:
+            rel_dir = stack.pop()
+            listing = self._list_dir(rel_dir)
+            if listing is None:
+                continue
+            self._dirs[rel_dir] = listing
+            found.extend(f"{rel_dir}/{name}" for name in listing[1])
+            stack.extend(f"{rel_dir}/{name}" for name in listing[2])
+        return found
+
+    def build(self):
+        """Walk the whole Assets folder and load it into the catalog."""
+        start = time.perf_counter()
+        self._dirs.clear()
+        paths = self._walk(ASSETS_FOLDER)
+        self.catalog.load([make_asset(path) for path in paths], pinned=True)
+        self.stats["files"] = len(paths)
+        self.stats["directories"] = len(self._dirs)
+        self.stats["walk_seconds"] = round(time.perf_counter() - start, 3)
+        self.ready.set()
+        logger.info(f"Indexed {len(paths)} assets in {len(self._dirs)} folders under {self.project_path}")
+
+    # Change detection
+
+    def mark_dirty(self, abs_dir: str):
+        """Queue a directory to be re-listed (called from the watcher thread)."""
+        rel_dir = self._rel(abs_dir)
+        if rel_dir is not None:
+            with self._dirty_lock:
+                self._dirty.add(rel_dir)
+
+    def _rescan(self, rel_dir: str):
+        """Re-list one directory and apply the differences to the catalog."""
+        old = self._dirs.get(rel_dir)
+        if old is None:
+            # A directory we have not seen; its parent's rescan walks it
+            return
+        new = self._list_dir(rel_dir)
+        self.stats["rescans"] += 1
+        if new is None:
+            self._remove_tree(rel_dir)
+            return
+
+        _, old_files, old_dirs = old
+        _, new_files, new_dirs = new
+        self._dirs[rel_dir] = new
+        for name in old_files - new_files:
+            self.catalog.remove(f"{rel_dir}/{name}")
+        for name in new_files - old_files:
+            self.catalog.add(make_asset(f"{rel_dir}/{name}"))
+        for name in old_dirs - new_dirs:
+            self._remove_tree(f"{rel_dir}/{name}")
+        for name in new_dirs - old_dirs:
+            for path in self._walk(f"{rel_dir}/{name}"):
+                self.catalog.add(make_asset(path))
+
+    def _remove_tree(self, rel_root: str):
+        stack = [rel_root]
+        while stack:
+            rel_dir = stack.pop()
+            listing = self._dirs.pop(rel_dir, None)
+            if listing is None:
+                continue
+            for name in listing[1]:
+                self.catalog.remove(f"{rel_dir}/{name}")
+            stack.extend(f"{rel_dir}/{name}" for name in listing[2])
+
+    def poll(self):
+        """Apply any changes made on disk since the last poll."""
+        self.stats["polls"] += 1
+        if self.watching:
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+        else:
+            dirty = set()
+            for rel_dir, (mtime, _, _) in list(self._dirs.items()):
+                try:
+                    if os.stat(self._abs(rel_dir)).st_mtime_ns != mtime:
+                        dirty.add(rel_dir)
+                except OSError:
+                    dirty.add(rel_dir)
+        # Parents first, so a new subdirectory is walked once by its parent
+        for rel_dir in sorted(dirty, key=len):
+            self._rescan(rel_dir)
+        self.stats["files"] = len(self.catalog)
+        self.stats["directories"] = len(self._dirs)
+
+    # Background thread
+
+    def start(self):
+        """Build the index and keep it current in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="UnityMCP-project-index", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            if Observer is not None:
+                # Watch before walking so nothing changed during the walk is missed
+                observer = Observer()
+                observer.schedule(_DirtyDirectoryHandler(self), self._abs(ASSETS_FOLDER), recursive=True)
+                observer.start()
+                self._observer = observer
+            self.build()
+        except Exception as e:
+            logger.error(f"Could not index {self.project_path}: {str(e)}")
+            self.stop()
+            return
+
+        while not self._stop.wait(config.project_index_poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Project index poll failed: {str(e)}")
+
+    def stop(self):
+        """Stop watching for changes; the catalog keeps its last contents but expires normally."""
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self.catalog.pinned = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"project_path": self.project_path, "ready": self.ready.is_set(),
+                "watching": self.watching, **self.stats}
+
+# Global project index
+_project_index: Optional[ProjectIndex] = None
+
+def get_project_index() -> Optional[ProjectIndex]:
+    """Retrieve the global project index, starting it on first use.
+
+    Returns None unless ``config.project_path`` is set to a Unity project
+    with an Assets folder and the asset catalog is enabled.
+    """
+    global _project_index
+    if _project_index is not None:
+        return _project_index
+    if not config.project_path:
+        return None
+    if not os.path.isdir(os.path.join(config.project_path, ASSETS_FOLDER)):
+        logger.warning(f"project_path '{config.project_path}' has no {ASSETS_FOLDER} folder; not indexing it")
+        return None
+    catalog = get_asset_catalog()
+    if catalog is None:
+        logger.warning("The project index needs the asset catalog; enable asset_catalog_enabled to use it")
+        return None
+    _project_index = ProjectIndex(config.project_path, catalog)
+    _project_index.start()
+    return _project_index
+
+def stop_project_index():
+    """Stop the global project index, if it was started."""
+    global _project_index
+    if _project_index is not None:
+        _project_index.stop()
+        _project_index = None
+
+def _local_catalog(asset_type: Optional[str] = None) -> Optional[AssetCatalog]:
+    """The on-disk index's catalog, if it is built and can answer the type filter."""
+    index = get_project_index()
+    if index is not None and index.ready.is_set() and index.catalog.can_list(asset_type):
+        return index.catalog
+    return None
+
+def _unity(unity):
+    """The given Unity connection, or the global one, connected only once Unity is needed."""
+    return unity if unity is not None else get_unity_connection()
+
+def list_assets(unity=None, asset_type: Optional[str] = None, search_pattern: str = "*",
+                folder: str = ASSETS_FOLDER) -> List[Dict[str, Any]]:
+    """List project assets, from the on-disk index when available, else via GET_ASSET_LIST."""
+    catalog = _local_catalog(asset_type)
+    if catalog is not None:
+        return catalog.list_assets(asset_type, search_pattern, folder)
+    return _unity(unity).send_command("GET_ASSET_LIST", {
+        "type": asset_type,
+        "search_pattern": search_pattern,
+        "folder": folder
+    }).get("assets", [])
+
+def list_scripts(unity=None, folder_path: str = ASSETS_FOLDER) -> List[str]:
+    """List script paths under a folder, from the on-disk index when available, else via LIST_SCRIPTS."""
+    catalog = _local_catalog()
+    if catalog is not None:
+        return [asset["path"] for asset in catalog.list_assets("Script", "*.cs", folder_path)]
+    return _unity(unity).send_command("LIST_SCRIPTS", {"folder_path": folder_path}).get("scripts", [])
+
+def iter_assets(unity=None, asset_type: Optional[str] = None, search_pattern: str = "*",
+                folder: str = ASSETS_FOLDER) -> Iterator[Dict[str, Any]]:
+    """Like list_assets, but streams the GET_ASSET_LIST reply item by item."""
+    catalog = _local_catalog(asset_type)
+    if catalog is not None:
+        return iter(catalog.list_assets(asset_type, search_pattern, folder))
+    return _unity(unity).stream_command("GET_ASSET_LIST", {
+        "type": asset_type,
+        "search_pattern": search_pattern,
+        "folder": folder
+    }, "assets")
+
+def iter_scripts(unity=None, folder_path: str = ASSETS_FOLDER) -> Iterator[str]:
+    """Like list_scripts, but streams the LIST_SCRIPTS reply item by item."""
+    catalog = _local_catalog()
+    if catalog is not None:
+        return iter(list_scripts(unity, folder_path))
+    return _unity(unity).stream_command("LIST_SCRIPTS", {"folder_path": folder_path}, "scripts")
@@ -0,0 +1,479 @@
+"""
+Client-side mirror of the open Unity scene's hierarchy.
+
+Most object tools start by checking that an object exists, which used to cost
+a ``FIND_OBJECTS_BY_NAME`` round trip (and a full scene scan on the editor's
+main thread) per call. The mirror is seeded from a single ``GET_HIERARCHY``
+reply and then kept current by watching the commands that go through the Unity
+connections: created, deleted and re-parented objects are applied in place,
+and anything that may rewrite the scene wholesale (opening or creating a
+scene, undo/redo, unknown commands) simply invalidates it until the next seed.
+
+Changes made by hand in the editor are not visible to the mirror, so it is
+also re-seeded once it is older than ``config.scene_mirror_max_age``.
+"""
+
+import fnmatch
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+from config import config
+from hierarchy_index import HierarchyIndex, longest_glob_literal
+from unity_connection import add_command_observer
+from unity_protocol import is_unsupported_error
+
+logger = logging.getLogger("UnityMCP.SceneMirror")
+
+# Commands that never change which objects exist or where they sit in the hierarchy
+HIERARCHY_NEUTRAL_COMMANDS = frozenset({
+    "ping", "HANDSHAKE", "GET_SCENE_INFO", "GET_OBJECT_INFO", "GET_OBJECT_PROPERTIES",
+    "GET_COMPONENT_PROPERTIES", "FIND_OBJECTS_BY_NAME", "FIND_OBJECTS_BY_TAG", "GET_SELECTED_OBJECT",
+    "SELECT_OBJECT", "SAVE_SCENE", "GET_ASSET_LIST", "IMPORT_ASSET", "LIST_SCRIPTS", "VIEW_SCRIPT",
+    "CREATE_SCRIPT", "UPDATE_SCRIPT", "ATTACH_SCRIPT", "SET_MATERIAL", "CREATE_PREFAB", "APPLY_PREFAB"
+})
+
+# Commands that replace the whole scene
+SCENE_CHANGING_COMMANDS = frozenset({"OPEN_SCENE", "CHANGE_SCENE", "NEW_SCENE"})
+
+# Ways find_objects can match a name
+NAME_MATCH_MODES = ("substring", "prefix", "glob", "exact")
+
+# Keys under which bridges return the list of root objects / a node's children
+_ROOT_KEYS = ("hierarchy", "rootObjects", "root_objects", "roots", "objects", "children")
+CHILD_KEYS = ("children", "childObjects", "child_objects")
+NODE_ID_KEYS = ("id", "instanceID", "instanceId", "instance_id")
+
+def hierarchy_roots(hierarchy: Any) -> Optional[List[Any]]:
+    """The root object list of a GET_HIERARCHY result, or None if it has no recognisable one."""
+    if isinstance(hierarchy, list):
+        return hierarchy
+    if isinstance(hierarchy, dict):
+        for key in _ROOT_KEYS:
+            value = hierarchy.get(key)
+            if isinstance(value, list):
+                return value
+            if isinstance(value, dict):
+                return hierarchy_roots(value)
+    return None
+
+def hierarchy_children(raw: Any) -> List[Any]:
+    """The child list of one node in a GET_HIERARCHY result."""
+    if isinstance(raw, dict):
+        for key in CHILD_KEYS:
+            value = raw.get(key)
+            if isinstance(value, list):
+                return value
+    return []
+
+def hierarchy_node_id(raw: Any) -> Any:
+    """The instance ID a bridge reported for a hierarchy node, if any."""
+    if isinstance(raw, dict):
+        return next((raw[key] for key in NODE_ID_KEYS if raw.get(key) is not None), None)
+    return None
+
+class MirrorNode:
+    """One GameObject in the mirrored hierarchy."""
+
+    __slots__ = ("id", "name", "tag", "parent", "children", "_path")
+
+    def __init__(self, node_id: Any, name: str, tag: Optional[str] = None, parent: "MirrorNode" = None):
+        self.id = node_id
+        self.name = name
+        self.tag = tag
+        self.parent = parent
+        self.children: List["MirrorNode"] = []
+        self._path: Optional[str] = None
+
+    @property
+    def path(self) -> str:
+        """Hierarchy path from the scene root, e.g. ``Level/Spawns/Enemy``."""
+        if self._path is None:
+            self._path = self.name if self.parent is None else f"{self.parent.path}/{self.name}"
+        return self._path
+
+    def to_dict(self) -> Dict[str, str]:
+        """The shape FIND_OBJECTS_BY_NAME uses for each match."""
+        return {"name": self.name, "path": self.path}
+
+class SceneMirror:
+    """In-memory copy of the scene hierarchy, answering lookups without Unity."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._nodes: Dict[Any, MirrorNode] = {}
+        self._roots: List[MirrorNode] = []
+        self.index = HierarchyIndex()  # Name and tag lookups, kept in step with the nodes
+        self._synthetic_ids = itertools.count(-1, -1)  # For nodes the bridge sent without an ID
+        self._seeded_at: Optional[float] = None
+        self._seed_failed = False  # The bridge cannot answer GET_HIERARCHY; cleared by invalidate
+        self._retry_at = 0.0  # Monotonic time before which a failed seed is not retried
+        self.stats = {"seeds": 0, "lookups": 0, "invalidations": 0, "applied": 0}
+
+    @property
+    def seeded(self) -> bool:
+        return self._seeded_at is not None
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the mirror holds a hierarchy young enough to answer from."""
+        if self._seeded_at is None:
+            return False
+        max_age = config.scene_mirror_max_age
+        return max_age <= 0 or time.monotonic() - self._seeded_at < max_age
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    # Seeding and invalidation
+
+    def ensure_fresh(self, unity) -> bool:
+        """Seed the mirror from GET_HIERARCHY if it is empty or too old.
+
+        The reply is loaded by the command observer like any other hierarchy
+        reply. A bridge that does not support GET_HIERARCHY is not asked again
+        until the mirror is invalidated; any other failure is retried once
+        ``config.scene_mirror_retry_backoff`` seconds have passed.
+
+        Returns:
+            True if the mirror can answer lookups
+        """
+        if self.fresh:
+            return True
+        if self._seed_failed or time.monotonic() < self._retry_at:
+            return False
+        try:
+            unity.send_command("GET_HIERARCHY")
+        except Exception as e:
+            if is_unsupported_error(e):
+                logger.warning(f"Bridge cannot seed the scene mirror: {str(e)}")
+                self._seed_failed = True
+            else:
+                logger.warning(f"Could not seed the scene mirror, retrying later: {str(e)}")
+                self._retry_at = time.monotonic() + config.scene_mirror_retry_backoff
+            return False
+        return self.fresh
+
+    def _clear(self):
+        self._nodes.clear()
+        self._roots = []
+        self.index.clear()
+        self._seeded_at = None
+
+    def invalidate(self):
+        """Forget the mirrored hierarchy; the next lookup re-seeds it."""
+        with self._lock:
+            self._clear()
+            self._seed_failed = False
+            self.stats["invalidations"] += 1
+
+    def load(self, hierarchy: Any):
+        """Replace the mirror's contents with a GET_HIERARCHY result."""
+        roots = hierarchy_roots(hierarchy)
+        if roots is None:
+            logger.warning("Unrecognised GET_HIERARCHY result; answering lookups from Unity instead")
+            with self._lock:
+                self._clear()
+                self._seed_failed = True
+            return
+
+        with self._lock:
+            self._clear()
+            # Iterative walk: deep hierarchies must not hit the recursion limit
+            stack = [(raw, None) for raw in reversed(roots)]
+            while stack:
+                raw, parent = stack.pop()
+                node = self._node_from_raw(raw, parent)
+                if node is None:
+                    continue
+                self._add(node)
+                stack.extend((child, node) for child in reversed(hierarchy_children(raw)))
+            self._seeded_at = time.monotonic()
+            self._seed_failed = False
+            self._retry_at = 0.0
+            self.stats["seeds"] += 1
+        logger.info(f"Scene mirror seeded with {len(self._nodes)} objects")
+
+    def _node_from_raw(self, raw: Any, parent: Optional[MirrorNode]) -> Optional[MirrorNode]:
+        if isinstance(raw, str):
+            return MirrorNode(next(self._synthetic_ids), raw, parent=parent)
+        if not isinstance(raw, dict) or not raw.get("name"):
+            return None
+        node_id = hierarchy_node_id(raw)
+        if node_id is None or node_id in self._nodes:
+            node_id = next(self._synthetic_ids)
+        return MirrorNode(node_id, str(raw["name"]), raw.get("tag"), parent)
+
+    # Structural updates
+
+    def _add(self, node: MirrorNode):
+        self._nodes[node.id] = node
+        self.index.add(node.id, node.name, node.tag)
+        if node.parent is None:
+            self._roots.append(node)
+        else:
+            node.parent.children.append(node)
+
+    def _detach(self, node: MirrorNode):
+        siblings = self._roots if node.parent is None else node.parent.children
+        if node in siblings:
+            siblings.remove(node)
+
+    def _remove(self, node: MirrorNode):
+        self._detach(node)
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            stack.extend(current.children)
+            self._nodes.pop(current.id, None)
+            self.index.remove(current.id, current.name, current.tag)
+
+    def _reparent(self, node: MirrorNode, parent: Optional[MirrorNode]):
+        self._detach(node)
+        node.parent = parent
+        (self._roots if parent is None else parent.children).append(node)
+        # Cached paths below the moved node are now wrong
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            current._path = None
+            stack.extend(current.children)
+
+    def resolve(self, name_or_path: str) -> Optional[MirrorNode]:
+        """Find the object a command's ``name`` parameter refers to, as GameObject.Find would."""
+        with self._lock:
+            if "/" in name_or_path:
+                path = name_or_path.lstrip("/")
+                leaf = path.rsplit("/", 1)[-1]
+                return next((self._nodes[node_id] for node_id in self.index.ids_named(leaf)
+                             if self._nodes[node_id].path == path), None)
+            ids = self.index.ids_named(name_or_path)
+            return self._nodes[ids[0]] if ids else None
+
+    def descendants(self, name_or_path: str) -> Optional[List[MirrorNode]]:
+        """Every object below the one a name resolves to, or None if the mirror cannot tell."""
+        with self._lock:
+            node = self.resolve(name_or_path) if self.fresh else None
+            if node is None:
+                return None
+            found, stack = [], list(node.children)
+            while stack:
+                current = stack.pop()
+                found.append(current)
+                stack.extend(current.children)
+            return found
+
+    # Observer
+
+    def observe(self, command_type: str, params: Dict[str, Any], result: Any):
+        """Keep the mirror in step with a command Unity executed successfully."""
+        if command_type == "GET_HIERARCHY":
+            self.load(result)
+            return
+        if command_type in SCENE_CHANGING_COMMANDS:
+            self.invalidate()
+            return
+        if command_type in HIERARCHY_NEUTRAL_COMMANDS or not self.seeded:
+            return
+        if command_type == "MODIFY_OBJECT" and params.get("set_parent") is None:
+            return
+
+        result = result if isinstance(result, dict) else {}
+        if result.get("success", True) is False:
+            # Some commands report failure inside a successful envelope
+            return
+        with self._lock:
+            if not self._apply(command_type, params, result):
+                # Better a re-seed than answering from a hierarchy we could not follow
+                logger.debug(f"Scene mirror invalidated by {command_type}")
+                self.invalidate()
+                return
+            self.stats["applied"] += 1
+
+    def _apply(self, command_type: str, params: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """Apply a mutating command in place; return False if it cannot be followed."""
+        if command_type == "CREATE_OBJECT":
+            name = result.get("name") or params.get("name")
+            if not name:
+                return False
+            # New primitives are always untagged
+            self._add(MirrorNode(self._result_id(result), name, result.get("tag", "Untagged")))
+            return True
+
+        if command_type == "INSTANTIATE_PREFAB":
+            name = result.get("instance_name") or result.get("name")
+            if not name:
+                return False
+            # The tag comes from the prefab; if unreported, tag queries go back to Unity
+            self._add(MirrorNode(self._result_id(result), name, result.get("tag")))
+            return True
+
+        if command_type == "DELETE_OBJECT":
+            node = self.resolve(params.get("name") or "")
+            if node is None:
+                return False
+            self._remove(node)
+            return True
+
+        if command_type == "MODIFY_OBJECT":
+            node = self.resolve(params.get("name") or "")
+            parent = self.resolve(params["set_parent"]) if params["set_parent"] else None
+            if node is None or (params["set_parent"] and parent is None):
+                return False
+            self._reparent(node, parent)
+            return True
+
+        # Undo/redo, play mode and anything unknown may have changed the hierarchy
+        return False
+
+    def _result_id(self, result: Dict[str, Any]) -> Any:
+        node_id = hierarchy_node_id(result)
+        if node_id is None or node_id in self._nodes:
+            node_id = next(self._synthetic_ids)
+        return node_id
+
+    # Queries
+
+    def find_objects_by_name(self, name: str, match: str = "substring") -> List[Dict[str, str]]:
+        """Objects whose name matches ``name``.
+
+        Args:
+            name: Text or pattern to match
+            match: "substring" (the bridge's semantics; an empty name matches
+                everything), "prefix", "glob" (``*``, ``?``, ``[...]``) or "exact"
+
+        Returns:
+            List of ``{"name": ..., "path": ...}`` dicts, ordered by name
+        """
+        with self._lock:
+            self.stats["lookups"] += 1
+            if match == "substring":
+                names = self.index.names_containing(name)
+            elif match == "prefix":
+                names = self.index.names_starting_with(name)
+            elif match == "glob":
+                names = self.index.names_matching(name)
+            elif match == "exact":
+                names = [name]
+            else:
+                raise ValueError(f"Unknown match mode '{match}'; expected one of {', '.join(NAME_MATCH_MODES)}")
+            return [self._nodes[node_id].to_dict() for node_id in self.index.ids_for_names(sorted(names))]
+
+    def find_objects_by_tag(self, tag: str) -> Optional[List[Dict[str, str]]]:
+        """Objects with this tag, or None if some objects' tags are unknown to the mirror."""
+        with self._lock:
+            if not self.index.tags_complete:
+                return None
+            self.stats["lookups"] += 1
+            return [self._nodes[node_id].to_dict() for node_id in self.index.ids_tagged(tag)]
+
+    def existing_names(self, names: Iterable[str]) -> Set[str]:
+        """Which of ``names`` are carried by at least one object, compared exactly."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            return {name for name in names if self.index.ids_named(name)}
+
+    def exists(self, name_or_path: str) -> bool:
+        """Whether an object with this exact name (or hierarchy path) is in the scene."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            return self.resolve(name_or_path) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": config.scene_mirror_enabled, "seeded": self.seeded,
+                "fresh": self.fresh, "objects": len(self._nodes), **self.stats}
+
+# Global scene mirror
+_scene_mirror: Optional[SceneMirror] = None
+
+def get_scene_mirror() -> Optional[SceneMirror]:
+    """Retrieve the global scene mirror, or None if it is disabled in the config."""
+    global _scene_mirror
+    if not config.scene_mirror_enabled:
+        return None
+    if _scene_mirror is None:
+        _scene_mirror = SceneMirror()
+        add_command_observer(_scene_mirror.observe)
+    return _scene_mirror
+
+def submit_find_objects_by_name(unity, name: str) -> Future:
+    """Look objects up by name, from the scene mirror when possible.
+
+    Drop-in replacement for ``unity.submit("FIND_OBJECTS_BY_NAME", ...)``: the
+    Future resolves to ``{"objects": [...]}`` either way, so tools can keep
+    issuing their pre-checks up front and waiting on them later.
+    """
+    mirror = get_scene_mirror()
+    if mirror is not None and mirror.ensure_fresh(unity):
+        future = Future()
+        future.set_result({"objects": mirror.find_objects_by_name(name)})
+        return future
+    return unity.submit("FIND_OBJECTS_BY_NAME", {"name": name})
+
+def _name_filter(name: str, match: str) -> Tuple[str, Callable[[Dict[str, Any]], bool]]:
+    """What to ask FIND_OBJECTS_BY_NAME for, and how to narrow its substring matches to ``match``."""
+    if match not in NAME_MATCH_MODES:
+        raise ValueError(f"Unknown match mode '{match}'; expected one of {', '.join(NAME_MATCH_MODES)}")
+    if match == "prefix":
+        return name, lambda obj: str(obj.get("name", "")).startswith(name)
+    if match == "glob":
+        return longest_glob_literal(name), lambda obj: fnmatch.fnmatchcase(str(obj.get("name", "")), name)
+    if match == "exact":
+        return name, lambda obj: obj.get("name") == name
+    return name, lambda obj: True
+
+def find_objects_by_name(unity, name: str, match: str = "substring") -> List[Dict[str, str]]:
+    """Find objects by name, from the scene mirror when possible.
+
+    Unity itself only does substring matching, so without a usable mirror the
+    other modes ask Unity for the names containing the pattern's longest
+    literal part and filter the reply locally.
+    """
+    search, keep = _name_filter(name, match)
+    mirror = get_scene_mirror()
+    if mirror is not None and mirror.ensure_fresh(unity):
+        return mirror.find_objects_by_name(name, match)
+
+    objects = unity.send_command("FIND_OBJECTS_BY_NAME", {"name": search}).get("objects", [])
+    return [obj for obj in objects if keep(obj)]
+
+def iter_objects_by_name(unity, name: str, match: str = "substring") -> Iterator[Dict[str, str]]:
+    """Like find_objects_by_name, but streams Unity's reply item by item when the mirror cannot answer."""
+    search, keep = _name_filter(name, match)
+    mirror = get_scene_mirror()
+    if mirror is not None and mirror.ensure_fresh(unity):
+        return iter(mirror.find_objects_by_name(name, match))
+    return (obj for obj in unity.stream_command("FIND_OBJECTS_BY_NAME", {"name": search}, "objects") if keep(obj))
+
+def existing_names(unity, names: Iterable[str]) -> Set[str]:
+    """Which of ``names`` exactly name an object in the scene, from the scene mirror when possible.
+
+    Without a usable mirror each name is looked up with its own
+    FIND_OBJECTS_BY_NAME query, all sent as one batch.
+    """
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return set()
+    mirror = get_scene_mirror()
+    if mirror is not None and mirror.ensure_fresh(unity):
+        return mirror.existing_names(names)
+
+    replies = unity.send_batch([{"type": "FIND_OBJECTS_BY_NAME", "params": {"name": name}} for name in names])
+    existing = set()
+    for name, reply in zip(names, replies):
+        if reply.get("status") == "error":
+            raise Exception(reply.get("error"))
+        if any(obj.get("name") == name for obj in (reply.get("result") or {}).get("objects", [])):
+            existing.add(name)
+    return existing
+
+def find_objects_by_tag(unity, tag: str) -> List[Dict[str, str]]:
+    """Find objects by tag, from the scene mirror when it knows every object's tag."""
+    mirror = get_scene_mirror()
+    if mirror is not None and mirror.ensure_fresh(unity):
+        objects = mirror.find_objects_by_tag(tag)
+        if objects is not None:
+            return objects
+    return unity.send_command("FIND_OBJECTS_BY_TAG", {"tag": tag}).get("objects", [])
@@ -7,10 +7,13 @@ from typing import AsyncIterator, Dict, Any, List, Optional
 import sys
 import os
 import threading
+import time
 from config import config
 from tools import register_all_tools
-from unity_connection import get_unity_connection, UnityConnection
-from ollama_connection import get_ollama_connection, OllamaConnection
+from unity_connection import get_async_unity_connection, AsyncUnityConnection
+from unity_protocol import batch_item_skipped
+from project_index import get_project_index, stop_project_index
+from ollama_connection import get_ollama_connection, get_completion_cache, OllamaConnection
 
 # Configure logging using settings from config
 log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'unity_mcp.log')
@@ -26,7 +29,7 @@ logger = logging.getLogger("UnityMCP")
 logger.setLevel(getattr(logging, config.log_level))
 
 # Global connection states
-_unity_connection: Optional[UnityConnection] = None
+_unity_connection: Optional[AsyncUnityConnection] = None
 _ollama_connection: Optional[OllamaConnection] = None
 
 # 导入TCP服务器
@@ -50,18 +53,25 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     
     # Connect to Unity
     try:
-        _unity_connection = get_unity_connection()
+        _unity_connection = await get_async_unity_connection()
         logger.info("Connected to Unity on startup")
     except Exception as e:
         logger.warning(f"Could not connect to Unity on startup: {str(e)}")
         _unity_connection = None
     
+    # Start indexing the project's Assets folder, if configured
+    if get_project_index() is not None:
+        logger.info(f"Indexing Unity project at {config.project_path}")
+    
     # Connect to Ollama
     try:
         _ollama_connection = await get_ollama_connection()
         is_connected = await _ollama_connection.test_connection()
         if is_connected:
             logger.info(f"Connected to Ollama with model {_ollama_connection.model}")
+            if config.ollama_warm_up:
+                # Load the model in the background so the first request doesn't pay for it
+                _ollama_connection.start_keeper()
         else:
             logger.warning(f"Ollama connection test failed")
     except Exception as e:
@@ -72,8 +82,12 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
         yield {}
     finally:
         if _unity_connection:
-            _unity_connection.disconnect()
+            await _unity_connection.disconnect()
             _unity_connection = None
+        if _ollama_connection:
+            # Stop this loop's model keeper and close its pooled HTTP connections to Ollama
+            await _ollama_connection.close()
+        stop_project_index()
         logger.info("UnityMCP server shut down")
 
 # Initialize MCP server
@@ -94,6 +108,7 @@ def asset_creation_strategy() -> str:
         "Unity MCP Server Tools and Best Practices:\n\n"
         "1. **Editor Control**\n"
         "   - `editor_action` - Performs editor-wide actions such as `PLAY`, `PAUSE`, `STOP`, `BUILD`, `SAVE`\n"
+        "   - `execute_batch(commands)` - Run an ordered list of Unity commands in one round trip\n"
         "2. **Scene Management**\n"
         "   - `get_current_scene()`, `get_scene_list()` - Get scene details\n"
         "   - `open_scene(path)`, `save_scene(path)` - Open/save scenes\n"
@@ -138,17 +153,88 @@ def asset_creation_strategy() -> str:
         "   - Regularly apply prefab changes\n"
     )
 
+async def _run_unity_commands(commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Execute LLM commands as one batch; return one result entry per command, in order."""
+    runnable = [cmd for cmd in commands if cmd.get("function")]
+    logger.info(f"Executing {len(runnable)} commands in a batch")
+    try:
+        outcomes = await _unity_connection.send_batch([
+            {"type": cmd.get("function"), "params": cmd.get("arguments", {})} for cmd in runnable
+        ]) if runnable else []
+    except Exception as e:
+        # send_batch only raises before sending anything (no connection, malformed command);
+        # once commands go out, each one reports its own outcome
+        logger.error(f"Error executing command batch: {str(e)}")
+        outcomes = [batch_item_skipped(e)] * len(runnable)
+    outcome_by_command = dict(zip(map(id, runnable), outcomes))
+    
+    results = []
+    for cmd in commands:
+        outcome = outcome_by_command.get(id(cmd), {"status": "error", "error": "Command has no function name"})
+        if outcome.get("status") == "error":
+            logger.error(f"Error executing command {cmd}: {outcome.get('error')}")
+            results.append({
+                "command": cmd.get("function"),
+                "arguments": cmd.get("arguments", {}),
+                "error": outcome.get("error"),
+                "success": False,
+                # Not sent to Unity at all, as opposed to sent and failed (or of unknown outcome)
+                "executed": not outcome.get("skipped", False)
+            })
+        else:
+            results.append({
+                "command": cmd.get("function"),
+                "arguments": cmd.get("arguments", {}),
+                "result": outcome.get("result", {}),
+                "success": True
+            })
+    return results
+
+async def _run_streamed_commands(queue: asyncio.Queue, timings: Dict[str, float], start: float) -> List[Dict[str, Any]]:
+    """Execute commands from ``queue`` while the model is still generating, until a None arrives.
+    
+    Commands that queue up while a batch is in flight go out together as the next batch,
+    so order is kept and Unity is never more than one batch behind the model.
+    """
+    results = []
+    while True:
+        chunk = [await queue.get()]
+        while not queue.empty():
+            chunk.append(queue.get_nowait())
+        finished = chunk[-1] is None  # The end marker is queued last, after every command
+        commands = [cmd for cmd in chunk if cmd is not None]
+        if commands:
+            results.extend(await _run_unity_commands(commands))
+            timings.setdefault("first_result", time.perf_counter() - start)
+        if finished:
+            return results
+
 # Add new Ollama-specific functionality
 @mcp.tool()
-async def process_user_request(ctx: Context, prompt: str) -> Dict[str, Any]:
+async def process_user_request(ctx: Context, prompt: str, stream: Optional[bool] = None,
+                               cache: Optional[bool] = None, session_id: Optional[str] = None,
+                               priority: str = "interactive") -> Dict[str, Any]:
     """
     Process a natural language request using Ollama and execute the resulting Unity commands.
     
     Args:
         prompt: The user's natural language request for Unity modifications
+        stream: Execute each command as soon as the model has written it, while it is still
+            generating the rest (default: config.ollama_stream, off). Otherwise commands run after
+            the whole response has arrived. Streaming runs every command object the model writes,
+            even one in prose beside a code block, which the unstreamed path would ignore.
+        cache: True to reuse a cached completion of the same prompt even though the temperature
+            is above 0, False to always ask the model (default: cache only deterministic requests)
+        session_id: Continue the chat session with this ID: the model keeps its state from the
+            session's earlier requests and evaluates only the new prompt. The response reports the
+            turn's prompt evaluation time (``prompt_eval_duration``, in nanoseconds) under ``session``.
+        priority: "interactive" (default), "background" or "batch"; when more requests want the
+            model than config.ollama_max_concurrency allows, more urgent classes go first
     
     Returns:
-        A dictionary containing the result of the operations
+        A dictionary containing the result of the operations, with ``timings`` in seconds
+        from the start of generation to the first command, the first Unity result and the
+        end of generation
     """
     global _ollama_connection, _unity_connection
     
@@ -164,7 +250,7 @@ async def process_user_request(ctx: Context, prompt: str) -> Dict[str, Any]:
     
     if not _unity_connection:
         try:
-            _unity_connection = get_unity_connection()
+            _unity_connection = await get_async_unity_connection()
         except Exception as e:
             return {"status": "error", "message": f"Unity connection error: {str(e)}"}
     
@@ -175,64 +261,90 @@ async def process_user_request(ctx: Context, prompt: str) -> Dict[str, Any]:
     full_system_prompt = config.ollama_system_prompt + "\n\nAvailable functions:\n" + strategy
     
     try:
-        # Get response from Ollama
-        response_text, full_response = await _ollama_connection.get_completion(
-            prompt=prompt,
-            system_prompt=full_system_prompt,
-            temperature=config.ollama_temperature
-        )
+        session = _ollama_connection.session(session_id) if session_id else None
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        if config.ollama_stream if stream is None else stream:
+            # Hand commands to a worker as they close in the token stream
+            queue: asyncio.Queue = asyncio.Queue()
+            
+            def on_command(command: Dict[str, Any]):
+                timings.setdefault("first_command", time.perf_counter() - start)
+                queue.put_nowait(command)
+            
+            worker = asyncio.create_task(_run_streamed_commands(queue, timings, start))
+            try:
+                response_text, full_response = await _ollama_connection.stream_commands(
+                    prompt=prompt,
+                    system_prompt=full_system_prompt,
+                    temperature=config.ollama_temperature,
+                    cache=cache,
+                    session=session,
+                    priority=priority,
+                    on_command=on_command
+                )
+            except asyncio.CancelledError:
+                # The client gave up; don't go on changing the scene for it
+                worker.cancel()
+                raise
+            except Exception:
+                # Let the commands generated before the failure finish, and retrieve the worker's outcome
+                queue.put_nowait(None)
+                await asyncio.gather(worker, return_exceptions=True)
+                raise
+            finally:
+                timings["generation"] = time.perf_counter() - start
+            queue.put_nowait(None)
+            results = await worker
+        else:
+            # Get the whole response from Ollama, then extract and execute its commands
+            response_text, full_response = await _ollama_connection.get_completion(
+                prompt=prompt,
+                system_prompt=full_system_prompt,
+                temperature=config.ollama_temperature,
+                cache=cache,
+                session=session,
+                priority=priority
+            )
+            timings["generation"] = time.perf_counter() - start
+            commands = await _ollama_connection.extract_mcp_commands(response_text) if response_text else []
+            if commands:
+                timings["first_command"] = timings["generation"]
+                results = await _run_unity_commands(commands)
+                timings["first_result"] = time.perf_counter() - start
+            else:
+                results = []
+        timings = {name: round(seconds, 3) for name, seconds in timings.items()}
+        turn = {"session": {"id": session_id, **full_response["turn"]}} if "turn" in full_response else {}
         
         if not response_text:
             return {
                 "status": "error", 
-                "message": "Received empty response from Ollama",
+                "message": full_response.get("error") or "Received empty response from Ollama",
                 "llm_response": ""
             }
         
-        # Extract commands from the response
-        commands = await _ollama_connection.extract_mcp_commands(response_text)
-        
-        if not commands:
+        if not results:
             return {
                 "status": "success", 
                 "message": "No executable commands found in LLM response",
                 "llm_response": response_text,
                 "commands_executed": 0,
-                "results": []
+                "results": [],
+                "timings": timings,
+                "cached": full_response.get("cached", False),
+                **turn
             }
         
-        # Execute each extracted command
-        results = []
-        for cmd in commands:
-            try:
-                function_name = cmd.get("function")
-                arguments = cmd.get("arguments", {})
-                
-                logger.info(f"Executing command: {function_name} with args: {arguments}")
-                
-                # Execute the command using Unity connection
-                result = _unity_connection.send_command(function_name, arguments)
-                results.append({
-                    "command": function_name,
-                    "arguments": arguments,
-                    "result": result,
-                    "success": True
-                })
-            except Exception as e:
-                logger.error(f"Error executing command {cmd}: {str(e)}")
-                results.append({
-                    "command": cmd.get("function"),
-                    "arguments": cmd.get("arguments", {}),
-                    "error": str(e),
-                    "success": False
-                })
-        
         return {
             "status": "success",
             "message": f"Executed {len(results)} commands",
             "llm_response": response_text,
             "commands_executed": len(results),
-            "results": results
+            "results": results,
+            "timings": timings,
+            "cached": full_response.get("cached", False),
+            **turn
         }
         
     except Exception as e:
@@ -256,13 +368,23 @@ async def get_ollama_status() -> Dict[str, Any]:
         if not _ollama_connection:
             _ollama_connection = await get_ollama_connection()
             
-        is_connected = await _ollama_connection.test_connection()
+        # Answered from the last observed state; Ollama is only asked when that is stale
+        status = await _ollama_connection.get_status()
+        completions = get_completion_cache()
         
         return {
-            "status": "connected" if is_connected else "disconnected",
+            "status": "connected" if status["connected"] else "disconnected",
             "model": _ollama_connection.model,
             "host": _ollama_connection.host,
-            "port": _ollama_connection.port
+            "port": _ollama_connection.port,
+            "model_status": status["model_status"] if status["connected"] else {"loaded": False},
+            "model_info": status["model_info"],
+            "checked_seconds_ago": status["checked_seconds_ago"],
+            "model_registry": _ollama_connection.registry.get_stats(),
+            "requests": _ollama_connection.get_request_stats(),
+            "scheduler": _ollama_connection.scheduler.get_stats(),
+            "completion_cache": completions.get_stats() if completions is not None else {"enabled": False},
+            "sessions": _ollama_connection.get_session_stats()
         }
     except Exception as e:
         logger.error(f"Error checking Ollama status: {str(e)}")
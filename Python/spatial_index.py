@@ -0,0 +1,361 @@
+"""
+Spatial index over the world positions of the scene's objects.
+
+Answering "what is near the player?" used to take a ``get_object_properties``
+round trip per candidate object. The index loads every object's world
+position from one ``GET_HIERARCHY`` request (with ``include_transforms`` set;
+any hierarchy reply that carries positions refreshes it as well) into NumPy
+arrays and answers radius and box queries in memory:
+
+* positions are bucketed into a uniform grid whose cell size follows the
+  object density, stored as a cell-sorted array, so a query only looks at the
+  objects in the cells it overlaps (``searchsorted`` per grid column),
+* queries covering a large part of the scene skip the grid and test every
+  position in one vectorized pass,
+* rows are kept in hierarchy pre-order, so an object's subtree is a
+  contiguous slice: moving an object shifts the slice in place, and deleting
+  it masks the slice out,
+* changes the index cannot follow (re-parenting, rotating or scaling an object
+  with children, instantiated prefabs, undo, scene changes) mark it stale, and
+  the next query reloads it. It is also reloaded once older than
+  ``config.spatial_index_max_age``, to pick up objects moved by hand.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+from config import config
+from unity_connection import add_command_observer
+from scene_mirror import hierarchy_roots, hierarchy_children, hierarchy_node_id, HIERARCHY_NEUTRAL_COMMANDS, \
+    SCENE_CHANGING_COMMANDS
+
+logger = logging.getLogger("UnityMCP.SpatialIndex")
+
+# Keys under which bridges report a hierarchy node's world position
+_POSITION_KEYS = ("position", "worldPosition", "world_position")
+
+# Average number of objects per occupied grid cell the automatic cell size aims for
+_OBJECTS_PER_CELL = 8
+
+# Upper bound on grid cells per axis, which keeps packed cell keys within int64
+_MAX_CELLS_PER_AXIS = 1 << 20
+
+def _vector(value: Any) -> Optional[Tuple[float, float, float]]:
+    """An [x, y, z] list or {"x", "y", "z"} dict as a tuple, or None."""
+    try:
+        if isinstance(value, dict):
+            return float(value["x"]), float(value["y"]), float(value["z"])
+        if isinstance(value, (list, tuple)) and len(value) >= 3:
+            return float(value[0]), float(value[1]), float(value[2])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+def node_position(raw: Any) -> Optional[Tuple[float, float, float]]:
+    """The world position reported for a hierarchy node, if any."""
+    if not isinstance(raw, dict):
+        return None
+    for key in _POSITION_KEYS:
+        if key in raw:
+            return _vector(raw[key])
+    transform = raw.get("transform")
+    if isinstance(transform, dict):
+        return _vector(transform.get("position"))
+    return None
+
+class SpatialIndex:
+    """World positions of the scene's objects, with a uniform grid for range queries."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._names: List[str] = []
+        self._parents: List[int] = []  # Row of each object's parent, -1 for roots
+        self._ids: List[Any] = []
+        self._rows_by_name: Dict[str, List[int]] = {}
+        self._positions = np.empty((0, 3))  # NaN where the bridge reported no position
+        self._alive = np.empty(0, dtype=bool)
+        self._subtree_end = np.empty(0, dtype=np.int64)  # Rows [i, end[i]) are object i and its descendants
+        self._paths: Dict[int, str] = {}
+        # Grid over the positioned rows, rebuilt lazily after positions change
+        self._grid_valid = False
+        self._order = np.empty(0, dtype=np.int64)  # Rows sorted by cell key
+        self._keys = np.empty(0, dtype=np.int64)  # Their cell keys
+        self._origin = np.zeros(3)
+        self._cell = 1.0
+        self._dims = np.ones(3, dtype=np.int64)
+        self._loaded_at: Optional[float] = None
+        self._stale = True
+        self.stats = {"loads": 0, "queries": 0, "grid_queries": 0, "scans": 0, "moves": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return int(self._alive.sum())
+
+    @property
+    def fresh(self) -> bool:
+        if self._stale or self._loaded_at is None:
+            return False
+        max_age = config.spatial_index_max_age
+        return max_age <= 0 or time.monotonic() - self._loaded_at < max_age
+
+    # Loading
+
+    def load(self, hierarchy: Any) -> bool:
+        """Replace the index with a GET_HIERARCHY result; False if it carries no positions."""
+        roots = hierarchy_roots(hierarchy)
+        if roots is None:
+            return False
+        names, parents, ids, positions = [], [], [], []
+        # Iterative walk: deep hierarchies must not hit the recursion limit
+        stack = [(raw, -1) for raw in reversed(roots)]
+        while stack:
+            raw, parent = stack.pop()
+            if isinstance(raw, dict) and raw.get("name"):
+                name = str(raw["name"])
+            elif isinstance(raw, str) and raw:
+                name = raw
+            else:
+                continue
+            row = len(names)
+            names.append(name)
+            parents.append(parent)
+            ids.append(hierarchy_node_id(raw))
+            positions.append(node_position(raw) or (math.nan, math.nan, math.nan))
+            stack.extend((child, row) for child in reversed(hierarchy_children(raw)))
+
+        array = np.array(positions, dtype=float).reshape(-1, 3)
+        if len(array) and np.isnan(array[:, 0]).all():
+            return False
+
+        # Pre-order: a child's subtree ends before its parent's does
+        subtree_end = np.arange(1, len(names) + 1, dtype=np.int64)
+        for row in range(len(names) - 1, -1, -1):
+            parent = parents[row]
+            if parent >= 0 and subtree_end[row] > subtree_end[parent]:
+                subtree_end[parent] = subtree_end[row]
+        rows_by_name: Dict[str, List[int]] = {}
+        for row, name in enumerate(names):
+            rows_by_name.setdefault(name, []).append(row)
+
+        with self._lock:
+            self._names, self._parents, self._ids = names, parents, ids
+            self._rows_by_name = rows_by_name
+            self._positions = array
+            self._alive = np.ones(len(names), dtype=bool)
+            self._subtree_end = subtree_end
+            self._paths = {}
+            self._grid_valid = False
+            self._loaded_at = time.monotonic()
+            self._stale = False
+            self.stats["loads"] += 1
+        logger.info(f"Spatial index loaded with {len(names)} objects")
+        return True
+
+    def ensure_fresh(self, unity):
+        """Reload the index from Unity if it is stale."""
+        if self.fresh:
+            return
+        result = unity.send_command("GET_HIERARCHY", {"include_transforms": True})
+        # The observer usually loaded it already, on the thread that received the reply
+        if not self.fresh and not self.load(result):
+            raise ValueError("Unity did not report object positions in GET_HIERARCHY (include_transforms)")
+
+    def invalidate(self):
+        with self._lock:
+            self._stale = True
+            self.stats["invalidations"] += 1
+
+    # Observer
+
+    def _resolve(self, name_or_path: str) -> Optional[int]:
+        """Row of the object a command's name parameter refers to, as GameObject.Find would."""
+        path = name_or_path.lstrip("/")
+        leaf = path.rsplit("/", 1)[-1]
+        for row in self._rows_by_name.get(leaf, ()):
+            if self._alive[row] and ("/" not in path or self._path(row) == path):
+                return row
+        return None
+
+    def _append(self, name: str, position: Optional[Tuple[float, float, float]]):
+        """Add a new root object with no children, which keeps the rows in pre-order."""
+        row = len(self._names)
+        self._names.append(name)
+        self._parents.append(-1)
+        self._ids.append(None)
+        self._rows_by_name.setdefault(name, []).append(row)
+        self._positions = np.vstack([self._positions, position or (math.nan, math.nan, math.nan)])
+        self._alive = np.append(self._alive, True)
+        self._subtree_end = np.append(self._subtree_end, row + 1)
+        self._grid_valid = False
+
+    def observe(self, command_type: str, params: Dict[str, Any], result: Any):
+        """Keep the index in step with a command Unity executed successfully."""
+        if command_type == "GET_HIERARCHY":
+            self.load(result)
+            return
+        if command_type in SCENE_CHANGING_COMMANDS:
+            self.invalidate()
+            return
+        if command_type in HIERARCHY_NEUTRAL_COMMANDS or self._stale:
+            return
+        with self._lock:
+            if not self._apply(command_type, params, result if isinstance(result, dict) else {}):
+                self._stale = True
+                self.stats["invalidations"] += 1
+
+    def _apply(self, command_type: str, params: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """Apply a command in place; False if it cannot be followed."""
+        if command_type == "MODIFY_OBJECT":
+            if params.get("set_parent") is not None:
+                return False
+            row = self._resolve(str(params.get("name") or ""))
+            if row is None:
+                return False
+            end = int(self._subtree_end[row])
+            if end > row + 1 and (params.get("rotation") is not None or params.get("scale") is not None):
+                return False  # Children orbit or spread around the object
+            location = _vector(params.get("location"))
+            if location is not None:
+                if np.isnan(self._positions[row, 0]):
+                    return False
+                self._positions[row:end] += np.array(location) - self._positions[row]
+                self._grid_valid = False
+                self.stats["moves"] += 1
+            return True
+        if command_type == "CREATE_OBJECT":
+            name = result.get("name") or params.get("name")
+            if not name or params.get("parent"):
+                return False
+            self._append(str(name), _vector(params.get("location")))
+            return True
+        if command_type == "DELETE_OBJECT":
+            row = self._resolve(str(params.get("name") or ""))
+            if row is None:
+                return False
+            self._alive[row:int(self._subtree_end[row])] = False
+            self._grid_valid = False
+            return True
+        return False
+
+    # Queries
+
+    def _path(self, row: int) -> str:
+        path = self._paths.get(row)
+        if path is None:
+            parent = self._parents[row]
+            path = self._names[row] if parent < 0 else f"{self._path(parent)}/{self._names[row]}"
+            self._paths[row] = path
+        return path
+
+    def _build_grid(self):
+        positioned = np.flatnonzero(self._alive & ~np.isnan(self._positions[:, 0]))
+        points = self._positions[positioned]
+        if not len(points):
+            self._order = self._keys = np.empty(0, dtype=np.int64)
+            self._grid_valid = True
+            return
+        low, high = points.min(axis=0), points.max(axis=0)
+        extent = high - low
+        cell = config.spatial_grid_cell_size
+        if cell <= 0:
+            # Cells sized so the scene's occupied axes hold about _OBJECTS_PER_CELL objects per cell;
+            # flat scenes (everything near one height) get square cells over the ground plane
+            active = extent[extent > extent.max() * 1e-3] if extent.max() > 0 else extent[:0]
+            if len(active):
+                cells = max(1.0, len(points) / _OBJECTS_PER_CELL)
+                cell = float(np.prod(active) ** (1 / len(active)) / cells ** (1 / len(active)))
+            else:
+                cell = 1.0
+        cell = max(cell, float(extent.max()) / (_MAX_CELLS_PER_AXIS - 1), 1e-9)
+        dims = (extent // cell).astype(np.int64) + 1
+        cells = ((points - low) // cell).astype(np.int64)
+        keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+        order = np.argsort(keys, kind="stable")
+        self._order, self._keys = positioned[order], keys[order]
+        self._origin, self._cell, self._dims = low, cell, dims
+        self._grid_valid = True
+
+    def _rows_in_box(self, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+        """Rows of the live objects inside an axis-aligned box, in no particular order."""
+        if not self._grid_valid:
+            self._build_grid()
+        if not len(self._keys) or np.any(high < self._origin) or np.any(low > self._origin + self._dims * self._cell):
+            return self._keys[:0]
+        first = np.clip(np.floor((low - self._origin) / self._cell), 0, self._dims - 1).astype(np.int64)
+        last = np.clip(np.floor((high - self._origin) / self._cell), 0, self._dims - 1).astype(np.int64)
+        span = last - first + 1
+        if span[0] * span[1] > len(self._keys) // _OBJECTS_PER_CELL or np.prod(span / self._dims) > 0.2:
+            # Covers much of the grid: one pass over everything is cheaper
+            self.stats["scans"] += 1
+            candidates = self._order
+        else:
+            # Each (x, y) column of cells is one contiguous key range
+            xs, ys = np.meshgrid(np.arange(first[0], last[0] + 1), np.arange(first[1], last[1] + 1), indexing="ij")
+            base = (xs.ravel() * self._dims[1] + ys.ravel()) * self._dims[2]
+            starts = np.searchsorted(self._keys, base + first[2], side="left")
+            ends = np.searchsorted(self._keys, base + last[2], side="right")
+            lengths = ends - starts
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            candidates = self._order[np.arange(int(lengths.sum())) + offsets]
+            self.stats["grid_queries"] += 1
+        points = self._positions[candidates]
+        inside = np.all((points >= low) & (points <= high), axis=1)
+        return candidates[inside]
+
+    def _describe(self, rows: np.ndarray, distances: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        positions = np.round(self._positions[rows], 4).tolist()
+        entries = [{"name": self._names[row], "path": self._path(row), "position": position}
+                   for row, position in zip(rows.tolist(), positions)]
+        if distances is not None:
+            for entry, distance in zip(entries, np.round(distances, 4).tolist()):
+                entry["distance"] = distance
+        return entries
+
+    def find_near(self, point: Sequence[float], radius: float) -> List[Dict[str, Any]]:
+        """Objects within ``radius`` of ``point``, nearest first."""
+        center = np.asarray(point, dtype=float)[:3]
+        with self._lock:
+            self.stats["queries"] += 1
+            rows = self._rows_in_box(center - radius, center + radius)
+            distances = np.linalg.norm(self._positions[rows] - center, axis=1)
+            keep = distances <= radius
+            order = np.argsort(distances[keep], kind="stable")
+            return self._describe(rows[keep][order], distances[keep][order])
+
+    def find_in_box(self, low: Sequence[float], high: Sequence[float]) -> List[Dict[str, Any]]:
+        """Objects inside the box between two corners, in hierarchy order."""
+        corners = np.array([low, high], dtype=float)[:, :3]
+        with self._lock:
+            self.stats["queries"] += 1
+            return self._describe(np.sort(self._rows_in_box(corners.min(axis=0), corners.max(axis=0))))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            positioned = int((self._alive & ~np.isnan(self._positions[:, 0])).sum())
+            return {"objects": len(self), "positioned": positioned, "fresh": self.fresh,
+                    "cell_size": round(self._cell, 4) if self._grid_valid else None, **self.stats}
+
+# Global spatial index
+_spatial_index: Optional[SpatialIndex] = None
+
+def get_spatial_index() -> SpatialIndex:
+    """Retrieve the global spatial index, creating it on first use."""
+    global _spatial_index
+    if _spatial_index is None:
+        _spatial_index = SpatialIndex()
+        add_command_observer(_spatial_index.observe)
+    return _spatial_index
+
+def find_objects_near(unity, point: Sequence[float], radius: float) -> List[Dict[str, Any]]:
+    """Objects within ``radius`` of ``point``, nearest first, from the (refreshed) index."""
+    index = get_spatial_index()
+    index.ensure_fresh(unity)
+    return index.find_near(point, radius)
+
+def find_objects_in_box(unity, low: Sequence[float], high: Sequence[float]) -> List[Dict[str, Any]]:
+    """Objects inside the box between ``low`` and ``high``, from the (refreshed) index."""
+    index = get_spatial_index()
+    index.ensure_fresh(unity)
+    return index.find_in_box(low, high)
@@ -3,7 +3,7 @@ import json
 import logging
 import os
 import sys
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Awaitable, Dict, Any, List, Optional, Tuple
 from ollama_connection import get_ollama_connection, OllamaConnection
 from config import config
 import traceback
@@ -41,6 +41,9 @@ class MCPTCPServer:
             is_connected = await _ollama_connection.test_connection()
             if is_connected:
                 logger.info(f"Connected to Ollama with model {_ollama_connection.model}")
+                if config.ollama_warm_up:
+                    # Load the model in the background so the first request doesn't pay for it
+                    _ollama_connection.start_keeper()
             else:
                 logger.warning(f"Ollama connection test failed")
         except Exception as e:
@@ -55,20 +58,35 @@ class MCPTCPServer:
         addr = self.server.sockets[0].getsockname()
         logger.info(f'TCP Server running on {addr[0]}:{addr[1]}')
         
-        async with self.server:
-            await self.server.serve_forever()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            await self.stop()
+    
+    async def stop(self):
+        """Stop accepting clients, this loop's model keeper and its pooled HTTP connections to Ollama"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if _ollama_connection is not None:
+            await _ollama_connection.close()
     
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle TCP client connection"""
         addr = writer.get_extra_info('peername')
         logger.info(f'Connection from {addr}')
+        # The next read is always pending, so a disconnect is noticed while a request is being processed
+        read = asyncio.ensure_future(reader.read(8192))
         
         while True:
             try:
                 # Read data until we get a complete message
-                data = await reader.read(8192)
+                data = await read
                 if not data:
                     break
+                read = asyncio.ensure_future(reader.read(8192))
                 
                 message = data.decode('utf-8')
                 logger.debug(f"Received: {message[:100]}...")
@@ -83,7 +101,10 @@ class MCPTCPServer:
                 # Process the command
                 try:
                     command = json.loads(message)
-                    response = await self.process_command(command)
+                    response = await self._unless_disconnected(self.process_command(command), read)
+                    if response is None:
+                        logger.info(f"{addr} disconnected; cancelled its {command.get('type')} request")
+                        break
                 except json.JSONDecodeError:
                     response = json.dumps({
                         "status": "error",
@@ -110,9 +131,28 @@ class MCPTCPServer:
                 break
         
         logger.info(f'Closing connection from {addr}')
+        read.cancel()
         writer.close()
         await writer.wait_closed()
     
+    async def _unless_disconnected(self, request: Awaitable[str], read: asyncio.Future) -> Optional[str]:
+        """Await a request, cancelling it if the client disconnects first; None if it did
+        
+        The Ollama generation behind a cancelled request keeps running for
+        config.ollama_abandon_grace seconds, so the client's retry picks it up.
+        """
+        task = asyncio.ensure_future(request)
+        await asyncio.wait({task, read}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done() and (read.cancelled() or read.exception() is not None or not read.result()):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return None
+        # Finished, or the client sent its next message already, which waits its turn
+        return await task
+    
     async def process_command(self, command: Dict[str, Any]) -> str:
         """Process command and return JSON response string"""
         global _ollama_connection
@@ -162,7 +202,7 @@ class MCPTCPServer:
             })
     
     async def handle_process_user_request(self, params: Dict[str, Any]) -> str:
-        """Handle process_user_request command"""
+        """Handle process_user_request command, continuing the chat session named by its session_id"""
         global _ollama_connection
         
         prompt = params.get("prompt", "")
@@ -205,10 +245,16 @@ class MCPTCPServer:
             system_prompt = get_system_prompt()
             
             # Ollamaに送信
+            # Only a client-chosen session_id continues a session: the editor opens a new connection
+            # for every message, and clients sharing a host must not see each other's context.
+            # The session outlives the connection until config.ollama_session_ttl idle seconds pass
+            session_id = params.get("session_id")
             response_text, full_response = await _ollama_connection.get_completion(
                 prompt=prompt,
                 system_prompt=system_prompt,
-                temperature=config.ollama_temperature
+                temperature=config.ollama_temperature,
+                session=_ollama_connection.session(session_id) if session_id else None,
+                priority=params.get("priority", "interactive")
             )
             
             if not response_text:
@@ -237,7 +283,8 @@ class MCPTCPServer:
                     "llm_response": response_text,
                     "commands_executed": 0,  # Unity側で実行します
                     "commands": commands,
-                    "results": []
+                    "results": [],
+                    **({"session": {"id": session_id, **full_response["turn"]}} if "turn" in full_response else {})
                 }
             })
             
@@ -261,15 +308,20 @@ class MCPTCPServer:
             if not _ollama_connection:
                 _ollama_connection = await get_ollama_connection()
                 
-            is_connected = await _ollama_connection.test_connection()
+            # Answered from the last observed state; Ollama is only asked when that is stale
+            status = await _ollama_connection.get_status()
             
             return json.dumps({
                 "status": "success",
                 "result": {
-                    "status": "connected" if is_connected else "disconnected",
+                    "status": "connected" if status["connected"] else "disconnected",
                     "model": _ollama_connection.model,
                     "host": _ollama_connection.host,
-                    "port": _ollama_connection.port
+                    "port": _ollama_connection.port,
+                    "model_status": status["model_status"] if status["connected"] else {"loaded": False},
+                    "model_info": status["model_info"],
+                    "checked_seconds_ago": status["checked_seconds_ago"],
+                    "scheduler": _ollama_connection.scheduler.get_stats()
                 }
             })
         except Exception as e:
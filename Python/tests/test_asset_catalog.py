@@ -0,0 +1,79 @@
+import pytest
+
+import asset_catalog
+from asset_catalog import AssetCatalog, asset_exists
+from config import config
+from mock_bridge import MockUnityBridge
+from unity_connection import UnityConnection, add_command_observer, remove_command_observer
+
+ASSETS = [{"name": "Level1", "path": "Assets/Scenes/Level1.unity", "type": "SceneAsset"},
+          {"name": "Bark", "path": "Assets/Textures/Bark.png", "type": "Texture2D"}]
+
+def asset_lists(bridge):
+    return [command["params"] for command in bridge.received if command["type"] == "GET_ASSET_LIST"]
+
+@pytest.fixture
+def bridge():
+    with MockUnityBridge() as bridge:
+        bridge.register("GET_ASSET_LIST", lambda params: {"assets": list(ASSETS)})
+        bridge.register("IMPORT_ASSET", lambda params: {"success": True})
+        bridge.register("CREATE_PREFAB", lambda params: {"path": params["prefab_path"]})
+        bridge.register("EDITOR_CONTROL", lambda params: {"success": True})
+        yield bridge
+
+@pytest.fixture
+def catalog(bridge, monkeypatch):
+    catalog = AssetCatalog()
+    monkeypatch.setattr(asset_catalog, "get_asset_catalog", lambda: catalog)
+    add_command_observer(catalog.observe)
+    yield catalog
+    remove_command_observer(catalog.observe)
+
+@pytest.fixture
+def connection(bridge):
+    connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+    assert connection.connect()
+    yield connection
+    connection.disconnect()
+
+def test_existence_checks_are_answered_from_one_listing(bridge, catalog, connection):
+    assert asset_exists(connection, "Assets/Textures/Bark.png", "Texture2D")
+    assert not asset_exists(connection, "Assets/Textures/Bark.png", "Material")
+    assert not asset_exists(connection, "Assets/Textures/Moss.png")
+    assert asset_lists(bridge) == [{"type": None, "search_pattern": "*", "folder": "Assets"}]
+
+def test_created_assets_join_the_catalog(bridge, catalog, connection):
+    assert catalog.ensure_fresh(connection)
+    connection.send_command("IMPORT_ASSET", {"source_path": "/tmp/Moss.png", "target_path": "Assets/Textures/Moss.png"})
+    connection.send_command("CREATE_PREFAB", {"object_name": "Tree", "prefab_path": "Assets/Prefabs/Tree.prefab"})
+    assert asset_exists(connection, "Assets/Textures/Moss.png")
+    assert asset_exists(connection, "Assets/Prefabs/Tree.prefab")
+    assert catalog.stats["applied"] == 2
+    assert len(asset_lists(bridge)) == 1
+
+def test_editor_commands_the_catalog_cannot_follow_reload_it(bridge, catalog, connection):
+    assert catalog.ensure_fresh(connection)
+    connection.send_command("EDITOR_CONTROL", {"command": "EXECUTE_COMMAND", "params": {"name": "Assets/Refresh"}})
+    assert not catalog.fresh
+    assert asset_exists(connection, "Assets/Scenes/Level1.unity")
+    assert len(asset_lists(bridge)) == 2
+
+def test_failed_loads_are_retried_unless_the_bridge_lacks_the_command(bridge, catalog, connection, monkeypatch):
+    monkeypatch.setattr(config, "asset_catalog_retry_backoff", 0.0)
+    replies = iter([Exception("Timed out waiting for the editor")])
+
+    def flaky(params):
+        error = next(replies, None)
+        if error is not None:
+            raise error
+        return {"assets": list(ASSETS)}
+
+    bridge.register("GET_ASSET_LIST", flaky)
+    assert not catalog.ensure_fresh(connection)
+    assert catalog.ensure_fresh(connection)
+
+    catalog.invalidate()
+    del bridge.handlers["GET_ASSET_LIST"]
+    assert not catalog.ensure_fresh(connection)
+    assert not catalog.ensure_fresh(connection)
+    assert len(asset_lists(bridge)) == 3
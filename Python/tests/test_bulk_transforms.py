@@ -0,0 +1,71 @@
+import math
+
+import numpy as np
+import pytest
+
+import bulk_transforms
+from bulk_transforms import non_finite_rows, vector_array
+from mock_bridge import MockUnityBridge
+from scene_mirror import SceneMirror
+from unity_connection import UnityConnection
+
+class ToolRecorder:
+    """Collects the functions an mcp.tool() decorator would register."""
+
+    def tool(self):
+        def register(function):
+            setattr(self, function.__name__, function)
+            return function
+        return register
+
+def test_single_row_is_broadcast_to_every_object():
+    array = vector_array([1, 2, 3], 4, "positions")
+    assert array.shape == (4, 3)
+    assert (array == [1, 2, 3]).all()
+    assert vector_array([[0, 0, 0], [1, 1, 1]], 2, "scales").tolist() == [[0, 0, 0], [1, 1, 1]]
+
+@pytest.mark.parametrize("values", [[[1, 2, 3]], [[1, 2], [3, 4]], [1, 2], [["a", "b", "c"]] * 2, [[1, 2, 3], None]])
+def test_values_of_the_wrong_shape_or_type_are_refused(values):
+    with pytest.raises(ValueError, match="positions"):
+        vector_array(values, 2, "positions")
+
+def test_non_finite_rows_name_the_first_bad_field():
+    arrays = {"positions": np.array([[0, 0, 0], [math.nan, 0, 0], [0, 0, 0]]),
+              "scales": np.array([[1, 1, 1], [math.inf, 1, 1], [1, -math.inf, 1]])}
+    assert non_finite_rows(arrays) == {1: "positions has non-finite values", 2: "scales has non-finite values"}
+
+def test_set_transforms_bulk_sends_the_valid_rows_in_one_batch(monkeypatch):
+    from tools import scene_tools
+
+    mirror = SceneMirror()
+    mirror.load({"hierarchy": [{"name": name, "instanceID": i, "children": []} for i, name in enumerate("ABC")]})
+    monkeypatch.setattr(bulk_transforms, "get_scene_mirror", lambda: mirror)
+
+    def modify(params):
+        if params["name"] == "B":
+            raise Exception("B is locked")
+        return {"name": params["name"]}
+
+    with MockUnityBridge() as bridge:
+        bridge.register("MODIFY_OBJECT", modify)
+        connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+        assert connection.connect()
+        monkeypatch.setattr(scene_tools, "get_unity_connection", lambda: connection)
+        tools = ToolRecorder()
+        scene_tools.register_scene_tools(tools)
+        try:
+            result = tools.set_transforms_bulk(None, ["A", "B", "Ghost", "C"],
+                                               positions=[[0, 0, 0], [1, 0, 0], [2, 0, 0], [math.inf, 0, 0]],
+                                               rotations=[0, 90, 0])
+        finally:
+            connection.disconnect()
+
+    assert result["summary"] == "Updated 1 of 4 objects"
+    assert [(failure["index"], failure["name"]) for failure in result["failed"]] == [(1, "B"), (2, "Ghost"), (3, "C")]
+    assert "locked" in result["failed"][0]["error"]
+    assert "not found" in result["failed"][1]["error"]
+    assert "non-finite" in result["failed"][2]["error"]
+    [batch] = bridge.received
+    assert batch["params"]["commands"] == [
+        {"type": "MODIFY_OBJECT", "params": {"name": name, "location": location, "rotation": [0.0, 90.0, 0.0]}}
+        for name, location in [("A", [0.0, 0.0, 0.0]), ("B", [1.0, 0.0, 0.0])]]
@@ -0,0 +1,81 @@
+import json
+import sqlite3
+
+from ollama_connection import CompletionCache, default_cache_path
+
+def entry_size(key: str, text: str, data: dict) -> int:
+    return len(key) + len(text.encode("utf-8")) + len(json.dumps(data).encode("utf-8"))
+
+def test_evicts_least_recently_used_first(tmp_path):
+    size = entry_size("k0", "x" * 100, {})
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), max_bytes=3 * size)
+    for i in range(3):
+        cache.put(f"k{i}", "x" * 100, {})
+    assert cache.get("k0") is not None  # k1 is now the least recently used
+    cache.put("k3", "x" * 100, {})
+    assert cache.get("k1") is None
+    assert all(cache.get(key) is not None for key in ("k0", "k2", "k3"))
+    stats = cache.get_stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+
+def test_one_large_entry_evicts_several_small_ones(tmp_path):
+    small = entry_size("k0", "x" * 10, {})
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), max_bytes=10 * small)
+    for i in range(10):
+        cache.put(f"k{i}", "x" * 10, {})
+    cache.put("big", "y" * (4 * small), {})
+    assert cache.get("big") is not None
+    assert [cache.get(f"k{i}") is None for i in range(6)] == [True] * 5 + [False]
+
+def test_entry_larger_than_the_bound_is_not_stored(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), max_bytes=100)
+    cache.put("small", "ok", {})
+    cache.put("huge", "x" * 1000, {})
+    assert cache.get("huge") is None
+    assert cache.get("small") is not None
+    assert cache.stats["evictions"] == 0
+
+def test_replacing_a_key_keeps_the_byte_count(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), max_bytes=10_000)
+    cache.put("k", "first", {})
+    cache.put("k", "second", {})
+    assert cache.get_stats()["bytes"] == entry_size("k", "second", {})
+    assert cache.get("k")[0] == "second"
+
+def test_eviction_and_recency_persist(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    size = entry_size("k0", "x" * 100, {"done": True})
+    cache = CompletionCache(path, max_bytes=2 * size)
+    for i in range(3):
+        cache.put(f"k{i}", "x" * 100, {"done": True})
+    cache.get("k1")
+    cache._db.close()
+
+    reopened = CompletionCache(path, max_bytes=size)
+    # k0 was evicted before the restart; k2 is older than k1 and goes at load
+    assert reopened.get("k0") is None
+    assert reopened.get("k2") is None
+    assert reopened.get("k1") == ("x" * 100, {"done": True, "cached": True})
+    keys = [key for key, in sqlite3.connect(path).execute("SELECT key FROM completions")]
+    assert keys == ["k1"]
+
+def test_context_is_not_stored(tmp_path):
+    cache = CompletionCache(str(tmp_path / "cache.sqlite3"), max_bytes=10_000)
+    cache.put("k", "text", {"response": "text", "context": list(range(500)), "eval_count": 3})
+    assert cache.get("k")[1] == {"response": "text", "eval_count": 3, "cached": True}
+
+def test_unusable_file_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    cache = CompletionCache(str(blocker / "cache.sqlite3"), max_bytes=10_000)
+    cache.put("k", "text", {})
+    assert cache.get("k") == ("text", {"cached": True})
+    assert cache.get_stats()["path"] is None
+
+def test_default_path_is_in_the_user_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr("os.name", "posix")
+    monkeypatch.setattr("sys.platform", "linux")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_path() == str(tmp_path / "unity-mcp" / "ollama_cache.sqlite3")
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from config import config
+from ollama_connection import CompletionScheduler, QueueTimeout
+
+@pytest.fixture(autouse=True)
+def one_slot(monkeypatch):
+    monkeypatch.setattr(config, "ollama_max_concurrency", 1)
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_queued_requests_are_admitted_by_priority_then_arrival():
+    async def run():
+        scheduler, admitted = CompletionScheduler(), []
+
+        async def generation(name, priority):
+            await scheduler.acquire(priority)
+            admitted.append(name)
+            await settle()
+            scheduler.release()
+
+        await scheduler.acquire()  # Holds the only slot while the others queue
+        tasks = []
+        for name, priority in [("batch", "batch"), ("background", "background"),
+                               ("interactive 1", "interactive"), ("interactive 2", "interactive")]:
+            tasks.append(asyncio.ensure_future(generation(name, priority)))
+            await settle()
+        assert scheduler.get_stats()["queued"] == {"batch": 1, "background": 1, "interactive": 2}
+        scheduler.release()
+        await asyncio.gather(*tasks)
+        return scheduler, admitted
+
+    scheduler, admitted = asyncio.run(run())
+    assert admitted == ["interactive 1", "interactive 2", "background", "batch"]
+    stats = scheduler.get_stats()
+    assert stats["admitted"] == 5
+    assert stats["running"] == 0
+    assert stats["queue_depth"] == 0
+
+def test_request_queued_past_its_deadline_times_out():
+    async def run():
+        scheduler = CompletionScheduler()
+        await scheduler.acquire()
+        with pytest.raises(QueueTimeout):
+            await scheduler.acquire("background", deadline=0.05)
+        scheduler.release()
+        await scheduler.acquire()  # The expired request didn't take the slot
+        return scheduler
+
+    stats = asyncio.run(run()).get_stats()
+    assert stats["expired"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["running"] == 1
+
+def test_cancelled_request_leaves_the_queue():
+    async def run():
+        scheduler = CompletionScheduler()
+        await scheduler.acquire()
+        gone = asyncio.ensure_future(scheduler.acquire())
+        waiting = asyncio.ensure_future(scheduler.acquire("batch"))
+        await settle()
+        gone.cancel()
+        await settle()
+        scheduler.release()
+        await asyncio.wait_for(waiting, 1)  # Skips the cancelled request
+        return scheduler
+
+    stats = asyncio.run(run()).get_stats()
+    assert stats["cancelled"] == 1
+    assert stats["admitted"] == 2
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 0
+
+def test_unknown_priority_is_refused():
+    with pytest.raises(ValueError):
+        asyncio.run(CompletionScheduler().acquire("urgent"))
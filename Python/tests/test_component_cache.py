@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+import component_cache
+from component_cache import ComponentCache
+from mock_bridge import MockUnityBridge
+from scene_mirror import SceneMirror
+from unity_connection import UnityConnection, add_command_observer, remove_command_observer
+
+HIERARCHY = {"hierarchy": [
+    {"name": "Rig", "instanceID": 1, "children": [
+        {"name": "Arm", "instanceID": 2, "children": [{"name": "Hand", "instanceID": 3, "children": []}]}]},
+    {"name": "Lamp", "instanceID": 4, "children": []}]}
+
+class Scene:
+    """GET_OBJECT_PROPERTIES answers for the objects above, counting how often each was asked for."""
+
+    def __init__(self):
+        self.positions = {"Rig": [0, 0, 0], "Arm": [0, 1, 0], "Hand": [0, 2, 0], "Lamp": [5, 0, 0]}
+        self.fetches = {}
+        self.delay = 0.0
+
+    def properties(self, params):
+        name = params["name"]
+        self.fetches[name] = self.fetches.get(name, 0) + 1
+        time.sleep(self.delay)
+        if params.get("components_only"):
+            return {"name": name, "components": [{"type": "Transform"}]}
+        return {"name": name, "components": [{"type": "Transform", "position": list(self.positions[name])}]}
+
+    def modify(self, params):
+        self.positions[params["name"]] = params.get("location", self.positions[params["name"]])
+        return {"name": params["name"]}
+
+@pytest.fixture
+def setup(monkeypatch):
+    scene, mirror, cache = Scene(), SceneMirror(), ComponentCache()
+    mirror.load(HIERARCHY)
+    monkeypatch.setattr(component_cache, "get_scene_mirror", lambda: mirror)
+    with MockUnityBridge() as bridge:
+        bridge.register("GET_OBJECT_PROPERTIES", scene.properties)
+        bridge.register("MODIFY_OBJECT", scene.modify)
+        for command_type in ("ATTACH_SCRIPT", "EDITOR_CONTROL"):
+            bridge.register(command_type, lambda params: {"success": True})
+        connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+        assert connection.connect()
+        add_command_observer(cache.observe)
+        try:
+            yield scene, cache, connection
+        finally:
+            remove_command_observer(cache.observe)
+            connection.disconnect()
+
+def types(cache, connection, name):
+    return [component["type"] for component in cache.submit(connection, name).result(5)["components"]]
+
+def test_component_types_are_fetched_once_per_object(setup):
+    scene, cache, connection = setup
+    scene.delay = 0.2
+    first, second = cache.submit(connection, "Hand"), cache.submit(connection, "Rig/Arm/Hand")
+    assert first.result(5) == second.result(5) == {"name": "Hand", "components": [{"type": "Transform"}]}
+    assert types(cache, connection, "Hand") == ["Transform"]
+    assert scene.fetches == {"Hand": 1}  # The mirror resolves both names to the same object
+    assert cache.stats["shared"] == 1
+    assert cache.stats["hits"] == 1
+
+def test_mutating_an_object_drops_only_its_entry(setup):
+    scene, cache, connection = setup
+    types(cache, connection, "Hand")
+    types(cache, connection, "Lamp")
+    connection.send_command("ATTACH_SCRIPT", {"object_name": "Hand", "script_name": "Grip"})
+    types(cache, connection, "Hand")
+    types(cache, connection, "Lamp")
+    assert scene.fetches == {"Hand": 2, "Lamp": 1}
+
+def test_commands_the_cache_cannot_follow_drop_everything(setup):
+    scene, cache, connection = setup
+    types(cache, connection, "Hand")
+    connection.send_command("EDITOR_CONTROL", {"command": "UNDO"})
+    types(cache, connection, "Hand")
+    assert scene.fetches == {"Hand": 2}
+    assert cache.stats["invalidations"] == 1
+
+def position(cache, connection, name):
+    return cache.submit_properties(connection, name).result(5)["components"][0]["position"]
+
+def test_callers_get_copies_of_cached_views(setup):
+    scene, cache, connection = setup
+    first = cache.submit_properties(connection, "Lamp").result(5)
+    first["components"][0]["position"][0] = 99
+    assert position(cache, connection, "Lamp") == [5, 0, 0]
+    assert scene.fetches == {"Lamp": 1}
+
+def test_moving_a_parent_drops_its_descendants_properties(setup):
+    scene, cache, connection = setup
+    for name in ("Arm", "Hand", "Lamp"):
+        position(cache, connection, name)
+    cache.submit(connection, "Hand").result(5)  # Derived from the cached dump
+    connection.send_command("MODIFY_OBJECT", {"name": "Rig", "location": [0, 10, 0]})
+    scene.positions["Hand"] = [0, 12, 0]  # Unity moved it along with the rig
+    assert position(cache, connection, "Hand") == [0, 12, 0]
+    position(cache, connection, "Arm")
+    position(cache, connection, "Lamp")
+    cache.submit(connection, "Hand").result(5)
+    assert scene.fetches == {"Arm": 2, "Hand": 2, "Lamp": 1}  # Hand's component types stayed cached
+
+def test_property_views_are_not_cached_in_play_mode(setup):
+    scene, cache, connection = setup
+    connection.send_command("EDITOR_CONTROL", {"command": "PLAY"})
+    assert cache.playing
+    position(cache, connection, "Lamp")
+    position(cache, connection, "Lamp")
+    cache.submit(connection, "Lamp").result(5)
+    cache.submit(connection, "Lamp").result(5)
+    assert scene.fetches == {"Lamp": 3}  # Two property fetches, one component type fetch
+    connection.send_command("EDITOR_CONTROL", {"command": "STOP"})
+    position(cache, connection, "Lamp")
+    position(cache, connection, "Lamp")
+    assert scene.fetches == {"Lamp": 4}
@@ -0,0 +1,117 @@
+import pytest
+
+from hierarchy_index import HierarchyIndex, longest_glob_literal
+from hierarchy_versions import diff_snapshots, snapshot_hierarchy
+
+OBJECTS = [
+    (1, "Main Camera", "MainCamera"),
+    (2, "Enemy (Clone)", "Enemy"),
+    (3, "Enemy (Clone)", "Enemy"),
+    (4, "EnemySpawner", None),
+    (5, "Player", "Player"),
+    (6, "Directional Light", "Untagged"),
+    (7, "abcXbcd", "Untagged"),
+]
+
+@pytest.fixture
+def index():
+    index = HierarchyIndex()
+    for node_id, name, tag in OBJECTS:
+        index.add(node_id, name, tag)
+    return index
+
+def test_exact_names_map_to_ids_in_order(index):
+    assert index.ids_named("Enemy (Clone)") == [2, 3]
+    assert index.ids_named("enemy (clone)") == []
+    assert index.ids_for_names(["Player", "Main Camera", "Missing"]) == [5, 1]
+    assert len(index) == 6
+
+@pytest.mark.parametrize("text, expected", [
+    ("", {"Main Camera", "Enemy (Clone)", "EnemySpawner", "Player", "Directional Light", "abcXbcd"}),
+    ("En", {"Enemy (Clone)", "EnemySpawner"}),
+    ("nemy", {"Enemy (Clone)", "EnemySpawner"}),
+    ("Light", {"Directional Light"}),
+    ("light", set()),
+    # Shares every trigram with "abcXbcd" without being a substring of it
+    ("abcd", set()),
+    ("bcd", {"abcXbcd"}),
+])
+def test_names_containing(index, text, expected):
+    assert set(index.names_containing(text)) == expected
+
+def test_names_starting_with_follows_changes(index):
+    assert index.names_starting_with("Enemy") == ["Enemy (Clone)", "EnemySpawner"]
+    index.add(8, "Enemy Boss", "Enemy")
+    assert index.names_starting_with("Enemy") == ["Enemy (Clone)", "Enemy Boss", "EnemySpawner"]
+    index.remove(4, "EnemySpawner", None)
+    assert index.names_starting_with("Enemy") == ["Enemy (Clone)", "Enemy Boss"]
+    assert index.names_starting_with("Zzz") == []
+
+@pytest.mark.parametrize("pattern, expected", [
+    ("Enemy*", {"Enemy (Clone)", "EnemySpawner"}),
+    ("*Spawn*", {"EnemySpawner"}),
+    ("P?ayer", {"Player"}),
+    ("[MP]*", {"Main Camera", "Player"}),
+    ("*", {"Main Camera", "Enemy (Clone)", "EnemySpawner", "Player", "Directional Light", "abcXbcd"}),
+    ("Player", {"Player"}),
+    ("Play", set()),
+])
+def test_names_matching(index, pattern, expected):
+    assert set(index.names_matching(pattern)) == expected
+
+def test_longest_glob_literal():
+    assert longest_glob_literal("En*my_Spawner?") == "my_Spawner"
+    assert longest_glob_literal("*") == ""
+
+def test_tags(index):
+    assert index.ids_tagged("Enemy") == [2, 3]
+    assert not index.tags_complete
+    index.remove(4, "EnemySpawner", None)
+    assert index.tags_complete
+
+def test_remove_keeps_other_objects_with_the_same_name(index):
+    index.remove(2, "Enemy (Clone)", "Enemy")
+    assert index.ids_named("Enemy (Clone)") == [3]
+    assert index.names_containing("Clone") == ["Enemy (Clone)"]
+    index.remove(3, "Enemy (Clone)", "Enemy")
+    assert index.ids_named("Enemy (Clone)") == []
+    assert index.names_containing("Clone") == []
+    assert index.ids_tagged("Enemy") == []
+
+def test_clear(index):
+    index.clear()
+    assert len(index) == 0
+    assert index.names_containing("") == []
+    assert index.names_starting_with("") == []
+
+def test_snapshot_keys_nodes_without_ids_by_path():
+    snapshot = snapshot_hierarchy([
+        {"name": "Level", "children": [{"name": "Spawn"}, {"name": "Spawn"}]},
+        {"name": "Player", "instanceID": 42},
+    ])
+    assert snapshot == {
+        "Level": ("Level", None),
+        "Level/Spawn": ("Spawn", "Level"),
+        "Level/Spawn#2": ("Spawn", "Level"),
+        42: ("Player", None),
+    }
+
+def test_diff_snapshots():
+    old = snapshot_hierarchy([
+        {"name": "Level", "id": 1, "children": [{"name": "Crate", "id": 2, "children": [{"name": "Lid", "id": 3}]}]},
+        {"name": "Player", "id": 4},
+        {"name": "Light", "id": 5},
+    ])
+    new = snapshot_hierarchy([
+        {"name": "Level", "id": 1, "children": [{"name": "Hero", "id": 4}]},
+        {"name": "Sun", "id": 5},
+        {"name": "Lid", "id": 3},
+        {"name": "Tree", "id": 6},
+    ])
+    diff = diff_snapshots(old, new)
+    assert diff["added"] == [{"id": 6, "name": "Tree", "parent": None, "path": "Tree"}]
+    assert diff["removed"] == [2]
+    assert diff["renamed"] == [{"id": 4, "name": "Hero", "path": "Level/Hero"},
+                               {"id": 5, "name": "Sun", "path": "Sun"}]
+    assert diff["reparented"] == [{"id": 4, "parent": 1, "path": "Level/Hero"},
+                                  {"id": 3, "parent": None, "path": "Lid"}]
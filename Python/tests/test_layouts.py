@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from config import config
+from layouts import generate_layout, poisson_layout, ring_layout
+from mock_bridge import MockUnityBridge
+from unity_connection import UnityConnection
+
+class ToolRecorder:
+    """Collects the functions an mcp.tool() decorator would register."""
+
+    def tool(self):
+        def register(function):
+            setattr(self, function.__name__, function)
+            return function
+        return register
+
+def pairwise_distances(points: np.ndarray) -> np.ndarray:
+    distances = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+    return distances[np.triu_indices(len(points), 1)]
+
+@pytest.mark.parametrize("min_distance, size", [(2.0, (50, 50)), (0.5, (10, 30)), (7.0, (20, 20))])
+def test_poisson_points_keep_min_distance_inside_the_rectangle(min_distance, size):
+    positions, rotations = poisson_layout(400, min_distance, size, seed=3, origin=[100, 5, -100])
+    assert rotations is None
+    assert len(positions) > 1
+    assert pairwise_distances(positions).min() >= min_distance
+    assert (positions[:, 1] == 5).all()
+    offsets = positions - [100, 5, -100]
+    assert (np.abs(offsets[:, 0]) <= size[0] / 2).all() and (np.abs(offsets[:, 2]) <= size[1] / 2).all()
+
+def test_poisson_returns_fewer_points_when_the_rectangle_is_full():
+    positions, _ = poisson_layout(1000, 5.0, (20, 20), seed=1)
+    assert 4 <= len(positions) < 1000
+    assert np.array_equal(positions, poisson_layout(1000, 5.0, (20, 20), seed=1)[0])
+
+def test_ring_points_face_away_from_the_centre():
+    positions, rotations = ring_layout(4, radius=10)
+    assert np.allclose(np.linalg.norm(positions, axis=1), 10)
+    assert np.allclose(rotations[:, 1], [0, 90, 180, 270])
+
+@pytest.mark.parametrize("spec, message", [
+    ({"kind": "spiral", "count": 3}, "Unknown layout kind"),
+    ({"kind": "grid", "count": 3, "spasing": 2}, "Unknown grid layout parameters: spasing"),
+    ({"kind": "heightmap"}, "needs heights"),
+    ({"kind": "poisson", "count": 3, "min_distance": 0}, "min_distance"),
+])
+def test_bad_layout_specs_are_refused(spec, message):
+    with pytest.raises(ValueError, match=message):
+        generate_layout(spec)
+
+def test_create_objects_bulk_skips_exact_name_collisions(monkeypatch):
+    from tools import scene_tools
+
+    monkeypatch.setattr(config, "scene_mirror_enabled", False)
+    existing = ["Crate_1", "Crate_10"]
+    with MockUnityBridge() as bridge:
+        bridge.register("FIND_OBJECTS_BY_NAME", lambda params: {
+            "objects": [{"name": name, "path": name} for name in existing if params["name"] in name]})
+        bridge.register("CREATE_OBJECT", lambda params: {"name": params["name"]})
+        connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+        assert connection.connect()
+        monkeypatch.setattr(scene_tools, "get_unity_connection", lambda: connection)
+        tools = ToolRecorder()
+        scene_tools.register_scene_tools(tools)
+        try:
+            layout = {"kind": "grid", "count": 3, "columns": 3, "spacing": 2}
+            result = tools.create_objects_bulk(None, "CUBE", layout=layout, name_prefix="Crate")
+        finally:
+            connection.disconnect()
+
+    assert result["summary"] == "Created 2 of 3 objects"
+    assert [(failure["index"], failure["name"]) for failure in result["failed"]] == [(1, "Crate_1")]
+    created = [item["params"] for command in bridge.received if command["type"] == "BATCH"
+               for item in command["params"]["commands"] if item["type"] == "CREATE_OBJECT"]
+    assert [(params["name"], params["location"]) for params in created] == [
+        ("Crate_0", [-2.0, 0.0, 0.0]), ("Crate_2", [2.0, 0.0, 0.0])]
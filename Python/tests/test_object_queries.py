@@ -0,0 +1,70 @@
+import pytest
+
+import scene_mirror
+from mock_bridge import MockUnityBridge
+from scene_mirror import SceneMirror, find_objects_by_name, find_objects_by_tag
+from unity_connection import UnityConnection, add_command_observer, remove_command_observer
+
+HIERARCHY = {"hierarchy": [
+    {"name": "Spawns", "instanceID": 1, "tag": "Untagged", "children": [
+        {"name": "Enemy (Clone)", "instanceID": 2, "tag": "Enemy", "children": []},
+        {"name": "EnemySpawner", "instanceID": 3, "tag": "Untagged", "children": []}]},
+    {"name": "Player", "instanceID": 4, "tag": "Player", "children": []}]}
+
+UNITY_OBJECTS = [{"name": "Enemy (Clone)", "path": "Spawns/Enemy (Clone)"},
+                 {"name": "EnemySpawner", "path": "Spawns/EnemySpawner"},
+                 {"name": "Boss Enemy", "path": "Boss Enemy"}]
+
+def names(objects):
+    return [obj["name"] for obj in objects]
+
+def sent(bridge):
+    return [command["type"] for command in bridge.received]
+
+@pytest.fixture
+def bridge():
+    with MockUnityBridge() as bridge:
+        bridge.register("CREATE_OBJECT", lambda params: {"name": params["name"], "instanceID": 10})
+        bridge.register("INSTANTIATE_PREFAB", lambda params: {"instance_name": params["instance_name"]})
+        bridge.register("DELETE_OBJECT", lambda params: {"success": True})
+        bridge.register("FIND_OBJECTS_BY_NAME", lambda params: {
+            "objects": [obj for obj in UNITY_OBJECTS if params["name"] in obj["name"]]})
+        bridge.register("FIND_OBJECTS_BY_TAG", lambda params: {"objects": [{"name": "Tagged by Unity"}]})
+        yield bridge
+
+@pytest.fixture
+def connection(bridge, monkeypatch):
+    mirror = SceneMirror()
+    monkeypatch.setattr(scene_mirror, "get_scene_mirror", lambda: mirror)
+    connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+    assert connection.connect()
+    add_command_observer(mirror.observe)
+    try:
+        yield connection
+    finally:
+        remove_command_observer(mirror.observe)
+        connection.disconnect()
+
+def test_name_and_tag_queries_follow_the_mirror(bridge, connection):
+    bridge.register("GET_HIERARCHY", lambda params: HIERARCHY)
+    assert names(find_objects_by_name(connection, "Enemy")) == ["Enemy (Clone)", "EnemySpawner"]
+    connection.send_command("CREATE_OBJECT", {"name": "Enemy Boss"})
+    assert names(find_objects_by_name(connection, "Enemy*", "glob")) == ["Enemy (Clone)", "Enemy Boss", "EnemySpawner"]
+    connection.send_command("DELETE_OBJECT", {"name": "EnemySpawner"})
+    assert names(find_objects_by_name(connection, "Enemy", "prefix")) == ["Enemy (Clone)", "Enemy Boss"]
+    assert names(find_objects_by_tag(connection, "Untagged")) == ["Spawns", "Enemy Boss"]
+    assert "FIND_OBJECTS_BY_NAME" not in sent(bridge)
+    assert "FIND_OBJECTS_BY_TAG" not in sent(bridge)
+
+def test_tag_queries_go_to_unity_once_a_tag_is_unknown(bridge, connection):
+    bridge.register("GET_HIERARCHY", lambda params: HIERARCHY)
+    assert names(find_objects_by_tag(connection, "Player")) == ["Player"]
+    connection.send_command("INSTANTIATE_PREFAB", {"instance_name": "Crate"})  # The reply has no tag
+    assert names(find_objects_by_tag(connection, "Player")) == ["Tagged by Unity"]
+    assert names(find_objects_by_name(connection, "Crate", "exact")) == ["Crate"]
+
+def test_without_a_mirror_unity_is_asked_for_the_longest_literal(bridge, connection):
+    assert names(find_objects_by_name(connection, "Enemy*", "glob")) == ["Enemy (Clone)", "EnemySpawner"]
+    assert names(find_objects_by_name(connection, "Enemy", "exact")) == []
+    assert [command["params"] for command in bridge.received if command["type"] == "FIND_OBJECTS_BY_NAME"] \
+        == [{"name": "Enemy"}, {"name": "Enemy"}]
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(config, "ollama_keeper_interval", 0.05)
+    monkeypatch.setattr(config, "ollama_keep_alive", "10m")
+    with MockOllamaServer() as stub:
+        yield stub
+
+def renewals(stub) -> list:
+    return [request["body"] for request in stub.requests if request["path"] == "/api/generate"]
+
+async def keep_for(connection: OllamaConnection, seconds: float):
+    keeper = connection.start_keeper()
+    try:
+        await asyncio.sleep(seconds)
+        assert connection.start_keeper() is keeper  # One keeper per event loop
+    finally:
+        await connection.close()
+    assert keeper.cancelled()
+
+def test_keeper_warms_the_model_up_and_renews_keep_alive_while_in_use(stub):
+    connection = OllamaConnection(port=stub.port, model=stub.models[0])
+    asyncio.run(keep_for(connection, 0.3))
+    bodies = renewals(stub)
+    assert len(bodies) >= 3
+    assert all(body == {"model": stub.models[0], "keep_alive": "10m"} for body in bodies)
+    assert stub.loads == 1  # Renewals found the model still loaded
+    assert stub.models[0] in stub.loaded_models()
+
+def test_keeper_lets_an_idle_editor_unload_the_model(stub, monkeypatch):
+    monkeypatch.setattr(config, "ollama_active_window", 0.1)
+    connection = OllamaConnection(port=stub.port, model=stub.models[0])
+    connection.last_activity = time.monotonic() - 1
+
+    async def run():
+        connection.start_keeper()
+        await asyncio.sleep(0.2)
+        assert len(renewals(stub)) == 1  # Only the warm-up
+        connection._observe("ping", {}, {})  # Heartbeats do not count as use
+        await asyncio.sleep(0.15)
+        assert len(renewals(stub)) == 1
+        connection._observe("GET_SCENE_INFO", {}, {})
+        await asyncio.sleep(0.1)
+        assert len(renewals(stub)) >= 2
+        await connection.close()
+
+    asyncio.run(run())
+
+def test_warm_up_reports_an_unreachable_ollama():
+    async def run():
+        connection = OllamaConnection(port=1)
+        try:
+            return await connection.warm_up()
+        finally:
+            await connection.close()
+
+    assert asyncio.run(run()) is False
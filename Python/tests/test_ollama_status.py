@@ -0,0 +1,54 @@
+import asyncio
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+def root_probes(stub) -> int:
+    return sum(request["path"] == "/" for request in stub.requests)
+
+def test_status_is_answered_from_observed_state(monkeypatch):
+    monkeypatch.setattr(config, "ollama_status_ttl", 60.0)
+
+    async def run(connection):
+        try:
+            first = await connection.get_status()
+            second = await connection.get_status()
+        finally:
+            await connection.close()
+        return first, second
+
+    with MockOllamaServer() as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        first, second = asyncio.run(run(connection))
+    assert first["connected"] and second["connected"]
+    assert root_probes(stub) == 1
+
+def test_status_checks_while_ollama_is_down_do_not_wait_for_it(monkeypatch):
+    monkeypatch.setattr(config, "ollama_status_ttl", 60.0)
+    connection = OllamaConnection(port=1)
+    probes = []
+    probe = connection.ping
+
+    async def counted_ping():
+        probes.append(1)
+        return await probe()
+
+    monkeypatch.setattr(connection, "ping", counted_ping)
+
+    async def run():
+        try:
+            statuses = [await connection.get_status() for _ in range(3)]
+            assert len(probes) == 1  # The failed probe is answered from until it goes stale
+            monkeypatch.setattr(config, "ollama_status_ttl", 0.0)
+            statuses.append(await connection.get_status())
+            assert len(probes) == 1  # The stale state is refreshed in the background
+            await connection._status_task
+            assert len(probes) == 2
+            return statuses
+        finally:
+            await connection.close()
+
+    statuses = asyncio.run(run())
+    assert not any(status["connected"] for status in statuses)
+    assert connection.registry.stats["fetches"] == 0
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+OUTPUTS = [
+    '```json\n{"function": "get_scene_info", "arguments": {}}\n```',
+    'Placing both:\n```json\n[{"function": "create_object", "arguments": {"type": "CUBE", "name": "Crate"}},\n'
+    ' {"function": "modify_object", "arguments": {"name": "Crate", "location": [1, 2, 3]}}]\n```\nDone.',
+    '```\n{"name": "set_material", "params": {"object_name": "Crate", "color": {"r": 1, "g": 0, "b": 0}}}\n```',
+    'First {"function": "select_object", "arguments": {"name": "Crate"}} then '
+    '{"function": "delete_object", "arguments": {"name": "Crate"}} and {"note": "not a command"}',
+    'I will call get_scene_info() and then find_objects_by_name(name="Tree")',
+    'Nothing to do here.',
+]
+
+@pytest.fixture(autouse=True)
+def uncached(monkeypatch):
+    monkeypatch.setattr(config, "ollama_cache_enabled", False)
+
+@pytest.mark.parametrize("output", OUTPUTS)
+def test_streamed_and_unstreamed_extraction_agree(output):
+    async def run(port):
+        connection = OllamaConnection(port=port)
+        try:
+            streamed = []
+            await connection.stream_commands("place things", on_command=streamed.append)
+            text, _ = await connection.get_completion("place things")
+            return streamed, await connection.extract_mcp_commands(text)
+        finally:
+            await connection.close()
+
+    with MockOllamaServer(respond=lambda body: output) as stub:
+        streamed, extracted = asyncio.run(run(stub.port))
+    assert streamed == extracted
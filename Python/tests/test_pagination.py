@@ -0,0 +1,98 @@
+import pytest
+
+import project_index
+from config import config
+from mock_bridge import MockUnityBridge
+from pagination import decode_cursor, paginate, paginate_listing
+from unity_connection import UnityConnection
+
+class ToolRecorder:
+    """Collects the functions an mcp.tool() decorator would register."""
+
+    def tool(self):
+        def register(function):
+            setattr(self, function.__name__, function)
+            return function
+        return register
+
+def pages(fetch, limit):
+    items, cursor = [], None
+    while True:
+        page = paginate_listing(fetch, limit, cursor)
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+def test_paginate_stops_consuming_a_generator_after_the_page():
+    consumed = []
+
+    def listing():
+        for item in range(100):
+            consumed.append(item)
+            yield item
+
+    assert paginate(listing(), 3, "6") == {"items": [6, 7, 8], "next_cursor": "9"}
+    assert consumed == list(range(10))
+    assert paginate(list(range(10)), 4, "8") == {"items": [8, 9], "next_cursor": None}
+
+def test_listing_is_fetched_once_for_all_of_its_pages():
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return iter(range(10))
+
+    assert pages(fetch, 3) == list(range(10))
+    assert len(fetches) == 1
+
+def test_single_page_listings_are_not_pinned():
+    assert paginate_listing(lambda: ["a", "b"], 5) == {"items": ["a", "b"], "next_cursor": None}
+
+def test_dropped_listings_must_start_again(monkeypatch):
+    monkeypatch.setattr(config, "listing_history_size", 1)
+    first = paginate_listing(lambda: range(5), 2)
+    paginate_listing(lambda: range(5), 2)
+    version, offset = decode_cursor(first["next_cursor"])
+    assert offset == 2
+    with pytest.raises(ValueError, match=f"Listing {version} has expired"):
+        paginate_listing(lambda: range(5), 2, first["next_cursor"])
+
+def test_paged_asset_list_queries_unity_once(monkeypatch):
+    from tools import object_tools
+
+    assets = [{"name": f"Tree_{i}", "path": f"Assets/Trees/Tree_{i}.prefab", "type": "GameObject"} for i in range(7)]
+    monkeypatch.setattr(project_index, "get_project_index", lambda: None)
+    with MockUnityBridge() as bridge:
+        bridge.register("GET_ASSET_LIST", lambda params: {"assets": assets})
+        connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+        assert connection.connect()
+        monkeypatch.setattr(project_index, "get_unity_connection", lambda: connection)
+        tools = ToolRecorder()
+        object_tools.register_object_tools(tools)
+        try:
+            listed, cursor = [], None
+            while True:
+                page = tools.get_asset_list(None, folder="Assets/Trees", limit=3, cursor=cursor)
+                listed.extend(page["items"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+        finally:
+            connection.disconnect()
+
+    assert listed == assets
+    assert [command["type"] for command in bridge.received] == ["GET_ASSET_LIST"]
+
+@pytest.mark.parametrize("limit", [None, 10])
+def test_failed_name_search_returns_an_error_dict(monkeypatch, limit):
+    from tools import object_tools
+
+    def unreachable():
+        raise ConnectionError("Unity is not running")
+
+    monkeypatch.setattr(object_tools, "get_unity_connection", unreachable)
+    tools = ToolRecorder()
+    object_tools.register_object_tools(tools)
+    result = tools.find_objects_by_name(None, "Tree", limit=limit)
+    assert result == {"error": "Failed to find objects: Unity is not running"}
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+import project_index
+from asset_catalog import AssetCatalog
+from mock_bridge import MockUnityBridge
+from project_index import ProjectIndex
+from unity_connection import UnityConnection
+
+FILES = ["Assets/Art/Bark.png", "Assets/Art/Sky.cubemap", "Assets/Prefabs/Tree.prefab", "Assets/Models/Rock.fbx",
+         "Assets/Scripts/Player.cs", "Assets/Data/Waves.json", "Assets/Data/Settings.asset", "Assets/Main.unity"]
+
+def paths(assets):
+    return [asset["path"] for asset in assets]
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    for path in FILES:
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        (tmp_path / path).write_text("")
+    index = ProjectIndex(str(tmp_path), AssetCatalog())
+    index.build()
+    monkeypatch.setattr(project_index, "_project_index", index)
+    return index
+
+@pytest.mark.parametrize("asset_type, expected", [
+    ("Texture2D", ["Assets/Art/Bark.png"]),
+    ("texture", ["Assets/Art/Bark.png", "Assets/Art/Sky.cubemap"]),
+    ("GameObject", ["Assets/Models/Rock.fbx", "Assets/Prefabs/Tree.prefab"]),
+    ("Prefab", ["Assets/Prefabs/Tree.prefab"]),
+    ("Model", ["Assets/Models/Rock.fbx"]),
+    ("MonoScript", ["Assets/Scripts/Player.cs"]),
+    ("TextAsset", ["Assets/Data/Waves.json", "Assets/Scripts/Player.cs"]),
+    ("Scene", ["Assets/Main.unity"]),
+    ("SceneAsset", ["Assets/Main.unity"]),
+])
+def test_type_filters_use_unity_type_names_and_aliases(index, asset_type, expected):
+    assert paths(project_index.list_assets(asset_type=asset_type)) == expected
+
+def test_existence_checks_accept_aliases_and_type_names(index):
+    assert index.catalog.exists("Assets/Main.unity", "Scene")
+    assert index.catalog.exists("Assets/Main.unity", "SceneAsset")
+    assert not index.catalog.exists("Assets/Models/Rock.fbx", "Prefab")
+    assert index.catalog.exists("Assets/Data/Settings.asset", "ScriptableObject")  # Type unknown on disk
+
+def test_type_filters_extensions_cannot_answer_go_to_unity(index):
+    with MockUnityBridge() as bridge:
+        bridge.register("GET_ASSET_LIST", lambda params: {"assets": [
+            {"name": "Settings", "path": "Assets/Data/Settings.asset", "type": params["type"]}]})
+        connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+        assert connection.connect()
+        try:
+            assert paths(project_index.list_assets(connection, "ScriptableObject")) == ["Assets/Data/Settings.asset"]
+            assert paths(project_index.list_assets(connection, "Material")) == []  # Answered locally
+            assert [command["params"]["type"] for command in bridge.received] == ["ScriptableObject"]
+        finally:
+            connection.disconnect()
+
+def test_poll_picks_up_files_added_and_removed(index, tmp_path):
+    (tmp_path / "Assets/Art/Bark.png").unlink()
+    (tmp_path / "Assets/Art/Moss.png").write_text("")
+    index.poll()
+    assert paths(project_index.list_assets(asset_type="Texture2D")) == ["Assets/Art/Moss.png"]
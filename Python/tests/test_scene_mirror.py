@@ -0,0 +1,74 @@
+import pytest
+
+from mock_bridge import MockUnityBridge
+from scene_mirror import SceneMirror
+from unity_connection import UnityConnection, add_command_observer, remove_command_observer
+
+HIERARCHY = {"hierarchy": [
+    {"name": "Level", "instanceID": 1, "children": [
+        {"name": "Spawns", "instanceID": 2, "children": [{"name": "Enemy", "instanceID": 3, "children": []}]}]},
+    {"name": "Player", "instanceID": 4, "children": []}]}
+
+def succeed(params):
+    return {"success": True}
+
+@pytest.fixture
+def bridge():
+    with MockUnityBridge() as bridge:
+        bridge.register("GET_HIERARCHY", lambda params: HIERARCHY)
+        bridge.register("CREATE_OBJECT", lambda params: {"name": params["name"], "instanceID": 10})
+        for command_type in ("DELETE_OBJECT", "MODIFY_OBJECT", "EDITOR_CONTROL", "create_object"):
+            bridge.register(command_type, succeed)
+        yield bridge
+
+@pytest.fixture
+def mirrored(bridge):
+    mirror = SceneMirror()
+    connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+    assert connection.connect()
+    add_command_observer(mirror.observe)
+    try:
+        assert mirror.ensure_fresh(connection)
+        yield mirror, connection
+    finally:
+        remove_command_observer(mirror.observe)
+        connection.disconnect()
+
+def paths(mirror, name):
+    return [match["path"] for match in mirror.find_objects_by_name(name)]
+
+def test_create_reparent_and_delete_keep_the_mirror_in_step(mirrored):
+    mirror, connection = mirrored
+    connection.send_command("CREATE_OBJECT", {"name": "Crate"})
+    assert paths(mirror, "Crate") == ["Crate"]
+    connection.send_command("MODIFY_OBJECT", {"name": "Crate", "set_parent": "Spawns"})
+    assert paths(mirror, "Crate") == ["Level/Spawns/Crate"]
+    connection.send_command("MODIFY_OBJECT", {"name": "Spawns", "set_parent": ""})
+    assert paths(mirror, "Crate") == ["Spawns/Crate"]  # Paths below a moved object follow it
+    connection.send_command("DELETE_OBJECT", {"name": "Spawns"})
+    assert not mirror.exists("Crate") and not mirror.exists("Enemy")
+    assert mirror.exists("Level") and mirror.exists("Player")
+    assert mirror.fresh
+    assert mirror.stats["applied"] == 4
+    assert mirror.stats["invalidations"] == 0
+
+@pytest.mark.parametrize("command_type", ["EDITOR_CONTROL", "create_object"])
+def test_commands_the_mirror_cannot_follow_invalidate_it(mirrored, command_type):
+    mirror, connection = mirrored
+    connection.send_command(command_type, {"name": "Crate"})
+    assert not mirror.seeded
+    assert mirror.stats["invalidations"] == 1
+
+def test_bridge_without_get_hierarchy_is_not_asked_again():
+    with MockUnityBridge() as bridge:
+        mirror = SceneMirror()
+        connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+        assert connection.connect()
+        add_command_observer(mirror.observe)
+        try:
+            assert not mirror.ensure_fresh(connection)
+            assert not mirror.ensure_fresh(connection)
+            assert [command["type"] for command in bridge.received] == ["GET_HIERARCHY"]
+        finally:
+            remove_command_observer(mirror.observe)
+            connection.disconnect()
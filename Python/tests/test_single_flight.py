@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from config import config
+from ollama_connection import OllamaConnection
+
+class FakeGeneration:
+    """A generate() callable that runs until released, counting how often it was started and cancelled."""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.release = None
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.started += 1
+        if self.release is None:
+            self.release = asyncio.Event()
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return "text", {"response": "text"}
+
+def request(connection: OllamaConnection, generate: FakeGeneration, key: str = "key") -> asyncio.Task:
+    return asyncio.ensure_future(connection._single_flight(key, generate, "interactive", None))
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+def test_identical_requests_share_one_generation():
+    async def run():
+        connection, generate = OllamaConnection(port=1), FakeGeneration()
+        leader, follower = request(connection, generate), request(connection, generate)
+        await settle()
+        generate.release.set()
+        return connection, generate, await leader, await follower
+
+    connection, generate, leader, follower = asyncio.run(run())
+    assert generate.started == 1
+    assert leader == (("text", {"response": "text"}), False)
+    assert follower == (("text", {"response": "text", "coalesced": True}), True)
+    assert connection.get_request_stats() == {"in_flight": 0, "generations": 1, "coalesced": 1, "abandoned": 0}
+
+def test_leader_error_reaches_every_follower():
+    async def run():
+        connection, generate = OllamaConnection(port=1), FakeGeneration(RuntimeError("model crashed"))
+        tasks = [request(connection, generate) for _ in range(3)]
+        await settle()
+        generate.release.set()
+        return connection, generate, await asyncio.gather(*tasks, return_exceptions=True)
+
+    connection, generate, outcomes = asyncio.run(run())
+    assert generate.started == 1
+    assert [str(outcome) for outcome in outcomes] == ["model crashed"] * 3
+    assert connection.get_request_stats()["in_flight"] == 0
+
+def test_cancelled_leader_leaves_the_generation_running_for_followers():
+    async def run():
+        connection, generate = OllamaConnection(port=1), FakeGeneration()
+        leader, follower = request(connection, generate), request(connection, generate)
+        await settle()
+        leader.cancel()
+        await settle()
+        generate.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return generate, await follower
+
+    generate, follower = asyncio.run(run())
+    assert generate.started == 1
+    assert generate.cancelled == 0
+    assert follower[0][0] == "text"
+
+def test_generation_nobody_waits_for_is_cancelled_after_the_grace_period(monkeypatch):
+    monkeypatch.setattr(config, "ollama_abandon_grace", 0.05)
+
+    async def run():
+        connection, generate = OllamaConnection(port=1), FakeGeneration()
+        only = request(connection, generate)
+        await settle()
+        only.cancel()
+        await settle()
+        assert generate.cancelled == 0  # Still inside the grace period
+        await asyncio.sleep(0.1)
+        # A request after the abandonment starts over
+        again = request(connection, FakeGeneration())
+        await settle()
+        assert connection.request_stats["generations"] == 2
+        again.cancel()
+        return connection, generate
+
+    connection, generate = asyncio.run(run())
+    assert generate.cancelled == 1
+    assert connection.request_stats["abandoned"] == 1
+
+def test_retry_within_the_grace_period_joins_the_running_generation(monkeypatch):
+    monkeypatch.setattr(config, "ollama_abandon_grace", 0.2)
+
+    async def run():
+        connection, generate = OllamaConnection(port=1), FakeGeneration()
+        first = request(connection, generate)
+        await settle()
+        first.cancel()
+        await asyncio.sleep(0.05)
+        retry = request(connection, generate)
+        await asyncio.sleep(0.3)  # Past the grace period: joining called off the abandonment
+        generate.release.set()
+        return connection, generate, await retry
+
+    connection, generate, retry = asyncio.run(run())
+    assert generate.started == 1
+    assert generate.cancelled == 0
+    assert retry == (("text", {"response": "text", "coalesced": True}), True)
+    assert connection.request_stats == {"generations": 1, "coalesced": 1, "abandoned": 0}
+
+def test_request_the_scheduler_refuses_results_in_an_error():
+    async def run():
+        connection, generate = OllamaConnection(port=1), FakeGeneration()
+        return generate, await connection._single_flight("key", generate, "urgent", None)
+
+    generate, ((text, data), coalesced) = asyncio.run(run())
+    assert generate.started == 0
+    assert text == ""
+    assert "Unknown priority" in data["error"]
+    assert not coalesced
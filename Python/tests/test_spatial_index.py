@@ -0,0 +1,77 @@
+import math
+
+import pytest
+
+import spatial_index
+from mock_bridge import MockUnityBridge, SyntheticScene
+from spatial_index import SpatialIndex, find_objects_in_box, find_objects_near
+from unity_connection import UnityConnection, add_command_observer, remove_command_observer
+
+HIERARCHY = {"hierarchy": [
+    {"name": "Cart", "instanceID": 1, "position": [0, 0, 0], "children": [
+        {"name": "Wheel", "instanceID": 2, "position": [1, 0, 0], "children": []}]},
+    {"name": "Tree", "instanceID": 3, "position": [10, 0, 0], "children": []}]}
+
+def names(objects):
+    return [obj["name"] for obj in objects]
+
+@pytest.fixture
+def bridge():
+    with MockUnityBridge() as bridge:
+        bridge.register("GET_HIERARCHY", lambda params: HIERARCHY)
+        bridge.register("CREATE_OBJECT", lambda params: {"name": params["name"]})
+        for command_type in ("MODIFY_OBJECT", "DELETE_OBJECT", "create_object"):
+            bridge.register(command_type, lambda params: {"success": True})
+        yield bridge
+
+@pytest.fixture
+def index(monkeypatch):
+    index = SpatialIndex()
+    monkeypatch.setattr(spatial_index, "get_spatial_index", lambda: index)
+    add_command_observer(index.observe)
+    yield index
+    remove_command_observer(index.observe)
+
+@pytest.fixture
+def connection(bridge):
+    connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+    assert connection.connect()
+    yield connection
+    connection.disconnect()
+
+def test_moves_creates_and_deletes_keep_the_index_in_step(index, connection):
+    assert names(find_objects_near(connection, [0, 0, 0], 2)) == ["Cart", "Wheel"]
+    connection.send_command("MODIFY_OBJECT", {"name": "Cart", "location": [10, 0, 2]})
+    near_tree = find_objects_near(connection, [10, 0, 0], 2.5)
+    assert names(near_tree) == ["Tree", "Cart", "Wheel"]  # The wheel moved with its cart
+    assert near_tree[2]["position"] == [11.0, 0.0, 2.0]
+    connection.send_command("CREATE_OBJECT", {"name": "Rock", "location": [-5, 0, 0]})
+    connection.send_command("DELETE_OBJECT", {"name": "Cart"})
+    assert names(find_objects_in_box(connection, [-10, -1, -10], [20, 1, 10])) == ["Tree", "Rock"]
+    assert index.stats["loads"] == 1
+    assert index.stats["invalidations"] == 0
+
+@pytest.mark.parametrize("command_type, params", [
+    ("MODIFY_OBJECT", {"name": "Wheel", "set_parent": "Tree"}),
+    ("MODIFY_OBJECT", {"name": "Cart", "rotation": [0, 90, 0]}),
+    ("create_object", {"name": "Rock"}),
+])
+def test_commands_the_index_cannot_follow_reload_it(bridge, index, connection, command_type, params):
+    find_objects_near(connection, [0, 0, 0], 1)
+    connection.send_command(command_type, params)
+    assert not index.fresh
+    find_objects_near(connection, [0, 0, 0], 1)
+    assert index.stats["loads"] == 2
+    assert [command["params"] for command in bridge.received if command["type"] == "GET_HIERARCHY"] \
+        == [{"include_transforms": True}] * 2
+
+def test_grid_queries_match_a_full_scan():
+    scene, index = SyntheticScene(objects=3000, roots=30, seed=1), SpatialIndex()
+    assert index.load(scene.hierarchy({"include_transforms": True}))
+    positions = {scene.names[node_id]: position for node_id, position in scene.positions.items()}
+    for center, radius in [((0, 20, 0), 150.0), ((500, 0, -500), 40.0), ((0, 0, 0), 3000.0)]:
+        expected = {name for name, position in positions.items() if math.dist(position, center) <= radius}
+        found = index.find_near(center, radius)
+        assert {obj["name"] for obj in found} == expected
+        distances = [obj["distance"] for obj in found]
+        assert distances == sorted(distances)
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+import tcp_server
+from config import config
+from mock_ollama import MockOllamaServer
+from ollama_connection import OllamaConnection
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(config, "ollama_cache_enabled", False)
+    with MockOllamaServer() as stub:
+        connection = OllamaConnection(port=stub.port, model=stub.models[0])
+        monkeypatch.setattr(tcp_server, "_ollama_connection", connection)
+        yield stub
+
+async def chat(port: int, prompt: str, **params) -> dict:
+    """Send one chat message over its own connection, as the editor does."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(json.dumps({"type": "process_user_request", "params": {"prompt": prompt, **params}}).encode("utf-8"))
+        await writer.drain()
+        response = json.loads(await reader.read(65536))
+    finally:
+        # Also when the caller gives up waiting, which is how the server sees a disconnect
+        writer.close()
+    return response["result"]
+
+async def serve(messages):
+    server = await asyncio.start_server(tcp_server.MCPTCPServer().handle_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return [await chat(port, prompt, **params) for prompt, params in messages]
+    finally:
+        server.close()
+        await server.wait_closed()
+        await tcp_server._ollama_connection.close()
+
+def test_separate_connections_continue_the_same_session(stub):
+    first, second = asyncio.run(serve([("Create a cube", {"session_id": "chat-1"}),
+                                       ("Make it red", {"session_id": "chat-1"})]))
+    assert first["session"]["turn"] == 1
+    assert not first["session"]["continued"]
+    assert second["session"]["id"] == first["session"]["id"]
+    assert second["session"]["turn"] == 2
+    assert second["session"]["continued"]
+    # The second message passed the first one's context back instead of the system prompt
+    body = stub.requests[-1]["body"]
+    assert "context" in body and "system" not in body
+
+def test_session_id_from_the_client_is_used(stub):
+    first, other, second = asyncio.run(serve([
+        ("Create a cube", {"session_id": "chat-1"}),
+        ("Create a sphere", {"session_id": "chat-2"}),
+        ("Make it red", {"session_id": "chat-1"}),
+    ]))
+    assert [first["session"]["id"], other["session"]["id"], second["session"]["id"]] == ["chat-1", "chat-2", "chat-1"]
+    assert other["session"]["turn"] == 1
+    assert second["session"]["turn"] == 2
+
+def test_requests_without_a_session_id_share_no_context(stub):
+    first, second = asyncio.run(serve([("Create a cube", {}), ("Make it red", {})]))
+    assert "session" not in first and "session" not in second
+    bodies = [request["body"] for request in stub.requests if request["path"] == "/api/generate"]
+    assert all("system" in body and "context" not in body for body in bodies)
+
+def test_retry_after_a_client_timeout_picks_up_the_running_generation(monkeypatch):
+    monkeypatch.setattr(config, "ollama_cache_enabled", False)
+    monkeypatch.setattr(config, "ollama_abandon_grace", 2.0)
+    with MockOllamaServer(latency=0.6) as stub:
+        monkeypatch.setattr(tcp_server, "_ollama_connection", OllamaConnection(port=stub.port, model=stub.models[0]))
+
+        async def run():
+            server = await asyncio.start_server(tcp_server.MCPTCPServer().handle_client, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                # The editor gives up on the first connection, then retries on a new one
+                first = asyncio.ensure_future(chat(port, "Create a cube", session_id="chat-1"))
+                await asyncio.sleep(0.2)
+                first.cancel()
+                await asyncio.sleep(0.1)
+                return await chat(port, "Create a cube", session_id="chat-1")
+            finally:
+                server.close()
+                await server.wait_closed()
+                await tcp_server._ollama_connection.close()
+
+        retry = asyncio.run(run())
+    assert retry["status"] == "success"
+    assert retry["session"]["turn"] == 1
+    assert sum(request["path"] == "/api/generate" for request in stub.requests) == 1
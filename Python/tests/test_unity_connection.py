@@ -0,0 +1,315 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import mock_bridge
+from config import config
+from mock_bridge import MockUnityBridge
+from unity_connection import AsyncUnityConnection, UnityConnection, add_command_observer, remove_command_observer
+from unity_protocol import (
+    FRAMING_LEGACY, FRAMING_LENGTH_PREFIX, FRAME_HEADER, HANDSHAKE_COMMAND, MAX_FRAME_SIZE,
+    FramingError, encode_frame, decode_frame_header
+)
+
+def connect(bridge: MockUnityBridge) -> UnityConnection:
+    connection = UnityConnection(host="127.0.0.1", port=bridge.port)
+    assert connection.connect()
+    return connection
+
+def echo(params):
+    return {"echo": params}
+
+@pytest.mark.parametrize("payload", [b"", b'{"type": "ping"}', "héllo 世界".encode("utf-8"), bytes(range(256)) * 1000])
+def test_frame_round_trip(payload):
+    frame = encode_frame(payload)
+    assert decode_frame_header(frame[:FRAME_HEADER.size]) == len(payload)
+    assert frame[FRAME_HEADER.size:] == payload
+
+def test_oversize_frames_are_refused(monkeypatch):
+    with pytest.raises(FramingError):
+        decode_frame_header(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1))
+    monkeypatch.setattr("unity_protocol.MAX_FRAME_SIZE", 16)
+    with pytest.raises(FramingError):
+        encode_frame(b"x" * 17)
+
+def test_handshake_switches_to_length_prefixed_framing():
+    with MockUnityBridge(supports_framing=True) as bridge:
+        bridge.register("ECHO", echo)
+        connection = connect(bridge)
+        try:
+            assert connection.framing == FRAMING_LENGTH_PREFIX
+            # Larger than one receive buffer, so the frame arrives in several chunks
+            params = {"text": "x" * (3 * config.buffer_size)}
+            assert connection.send_command("ECHO", params) == {"echo": params}
+            assert [command["type"] for command in bridge.received] == ["ECHO"]  # The handshake isn't a command
+        finally:
+            connection.disconnect()
+
+def test_bridge_rejecting_the_handshake_stays_legacy():
+    with MockUnityBridge(supports_framing=False) as bridge:
+        bridge.register("ECHO", echo)
+        connection = connect(bridge)
+        try:
+            assert connection.framing == FRAMING_LEGACY
+            assert bridge.received[0]["type"] == HANDSHAKE_COMMAND
+            params = {"text": "x" * (3 * config.buffer_size)}
+            assert connection.send_command("ECHO", params) == {"echo": params}
+        finally:
+            connection.disconnect()
+
+def test_legacy_setting_skips_the_handshake(monkeypatch):
+    monkeypatch.setattr(config, "unity_framing", "legacy")
+    with MockUnityBridge(supports_framing=True) as bridge:
+        bridge.register("ECHO", echo)
+        connection = connect(bridge)
+        try:
+            assert connection.framing == FRAMING_LEGACY
+            assert connection.send_command("ECHO", {"a": 1}) == {"echo": {"a": 1}}
+            assert [command["type"] for command in bridge.received] == ["ECHO"]
+        finally:
+            connection.disconnect()
+
+def test_oversize_reply_fails_the_command(monkeypatch):
+    # The bridge announces a frame above the limit after the handshake
+    monkeypatch.setattr(mock_bridge, "encode_frame", lambda payload: FRAME_HEADER.pack(MAX_FRAME_SIZE + 1) + payload)
+    with MockUnityBridge(supports_framing=True) as bridge:
+        bridge.register("ECHO", echo)
+        connection = connect(bridge)
+        try:
+            assert connection.framing == FRAMING_LENGTH_PREFIX
+            with pytest.raises(Exception, match="exceeds the .* byte limit"):
+                connection.send_command("ECHO", {})
+            assert connection.sock is None  # The rest of the stream can't be trusted
+        finally:
+            connection.disconnect()
+
+@pytest.mark.parametrize("framing", [True, False])
+def test_async_commands_match_the_sync_client(framing):
+    with MockUnityBridge(supports_framing=framing) as bridge:
+        bridge.register("ECHO", echo)
+        bridge.register("FAIL", lambda params: 1 / 0)
+
+        async def run():
+            connection = AsyncUnityConnection(host="127.0.0.1", port=bridge.port)
+            try:
+                assert await connection.send_command("ping") == {"message": "pong"}
+                with pytest.raises(Exception, match="division by zero"):
+                    await connection.send_command("FAIL")
+                return connection.framing, await connection.send_command("ECHO", {"a": 1})
+            finally:
+                await connection.disconnect()
+
+        assert asyncio.run(run()) == (FRAMING_LENGTH_PREFIX if framing else FRAMING_LEGACY, {"echo": {"a": 1}})
+
+@pytest.mark.parametrize("framing", [True, False])
+def test_async_command_after_the_editor_dropped_the_socket_reconnects(framing):
+    with MockUnityBridge(supports_framing=framing) as bridge:
+        bridge.register("ECHO", echo)
+
+        async def run():
+            connection = AsyncUnityConnection(host="127.0.0.1", port=bridge.port)
+            try:
+                await connection.send_command("ECHO", {"n": 1})
+                bridge.drop_connections()  # A domain reload between two commands
+                time.sleep(0.05)
+                return connection, await connection.send_command("ECHO", {"n": 2})
+            finally:
+                await connection.disconnect()
+
+        connection, result = asyncio.run(run())
+    assert result == {"echo": {"n": 2}}
+    assert connection.stats["reconnects"] == 1
+    assert [command["params"] for command in bridge.received if command["type"] == "ECHO"] == [{"n": 1}, {"n": 2}]
+
+def sleep_and_echo(params):
+    time.sleep(params["delay"])
+    return {"echo": params}
+
+def test_multiplexed_replies_reach_their_own_callers_out_of_order():
+    with MockUnityBridge(supports_multiplex=True) as bridge:
+        bridge.register("SLEEP", sleep_and_echo)
+        connection = connect(bridge)
+        try:
+            assert connection.multiplexed
+            futures = [connection.submit("SLEEP", {"delay": delay, "n": n}) for n, delay in enumerate([0.3, 0.05, 0.15])]
+            finished = []
+            for future in futures:
+                future.add_done_callback(lambda done: finished.append(done.result()["echo"]["n"]))
+            results = [connection.wait(future) for future in futures]
+        finally:
+            connection.disconnect()
+    assert [result["echo"]["n"] for result in results] == [0, 1, 2]
+    assert finished == [1, 2, 0]  # Replies arrived in order of completion, not of sending
+
+def test_concurrent_callers_share_a_multiplexed_connection():
+    with MockUnityBridge(supports_multiplex=True) as bridge:
+        bridge.register("SLEEP", sleep_and_echo)
+        connection = connect(bridge)
+        try:
+            with ThreadPoolExecutor(8) as pool:
+                start = time.monotonic()
+                results = list(pool.map(lambda n: connection.send_command("SLEEP", {"delay": 0.2, "n": n}), range(8)))
+                elapsed = time.monotonic() - start
+        finally:
+            connection.disconnect()
+    assert [result["echo"]["n"] for result in results] == list(range(8))
+    assert elapsed < 8 * 0.2 / 2  # In flight together rather than one after another
+
+def test_bridge_without_multiplexing_serializes_commands():
+    with MockUnityBridge(supports_multiplex=False) as bridge:
+        bridge.register("SLEEP", sleep_and_echo)
+        connection = connect(bridge)
+        try:
+            assert connection.framing == FRAMING_LENGTH_PREFIX
+            assert not connection.multiplexed
+            with ThreadPoolExecutor(4) as pool:
+                start = time.monotonic()
+                results = list(pool.map(lambda n: connection.send_command("SLEEP", {"delay": 0.1, "n": n}), range(4)))
+                elapsed = time.monotonic() - start
+            # submit() runs the command at once on a serial connection
+            assert connection.submit("SLEEP", {"delay": 0, "n": 4}).done()
+        finally:
+            connection.disconnect()
+    assert [result["echo"]["n"] for result in results] == list(range(4))
+    assert elapsed >= 4 * 0.1
+
+def test_pending_requests_fail_when_the_connection_is_lost():
+    with MockUnityBridge(supports_multiplex=True) as bridge:
+        bridge.register("SLEEP", sleep_and_echo)
+        connection = connect(bridge)
+        try:
+            futures = [connection.submit("SLEEP", {"delay": 1.0, "n": n}) for n in range(3)]
+            time.sleep(0.1)
+            bridge.drop_connections()
+            for future in futures:
+                with pytest.raises(ConnectionError, match="lost"):
+                    future.result(timeout=2)
+            assert connection.sock is None
+        finally:
+            connection.disconnect()
+
+def fail(params):
+    raise RuntimeError(f"cannot {params.get('n')}")
+
+def batch_bridge(**options) -> MockUnityBridge:
+    bridge = MockUnityBridge(**options)
+    bridge.register("ECHO", echo)
+    bridge.register("FAIL", fail)
+    return bridge
+
+def test_batch_items_fail_independently():
+    with batch_bridge() as bridge:
+        connection = connect(bridge)
+        try:
+            assert connection.batch
+            results = connection.send_batch([{"type": "ECHO", "params": {"n": 0}}, {"type": "FAIL", "params": {"n": 1}},
+                                             {"type": "ECHO", "params": {"n": 2}}])
+        finally:
+            connection.disconnect()
+    assert [result["status"] for result in results] == ["success", "error", "success"]
+    assert results[1]["error"] == "cannot 1"
+    assert results[2]["result"] == {"echo": {"n": 2}}
+    assert [command["type"] for command in bridge.received] == ["BATCH"]
+
+def test_batch_is_sent_in_chunks(monkeypatch):
+    monkeypatch.setattr(config, "batch_max_commands", 2)
+    with batch_bridge() as bridge:
+        connection = connect(bridge)
+        try:
+            results = connection.send_batch([{"type": "ECHO", "params": {"n": n}} for n in range(5)])
+        finally:
+            connection.disconnect()
+    assert [result["result"]["echo"]["n"] for result in results] == list(range(5))
+    assert [len(command["params"]["commands"]) for command in bridge.received] == [2, 2, 1]
+
+@pytest.mark.parametrize("advertised", [False, True])
+def test_bridge_without_batch_gets_the_commands_one_by_one(advertised):
+    with batch_bridge(supports_batch=False) as bridge:
+        connection = connect(bridge)
+        try:
+            assert not connection.batch
+            # A bridge that advertises BATCH but answers "Unknown command type: BATCH"
+            connection.batch = advertised
+            results = connection.send_batch([{"type": "ECHO", "params": {"n": 0}}, {"type": "FAIL", "params": {"n": 1}}])
+            assert not connection.batch
+        finally:
+            connection.disconnect()
+    assert [result["status"] for result in results] == ["success", "error"]
+    assert [command["type"] for command in bridge.received] == ["BATCH"] * advertised + ["ECHO", "FAIL"]
+
+def test_batch_failing_midway_keeps_the_results_of_commands_that_ran(monkeypatch):
+    monkeypatch.setattr(config, "batch_max_commands", 2)
+    with batch_bridge() as bridge:
+        bridge.register("CRASH", lambda params: bridge.drop_connections())
+        connection = connect(bridge)
+        try:
+            results = connection.send_batch([{"type": "ECHO", "params": {"n": 0}}, {"type": "ECHO", "params": {"n": 1}},
+                                             {"type": "CRASH"}, {"type": "ECHO", "params": {"n": 3}},
+                                             {"type": "ECHO", "params": {"n": 4}}])
+        finally:
+            connection.disconnect()
+    assert [result["status"] for result in results] == ["success", "success", "error", "error", "error"]
+    # The chunk in flight may or may not have run; the one after it was never sent
+    assert [result.get("skipped", False) for result in results] == [False, False, False, False, True]
+    assert len(bridge.received) == 2
+
+def test_async_batch_falls_back_and_keeps_item_errors():
+    with batch_bridge(supports_batch=False) as bridge:
+        async def run():
+            connection = AsyncUnityConnection(host="127.0.0.1", port=bridge.port)
+            try:
+                assert await connection.connect()
+                connection.batch = True
+                return await connection.send_batch([{"type": "ECHO", "params": {"n": 0}}, {"type": "FAIL", "params": {"n": 1}}])
+            finally:
+                await connection.disconnect()
+
+        results = asyncio.run(run())
+    assert [result["status"] for result in results] == ["success", "error"]
+    assert [command["type"] for command in bridge.received] == ["BATCH", "ECHO", "FAIL"]
+
+def test_observers_see_each_successful_batch_item():
+    seen = []
+
+    def observer(command_type, params, result):
+        seen.append((command_type, params, result))
+
+    add_command_observer(observer)
+    try:
+        with batch_bridge() as bridge:
+            connection = connect(bridge)
+            try:
+                connection.send_batch([{"type": "ECHO", "params": {"n": 0}}, {"type": "FAIL", "params": {"n": 1}},
+                                       {"type": "ECHO", "params": {"n": 2}}])
+            finally:
+                connection.disconnect()
+    finally:
+        remove_command_observer(observer)
+    assert seen == [("ECHO", {"n": 0}, {"echo": {"n": 0}}), ("ECHO", {"n": 2}, {"echo": {"n": 2}})]
+
+class ToolRecorder:
+    """Collects the functions an mcp.tool() decorator would register."""
+
+    def tool(self):
+        def register(function):
+            setattr(self, function.__name__, function)
+            return function
+        return register
+
+def test_execute_batch_tool_counts_failures(monkeypatch):
+    from tools import editor_tools
+
+    tools = ToolRecorder()
+    editor_tools.register_editor_tools(tools)
+    with batch_bridge() as bridge:
+        connection = connect(bridge)
+        monkeypatch.setattr(editor_tools, "get_unity_connection", lambda: connection)
+        try:
+            reply = tools.execute_batch(None, [{"type": "ECHO"}, {"type": "FAIL"}, {"type": "ECHO"}])
+            malformed = tools.execute_batch(None, [{"params": {}}])
+        finally:
+            connection.disconnect()
+    assert (reply["succeeded"], reply["failed"]) == (2, 1)
+    assert "error" in malformed
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from unity_protocol import FramingError, IncrementalJsonDecoder, JsonItemStream
+
+RESPONSE = {
+    "status": "success",
+    "result": {
+        "name": 'Say "hi" {not a bracket} [nor this] \\',
+        "path": "C:\\Assets\\",
+        "label": "日本語",
+        "children": [{"name": "Child", "position": [1, 2.5, -3]}, [], {}],
+    },
+}
+
+def chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096])
+def test_decoder_finds_the_end_at_any_split(size):
+    data = json.dumps(RESPONSE, ensure_ascii=False).encode("utf-8")
+    decoder = IncrementalJsonDecoder(initial_size=16)
+    parts = chunks(data, size)
+    for part in parts[:-1]:
+        assert not decoder.feed(part)
+    assert decoder.feed(parts[-1])
+    assert decoder.message() == data
+
+def test_decoder_write_view_and_commit():
+    data = json.dumps(RESPONSE).encode("utf-8")
+    decoder = IncrementalJsonDecoder(initial_size=8)
+    for part in chunks(data, 5):
+        view = decoder.write_view(len(part))
+        view[:len(part)] = part
+        del view
+        done = decoder.commit(len(part))
+    assert done
+    assert json.loads(decoder.message()) == RESPONSE
+
+def test_decoder_backslash_at_chunk_boundary():
+    data = b'{"a": "x\\\\", "b": "\\"}"}'
+    for split in range(1, len(data)):
+        decoder = IncrementalJsonDecoder()
+        assert not decoder.feed(data[:split])
+        assert decoder.feed(data[split:])
+        assert decoder.message() == data
+
+def test_decoder_partial_input_is_not_complete():
+    decoder = IncrementalJsonDecoder()
+    assert not decoder.feed(b'{"status": "success", "result": {"a": [1, 2')
+    assert not decoder.complete
+    with pytest.raises(FramingError):
+        decoder.message()
+
+def test_decoder_rejects_unbalanced_brackets():
+    decoder = IncrementalJsonDecoder()
+    with pytest.raises(FramingError):
+        decoder.feed(b' ]{"a": 1}')
+
+def listing(count: int) -> bytes:
+    assets = [{"path": f"Assets/Prefabs/Item{i}.prefab", "name": f"Item {i} [\"x\"]"} for i in range(count)]
+    return json.dumps({"status": "success",
+                       "result": {"count": count, "assets": assets, "next": None}}).encode("utf-8")
+
+@pytest.mark.parametrize("size", [1, 3, 17, 1000])
+def test_item_stream_yields_items_across_splits(size):
+    data = listing(25)
+    stream = JsonItemStream(("result", "assets"))
+    items = []
+    for part in chunks(data, size):
+        items.extend(stream.feed(part))
+    assert stream.complete
+    assert items == json.loads(data)["result"]["assets"]
+    assert stream.item_count == 25
+    assert stream.finish() == {"status": "success", "result": {"count": 25, "assets": [], "next": None}}
+
+def test_item_stream_holds_back_a_number_that_may_continue():
+    stream = JsonItemStream(("result", "ids"))
+    assert stream.feed(b'{"result": {"ids": [12, 3') == [12]
+    assert stream.feed(b'4, 5]}}') == [34, 5]
+    assert stream.complete
+
+def test_item_stream_splits_multibyte_characters():
+    data = json.dumps({"result": {"names": ["日本", "Ünïcode"]}}, ensure_ascii=False).encode("utf-8")
+    stream = JsonItemStream(("result", "names"))
+    items = [item for byte in range(len(data)) for item in stream.feed(data[byte:byte + 1])]
+    assert items == ["日本", "Ünïcode"]
+
+def test_item_stream_ignores_arrays_off_the_path():
+    data = b'{"result": {"other": [1, 2], "nested": {"assets": [3]}, "assets": [4]}}'
+    stream = JsonItemStream(("result", "assets"))
+    assert stream.feed(data) == [4]
+    assert stream.finish()["result"]["other"] == [1, 2]
+
+def test_item_stream_incomplete_response():
+    stream = JsonItemStream(("result", "assets"))
+    stream.feed(b'{"result": {"assets": [{"a": 1}')
+    assert not stream.complete
+    with pytest.raises(FramingError):
+        stream.finish()
@@ -1,6 +1,9 @@
 from typing import Optional
 from mcp.server.fastmcp import FastMCP, Context
 from unity_connection import get_unity_connection
+from scene_mirror import find_objects_by_name, submit_find_objects_by_name
+from asset_catalog import asset_exists, submit_asset_exists, get_asset_catalog
+from component_cache import submit_object_properties
 
 def register_asset_tools(mcp: FastMCP):
     """Register all asset management tools with the MCP server."""
@@ -38,19 +41,8 @@ def register_asset_tools(mcp: FastMCP):
             if not os.path.exists(source_path):
                 return f"Error importing asset: Source file '{source_path}' does not exist"
             
-            # Extract the target directory and filename
-            target_dir = '/'.join(target_path.split('/')[:-1])
-            target_filename = target_path.split('/')[-1]
-            
             # Check if an asset already exists at the target path
-            existing_assets = unity.send_command("GET_ASSET_LIST", {
-                "search_pattern": target_filename,
-                "folder": target_dir or "Assets"
-            }).get("assets", [])
-            
-            # Check if any asset matches the exact path
-            asset_exists = any(asset.get("path") == target_path for asset in existing_assets)
-            if asset_exists and not overwrite:
+            if asset_exists(unity, target_path) and not overwrite:
                 return f"Asset already exists at '{target_path}'. Use overwrite=True to replace it."
                 
             response = unity.send_command("IMPORT_ASSET", {
@@ -113,23 +105,12 @@ def register_asset_tools(mcp: FastMCP):
                 if not isinstance(param_value, (int, float)):
                     return f"Error instantiating prefab: {param_name} must be a number"
             
-            # Check if the prefab exists
-            prefab_dir = '/'.join(prefab_path.split('/')[:-1]) or "Assets"
-            prefab_name = prefab_path.split('/')[-1]
-            
             # Ensure prefab has .prefab extension for searching
-            if not prefab_name.lower().endswith('.prefab'):
-                prefab_name = f"{prefab_name}.prefab"
+            if not prefab_path.lower().endswith('.prefab'):
                 prefab_path = f"{prefab_path}.prefab"
                 
-            prefab_assets = unity.send_command("GET_ASSET_LIST", {
-                "type": "Prefab",
-                "search_pattern": prefab_name,
-                "folder": prefab_dir
-            }).get("assets", [])
-            
-            prefab_exists = any(asset.get("path") == prefab_path for asset in prefab_assets)
-            if not prefab_exists:
+            # Check if the prefab exists
+            if not asset_exists(unity, prefab_path, "Prefab"):
                 return f"Prefab '{prefab_path}' not found in the project."
             
             response = unity.send_command("INSTANTIATE_PREFAB", {
@@ -177,29 +158,22 @@ def register_asset_tools(mcp: FastMCP):
             if not prefab_path or not isinstance(prefab_path, str):
                 return f"Error creating prefab: prefab_path must be a valid string"
             
-            # Check if the GameObject exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                "name": object_name
-            }).get("objects", [])
-            
-            if not found_objects:
-                return f"GameObject '{object_name}' not found in the scene."
-                
             # Verify prefab path has proper extension
             if not prefab_path.lower().endswith('.prefab'):
                 prefab_path = f"{prefab_path}.prefab"
             
-            # Check if a prefab already exists at this path
-            prefab_dir = '/'.join(prefab_path.split('/')[:-1]) or "Assets"
-            prefab_name = prefab_path.split('/')[-1]
+            # Issue both pre-checks up front; on a multiplexed connection they run concurrently
+            object_request = submit_find_objects_by_name(unity, object_name)
+            prefab_request = submit_asset_exists(unity, prefab_path, "Prefab")
             
-            prefab_assets = unity.send_command("GET_ASSET_LIST", {
-                "type": "Prefab",
-                "search_pattern": prefab_name,
-                "folder": prefab_dir
-            }).get("assets", [])
+            # Check if the GameObject exists
+            found_objects = unity.wait(object_request).get("objects", [])
             
-            prefab_exists = any(asset.get("path") == prefab_path for asset in prefab_assets)
+            if not found_objects:
+                return f"GameObject '{object_name}' not found in the scene."
+            
+            # Check if a prefab already exists at this path
+            prefab_exists = unity.wait(prefab_request)
             if prefab_exists and not overwrite:
                 return f"Prefab already exists at '{prefab_path}'. Use overwrite=True to replace it."
             
@@ -234,17 +208,13 @@ def register_asset_tools(mcp: FastMCP):
             unity = get_unity_connection()
             
             # Check if the GameObject exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                "name": object_name
-            }).get("objects", [])
+            found_objects = find_objects_by_name(unity, object_name)
             
             if not found_objects:
                 return f"GameObject '{object_name}' not found in the scene."
             
             # Check if the object is a prefab instance
-            object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
-                "name": object_name
-            })
+            object_props = unity.wait(submit_object_properties(unity, object_name, ["isPrefabInstance"]))
             
             # Try to extract prefab status from properties
             is_prefab_instance = object_props.get("isPrefabInstance", False)
@@ -256,4 +226,24 @@ def register_asset_tools(mcp: FastMCP):
             })
             return response.get("message", "Prefab changes applied successfully")
         except Exception as e:
-            return f"Error applying prefab changes: {str(e)}" 
\ No newline at end of file
+            return f"Error applying prefab changes: {str(e)}"
+
+    @mcp.tool()
+    def refresh_asset_catalog(ctx: Context) -> str:
+        """Reload the server's cached list of project assets from Unity.
+
+        Use this after adding, moving or deleting assets outside of these tools
+        (e.g. in the Unity Editor) so existence checks see the change right away.
+
+        Returns:
+            str: Number of assets cataloged, or error details
+        """
+        try:
+            catalog = get_asset_catalog()
+            if catalog is None:
+                return "The asset catalog is disabled; asset checks already query Unity directly."
+            if not catalog.refresh(get_unity_connection()):
+                return "Unity did not return an asset list; asset checks will query Unity directly."
+            return f"Asset catalog refreshed: {len(catalog)} assets"
+        except Exception as e:
+            return f"Error refreshing asset catalog: {str(e)}"
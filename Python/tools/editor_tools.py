@@ -1,6 +1,11 @@
 from mcp.server.fastmcp import FastMCP, Context
-from typing import Optional
-from unity_connection import get_unity_connection
+from typing import Optional, Dict, Any, List
+from unity_connection import get_unity_connection, get_connection_stats
+from scene_mirror import get_scene_mirror
+from asset_catalog import get_asset_catalog
+from project_index import get_project_index
+from component_cache import get_component_cache
+from spatial_index import get_spatial_index
 
 def register_editor_tools(mcp: FastMCP):
     """Register all editor control tools with the MCP server."""
@@ -174,4 +179,51 @@ def register_editor_tools(mcp: FastMCP):
             })
             return response.get("message", f"Executed command: {command_name}")
         except Exception as e:
-            return f"Error executing command: {str(e)}" 
\ No newline at end of file
+            return f"Error executing command: {str(e)}" 
+
+    @mcp.tool()
+    def execute_batch(ctx: Context, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Execute an ordered list of Unity commands in as few round trips as possible.
+        
+        Args:
+            commands: List of dicts with keys:
+                - type: Unity command type (e.g., "CREATE_OBJECT", "MODIFY_OBJECT")
+                - params: Optional dict of parameters for the command
+            
+        Returns:
+            Dict with one result envelope per command (in order) plus success and failure counts.
+            A failing command does not stop the ones after it.
+        """
+        try:
+            results = get_unity_connection().send_batch(commands)
+            failed = sum(1 for result in results if result.get("status") == "error")
+            return {
+                "results": results,
+                "succeeded": len(results) - failed,
+                "failed": failed
+            }
+        except Exception as e:
+            return {"error": f"Failed to execute batch: {str(e)}"}
+
+    @mcp.tool()
+    def get_unity_connection_stats(ctx: Context) -> Dict[str, Any]:
+        """Report the health of the Unity connection and its heartbeat counters.
+        
+        Returns:
+            Dict with connection state, negotiated protocol features, counts of
+            pings saved by the heartbeat, heartbeat pings sent and failed, and reconnects,
+            and the state of the scene mirror, asset catalog, project index,
+            component caches and spatial index
+        """
+        mirror = get_scene_mirror()
+        catalog = get_asset_catalog()
+        index = get_project_index()
+        components = get_component_cache()
+        return {
+            **get_connection_stats(),
+            "scene_mirror": mirror.get_stats() if mirror is not None else {"enabled": False},
+            "asset_catalog": catalog.get_stats() if catalog is not None else {"enabled": False},
+            "project_index": index.get_stats() if index is not None else {"enabled": False},
+            "component_cache": components.get_stats() if components is not None else {"enabled": False},
+            "spatial_index": get_spatial_index().get_stats()
+        }
@@ -1,6 +1,8 @@
 from mcp.server.fastmcp import FastMCP, Context
 from typing import List
 from unity_connection import get_unity_connection
+from scene_mirror import submit_find_objects_by_name
+from asset_catalog import submit_named_asset_exists
 
 def register_material_tools(mcp: FastMCP):
     """Register all material-related tools with the MCP server."""
@@ -25,10 +27,14 @@ def register_material_tools(mcp: FastMCP):
         try:
             unity = get_unity_connection()
             
+            # Issue both pre-checks up front; on a multiplexed connection they run concurrently
+            object_request = submit_find_objects_by_name(unity, object_name)
+            material_request = None
+            if material_name:
+                material_request = submit_named_asset_exists(unity, material_name, "Material", "Assets/Materials")
+            
             # Check if the object exists
-            object_response = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                "name": object_name
-            })
+            object_response = unity.wait(object_request)
             
             objects = object_response.get("objects", [])
             if not objects:
@@ -36,13 +42,7 @@ def register_material_tools(mcp: FastMCP):
             
             # If a material name is specified, check if it exists
             if material_name:
-                material_assets = unity.send_command("GET_ASSET_LIST", {
-                    "type": "Material",
-                    "search_pattern": material_name,
-                    "folder": "Assets/Materials"
-                }).get("assets", [])
-                
-                material_exists = any(asset.get("name") == material_name for asset in material_assets)
+                material_exists = unity.wait(material_request)
                 
                 if not material_exists and not create_if_missing:
                     return f"Material '{material_name}' not found. Use create_if_missing=True to create it."
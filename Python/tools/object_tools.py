@@ -1,8 +1,15 @@
 """Tools for inspecting and manipulating Unity objects."""
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from mcp.server.fastmcp import FastMCP, Context
 from unity_connection import get_unity_connection
+from config import config
+import scene_mirror
+import project_index
+import spatial_index
+from component_cache import submit_component_types, submit_object_properties, submit_component_properties
+from hierarchy_versions import get_hierarchy_versions
+from pagination import paginate, paginate_listing
 
 def register_object_tools(mcp: FastMCP):
     """Register all object inspection and manipulation tools with the MCP server."""
@@ -10,22 +17,33 @@ def register_object_tools(mcp: FastMCP):
     @mcp.tool()
     def get_object_properties(
         ctx: Context,
-        name: str
+        name: str,
+        components_only: bool = False,
+        fields: Optional[List[str]] = None,
+        components: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Get all properties of a specified game object.
 
+        Large objects serialize to a lot of data; ask only for what you need
+        with ``fields`` and ``components``.
+
         Args:
             ctx: The MCP context
             name: Name of the game object to inspect
+            components_only: Only list the types of the attached components, without
+                their property values (much smaller, and usually cached)
+            fields: Optional top-level properties to return (e.g. ["position", "rotation",
+                "scale"]; include "components" to keep the component list)
+            components: Optional component types to include in "components" (e.g. ["Rigidbody"])
 
         Returns:
             Dict containing the object's properties, components, and their values
         """
         try:
-            response = get_unity_connection().send_command("GET_OBJECT_PROPERTIES", {
-                "name": name
-            })
-            return response
+            unity = get_unity_connection()
+            if components_only:
+                return unity.wait(submit_component_types(unity, name))
+            return unity.wait(submit_object_properties(unity, name, fields, components))
         except Exception as e:
             return {"error": f"Failed to get object properties: {str(e)}"}
 
@@ -33,7 +51,8 @@ def register_object_tools(mcp: FastMCP):
     def get_component_properties(
         ctx: Context,
         object_name: str,
-        component_type: str
+        component_type: str,
+        fields: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Get properties of a specific component on a game object.
 
@@ -41,40 +60,46 @@ def register_object_tools(mcp: FastMCP):
             ctx: The MCP context
             object_name: Name of the game object
             component_type: Type of the component to inspect
+            fields: Optional property names to return (e.g. ["mass", "drag"]); all by default
 
         Returns:
             Dict containing the component's properties and their values
         """
         try:
-            response = get_unity_connection().send_command("GET_COMPONENT_PROPERTIES", {
-                "object_name": object_name,
-                "component_type": component_type
-            })
-            return response
+            unity = get_unity_connection()
+            return unity.wait(submit_component_properties(unity, object_name, component_type, fields))
         except Exception as e:
             return {"error": f"Failed to get component properties: {str(e)}"}
 
     @mcp.tool()
     def find_objects_by_name(
         ctx: Context,
-        name: str
-    ) -> List[Dict[str, str]]:
+        name: str,
+        match: str = "substring",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Union[List[Dict[str, str]], Dict[str, Any]]:
         """Find game objects in the scene by name.
 
         Args:
             ctx: The MCP context
-            name: Name to search for (partial matches are supported)
+            name: Name or pattern to search for
+            match: How to match the name: "substring" (default, partial matches),
+                "prefix", "glob" (e.g. "Enemy_*", "Tree_??") or "exact"
+            limit: Optional page size; return one page of matches instead of all of them
+            cursor: Optional next_cursor from the previous page
 
         Returns:
-            List of dicts containing object names and their paths
+            List of dicts containing object names and their paths, or with a
+            limit, a dict with the page's "items" and a "next_cursor" (None on the last page)
         """
         try:
-            response = get_unity_connection().send_command("FIND_OBJECTS_BY_NAME", {
-                "name": name
-            })
-            return response.get("objects", [])
+            if limit is None and cursor is None:
+                return scene_mirror.find_objects_by_name(get_unity_connection(), name, match)
+            objects = lambda: scene_mirror.iter_objects_by_name(get_unity_connection(), name, match)
+            return paginate_listing(objects, limit or config.default_page_size, cursor)
         except Exception as e:
-            return [{"error": f"Failed to find objects: {str(e)}"}]
+            return {"error": f"Failed to find objects: {str(e)}"}
 
     @mcp.tool()
     def find_objects_by_tag(
@@ -91,10 +116,76 @@ def register_object_tools(mcp: FastMCP):
             List of dicts containing object names and their paths
         """
         try:
-            response = get_unity_connection().send_command("FIND_OBJECTS_BY_TAG", {
-                "tag": tag
-            })
-            return response.get("objects", [])
+            return scene_mirror.find_objects_by_tag(get_unity_connection(), tag)
+        except Exception as e:
+            return [{"error": f"Failed to find objects: {str(e)}"}]
+
+    @mcp.tool()
+    def find_objects_near(
+        ctx: Context,
+        point: List[float],
+        radius: float,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Find game objects within a distance of a point, nearest first.
+
+        Answered from an in-memory index of object positions, so it stays fast
+        on large scenes; prefer it to inspecting objects one by one.
+
+        Args:
+            ctx: The MCP context
+            point: [x, y, z] world position to search around
+            radius: Search radius in world units
+            limit: Optional page size; return one page of matches instead of all of them
+            cursor: Optional next_cursor from the previous page
+
+        Returns:
+            List of dicts containing object names, paths, world positions and
+            distances, or with a limit, a dict with the page's "items" and a
+            "next_cursor" (None on the last page)
+        """
+        try:
+            if len(point) < 3:
+                return [{"error": "point must be [x, y, z]"}]
+            if radius < 0:
+                return [{"error": "radius must not be negative"}]
+            objects = spatial_index.find_objects_near(get_unity_connection(), point, radius)
+            if limit is None and cursor is None:
+                return objects
+            return paginate(objects, limit or config.default_page_size, cursor)
+        except Exception as e:
+            return [{"error": f"Failed to find objects: {str(e)}"}]
+
+    @mcp.tool()
+    def find_objects_in_box(
+        ctx: Context,
+        min: List[float],
+        max: List[float],
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+        """Find game objects whose position lies inside an axis-aligned box.
+
+        Args:
+            ctx: The MCP context
+            min: [x, y, z] corner of the box with the smallest coordinates
+            max: [x, y, z] corner of the box with the largest coordinates
+            limit: Optional page size; return one page of matches instead of all of them
+            cursor: Optional next_cursor from the previous page
+
+        Returns:
+            List of dicts containing object names, paths and world positions, in
+            hierarchy order, or with a limit, a dict with the page's "items" and
+            a "next_cursor" (None on the last page)
+        """
+        try:
+            if len(min) < 3 or len(max) < 3:
+                return [{"error": "min and max must be [x, y, z]"}]
+            objects = spatial_index.find_objects_in_box(get_unity_connection(), min, max)
+            if limit is None and cursor is None:
+                return objects
+            return paginate(objects, limit or config.default_page_size, cursor)
         except Exception as e:
             return [{"error": f"Failed to find objects: {str(e)}"}]
 
@@ -115,18 +206,36 @@ def register_object_tools(mcp: FastMCP):
             return {"error": f"Failed to get scene info: {str(e)}"}
 
     @mcp.tool()
-    def get_hierarchy(ctx: Context) -> Dict[str, Any]:
+    def get_hierarchy(
+        ctx: Context,
+        since: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Get the current hierarchy of game objects in the scene.
 
+        Every result carries a ``version``. Pass it back as ``since`` on the next
+        call to receive only what changed since then instead of the whole tree.
+        With a ``limit``, the hierarchy is returned instead as pages of flat
+        nodes (id, name, parent id, path), parents before their children.
+
         Args:
             ctx: The MCP context
+            since: Optional version from an earlier get_hierarchy call
+            limit: Optional page size for a paginated listing of the nodes
+            cursor: Optional next_cursor from the previous page
 
         Returns:
-            Dict containing the scene hierarchy as a tree structure
+            Dict containing the scene hierarchy as a tree structure with
+            ``full: True``, or with ``full: False`` the changes since ``since``:
+            ``added`` nodes (id, name, parent id, path), ``removed`` node ids,
+            ``renamed`` and ``reparented`` nodes
         """
         try:
-            response = get_unity_connection().send_command("GET_HIERARCHY")
-            return response
+            if limit is not None or cursor is not None:
+                return get_hierarchy_versions().get_hierarchy_page(
+                    get_unity_connection(), limit or config.default_page_size, cursor)
+            return get_hierarchy_versions().get_hierarchy(get_unity_connection(), since)
         except Exception as e:
             return {"error": f"Failed to get hierarchy: {str(e)}"}
 
@@ -173,8 +282,10 @@ def register_object_tools(mcp: FastMCP):
         ctx: Context,
         type: Optional[str] = None,
         search_pattern: str = "*",
-        folder: str = "Assets"
-    ) -> List[Dict[str, str]]:
+        folder: str = "Assets",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Union[List[Dict[str, str]], Dict[str, Any]]:
         """Get a list of assets in the project.
 
         Args:
@@ -182,16 +293,19 @@ def register_object_tools(mcp: FastMCP):
             type: Optional asset type to filter by
             search_pattern: Pattern to search for in asset names
             folder: Folder to search in (default: "Assets")
+            limit: Optional page size; return one page of assets instead of all of them
+            cursor: Optional next_cursor from the previous page
 
         Returns:
-            List of dicts containing asset information
+            List of dicts containing asset information, or with a limit, a dict
+            with the page's "items" and a "next_cursor" (None on the last page)
         """
         try:
-            response = get_unity_connection().send_command("GET_ASSET_LIST", {
-                "type": type,
-                "search_pattern": search_pattern,
-                "folder": folder
-            })
-            return response.get("assets", [])
+            # Served from the on-disk project index when one is configured; Unity is only
+            # connected to when the listing has to come from the editor
+            if limit is None and cursor is None:
+                return project_index.list_assets(asset_type=type, search_pattern=search_pattern, folder=folder)
+            assets = lambda: project_index.iter_assets(asset_type=type, search_pattern=search_pattern, folder=folder)
+            return paginate_listing(assets, limit or config.default_page_size, cursor)
         except Exception as e:
-            return [{"error": f"Failed to get asset list: {str(e)}"}] 
\ No newline at end of file
+            return {"error": f"Failed to get asset list: {str(e)}"} 
\ No newline at end of file
@@ -2,6 +2,11 @@ from mcp.server.fastmcp import FastMCP, Context
 from typing import List, Dict, Any, Optional
 import json
 from unity_connection import get_unity_connection
+from scene_mirror import existing_names, find_objects_by_name, submit_find_objects_by_name
+from asset_catalog import asset_exists
+from component_cache import submit_component_types, has_component
+from bulk_transforms import vector_array, non_finite_rows, missing_objects, run_rows
+from layouts import generate_layout as compute_layout, layout_to_lists
 
 def register_scene_tools(mcp: FastMCP):
     """Register all scene-related tools with the MCP server."""
@@ -30,15 +35,7 @@ def register_scene_tools(mcp: FastMCP):
             unity = get_unity_connection()
             
             # Check if the scene exists in the project
-            scenes = unity.send_command("GET_ASSET_LIST", {
-                "type": "Scene",
-                "search_pattern": scene_path.split('/')[-1],
-                "folder": '/'.join(scene_path.split('/')[:-1]) or "Assets"
-            }).get("assets", [])
-            
-            # Check if any scene matches the exact path
-            scene_exists = any(scene.get("path") == scene_path for scene in scenes)
-            if not scene_exists:
+            if not asset_exists(unity, scene_path, "Scene"):
                 return f"Scene at '{scene_path}' not found in the project."
                 
             result = unity.send_command("OPEN_SCENE", {"scene_path": scene_path})
@@ -75,14 +72,7 @@ def register_scene_tools(mcp: FastMCP):
             unity = get_unity_connection()
             
             # Check if a scene with this path already exists
-            scenes = unity.send_command("GET_ASSET_LIST", {
-                "type": "Scene",
-                "search_pattern": scene_path.split('/')[-1],
-                "folder": '/'.join(scene_path.split('/')[:-1]) or "Assets"
-            }).get("assets", [])
-            
-            # Check if any scene matches the exact path
-            scene_exists = any(scene.get("path") == scene_path for scene in scenes)
+            scene_exists = asset_exists(unity, scene_path, "Scene")
             if scene_exists and not overwrite:
                 return f"Scene at '{scene_path}' already exists. Use overwrite=True to replace it."
             
@@ -167,9 +157,7 @@ def register_scene_tools(mcp: FastMCP):
             
             # Check if an object with the specified name already exists (if name is provided)
             if name:
-                found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                    "name": name
-                }).get("objects", [])
+                found_objects = find_objects_by_name(unity, name)
                 
                 if found_objects and not replace_if_exists:
                     return f"Object with name '{name}' already exists. Use replace_if_exists=True to replace it."
@@ -192,6 +180,120 @@ def register_scene_tools(mcp: FastMCP):
         except Exception as e:
             return f"Error creating game object: {str(e)}"
 
+    @mcp.tool()
+    def generate_layout(ctx: Context, layout: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compute object positions for a procedural layout without creating anything.
+        
+        Use the result with set_transforms_bulk, or pass the same layout to create_objects_bulk.
+        
+        Args:
+            layout: Dict with "kind" plus its parameters (all lengths in world units):
+                - grid: count, spacing (2), columns (square), origin
+                - ring: count, radius (10), start_angle (0, degrees), origin; also returns
+                  rotations facing outwards
+                - poisson: count, min_distance (2), size ([50, 50] width and depth), seed,
+                  origin; random points no closer than min_distance (may return fewer than count)
+                - heightmap: heights (2D list, rows along Z), spacing (1), height_scale (1), origin
+                Layouts are centred on origin (default [0, 0, 0]) in the XZ plane.
+        
+        Returns:
+            Dict with "positions" (and for rings "rotations") as lists of [x, y, z]
+        """
+        try:
+            return layout_to_lists(compute_layout(layout))
+        except Exception as e:
+            return {"error": f"Failed to generate layout: {str(e)}"}
+
+    @mcp.tool()
+    def create_objects_bulk(
+        ctx: Context,
+        type: str = "CUBE",
+        layout: Optional[Dict[str, Any]] = None,
+        positions: Optional[List[List[float]]] = None,
+        names: Optional[List[str]] = None,
+        name_prefix: Optional[str] = None,
+        rotations: Optional[List[List[float]]] = None,
+        scales: Optional[List[List[float]]] = None,
+        replace_if_exists: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create many game objects of one type in one call, e.g. for level blockouts.
+        
+        Give either a procedural layout (see generate_layout for its parameters) or
+        explicit positions. Names are checked for collisions once for the whole set.
+        
+        Args:
+            type: Object type (CUBE, SPHERE, CYLINDER, CAPSULE, PLANE, EMPTY, CAMERA, LIGHT).
+            layout: Optional layout dict, e.g. {"kind": "grid", "count": 100, "spacing": 3}.
+            positions: Optional [x, y, z] position per object, instead of a layout.
+            names: Optional name per object (defaults to "<name_prefix>_<index>").
+            name_prefix: Prefix for generated names (defaults to the type, e.g. "Cube").
+            rotations: Optional [x, y, z] rotation in degrees per object, or one for all
+                (defaults to the layout's rotations, or [0, 0, 0]).
+            scales: Optional [x, y, z] scale factors per object, or one for all (defaults to [1, 1, 1]).
+            replace_if_exists: Whether to replace objects that already have one of the names (default: False)
+        
+        Returns:
+            Dict with a summary line, the number of objects requested and created, the
+            "names" of the created objects, and a "failed" list of {index, name, error}
+        """
+        try:
+            if (layout is None) == (positions is None):
+                return {"error": "Provide either a layout or positions"}
+            layout_rotations = None
+            if layout is not None:
+                positions, layout_rotations = compute_layout(layout)
+            count = len(positions)
+            if not count:
+                return {"error": "The layout produced no positions"}
+            if names is None:
+                prefix = name_prefix or type.capitalize()
+                names = [f"{prefix}_{index}" for index in range(count)]
+            elif len(names) != count:
+                return {"error": f"Got {len(names)} names for {count} objects"}
+            
+            arrays = {
+                "positions": vector_array(positions, count, "positions"),
+                "rotations": vector_array(rotations if rotations is not None
+                                          else layout_rotations if layout_rotations is not None
+                                          else [0, 0, 0], count, "rotations"),
+                "scales": vector_array(scales if scales is not None else [1, 1, 1], count, "scales")
+            }
+            skip = non_finite_rows(arrays)
+            seen = set()
+            for row, name in enumerate(names):
+                if not name:
+                    skip.setdefault(row, "Name must not be empty")
+                elif name in seen:
+                    skip.setdefault(row, f"Name '{name}' is used more than once in this call")
+                seen.add(name)
+            
+            unity = get_unity_connection()
+            
+            # One collision check for the whole set: exact lookups of the requested names
+            existing = existing_names(unity, names)
+            colliding = [row for row, name in enumerate(names) if name in existing and row not in skip]
+            if colliding and not replace_if_exists:
+                for row in colliding:
+                    skip[row] = f"Object with name '{names[row]}' already exists. Use replace_if_exists=True to replace it."
+            elif colliding:
+                deletes = unity.send_batch([{"type": "DELETE_OBJECT", "params": {"name": names[row]}}
+                                            for row in colliding])
+                for row, outcome in zip(colliding, deletes):
+                    if outcome.get("status") == "error":
+                        skip[row] = f"Could not replace '{names[row]}': {outcome.get('error')}"
+            
+            fields = {"positions": "location", "rotations": "rotation", "scales": "scale"}
+            base = [{"type": type.upper(), "name": name} for name in names]
+            result = run_rows(unity, "CREATE_OBJECT", base,
+                              {fields[label]: array for label, array in arrays.items()}, skip, "Created")
+            failed = {item["index"] for item in result["failed"]}
+            result["names"] = [name for row, name in enumerate(names) if row not in failed]
+            return result
+        except Exception as e:
+            return {"error": f"Failed to create objects: {str(e)}"}
+
     @mcp.tool()
     def modify_object(
         ctx: Context,
@@ -228,46 +330,43 @@ def register_scene_tools(mcp: FastMCP):
         try:
             unity = get_unity_connection()
             
+            # Issue the pre-checks up front; on a multiplexed connection they run concurrently.
+            # On a serial connection submit runs the command at once, so the component
+            # lookup waits until the object is known to exist.
+            found_request = submit_find_objects_by_name(unity, name)
+            parent_request = None
+            if set_parent is not None:
+                parent_request = submit_find_objects_by_name(unity, set_parent)
+            needs_props = add_component is not None or remove_component is not None
+            props_request = None
+            if needs_props and unity.multiplexed:
+                props_request = submit_component_types(unity, name)
+            
             # Check if the object exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                "name": name
-            }).get("objects", [])
+            found_objects = unity.wait(found_request).get("objects", [])
             
             if not found_objects:
                 return f"Object with name '{name}' not found in the scene."
             
             # If set_parent is provided, check if parent object exists
-            if set_parent is not None:
-                parent_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                    "name": set_parent
-                }).get("objects", [])
+            if parent_request is not None:
+                parent_objects = unity.wait(parent_request).get("objects", [])
                 
                 if not parent_objects:
                     return f"Parent object '{set_parent}' not found in the scene."
             
+            # One component lookup serves both the add and the remove check
+            if needs_props and props_request is None:
+                props_request = submit_component_types(unity, name)
+            object_props = unity.wait(props_request) if props_request is not None else {}
+            
             # If we're adding a component, we could also check if it's already attached
-            if add_component is not None:
-                object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
-                    "name": name
-                })
-                
-                components = object_props.get("components", [])
-                component_exists = any(comp.get("type") == add_component for comp in components)
-                
-                if component_exists:
-                    return f"Component '{add_component}' is already attached to '{name}'."
+            if add_component is not None and has_component(object_props, add_component):
+                return f"Component '{add_component}' is already attached to '{name}'."
             
             # If we're removing a component, check if it exists
-            if remove_component is not None:
-                object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
-                    "name": name
-                })
-                
-                components = object_props.get("components", [])
-                component_exists = any(comp.get("type") == remove_component for comp in components)
-                
-                if not component_exists:
-                    return f"Component '{remove_component}' is not attached to '{name}'."
+            if remove_component is not None and not has_component(object_props, remove_component):
+                return f"Component '{remove_component}' is not attached to '{name}'."
             
             params = {"name": name}
             
@@ -300,6 +399,55 @@ def register_scene_tools(mcp: FastMCP):
         except Exception as e:
             return f"Error modifying game object: {str(e)}"
 
+    @mcp.tool()
+    def set_transforms_bulk(
+        ctx: Context,
+        names: List[str],
+        positions: Optional[List[List[float]]] = None,
+        rotations: Optional[List[List[float]]] = None,
+        scales: Optional[List[List[float]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Set the position, rotation and/or scale of many game objects in one call.
+        
+        Much faster than calling modify_object once per object: all values are
+        validated up front and the updates go to Unity in batches.
+        
+        Args:
+            names: Names (or hierarchy paths) of the game objects to update.
+            positions: Optional [x, y, z] position per object, in the order of names
+                (or a single [x, y, z] for all of them).
+            rotations: Optional [x, y, z] rotation in degrees per object (or one for all).
+            scales: Optional [x, y, z] scale factors per object (or one for all).
+        
+        Returns:
+            Dict with a summary line, the number of objects requested and updated,
+            and a "failed" list of {index, name, error} for objects that were not updated
+        """
+        try:
+            if not names:
+                return {"error": "names must not be empty"}
+            given = {"positions": positions, "rotations": rotations, "scales": scales}
+            arrays = {label: vector_array(values, len(names), label)
+                      for label, values in given.items() if values is not None}
+            if not arrays:
+                return {"error": "Provide at least one of positions, rotations or scales"}
+            
+            unity = get_unity_connection()
+            
+            # One validation pass and one existence check for the whole set
+            skip = non_finite_rows(arrays)
+            missing = missing_objects(unity, names)
+            for row, is_missing in enumerate(missing or ()):
+                if is_missing:
+                    skip.setdefault(row, f"Object with name '{names[row]}' not found in the scene.")
+            
+            fields = {"positions": "location", "rotations": "rotation", "scales": "scale"}
+            return run_rows(unity, "MODIFY_OBJECT", [{"name": name} for name in names],
+                            {fields[label]: array for label, array in arrays.items()}, skip, "Updated")
+        except Exception as e:
+            return {"error": f"Failed to set transforms: {str(e)}"}
+
     @mcp.tool()
     def delete_object(ctx: Context, name: str, ignore_missing: bool = False) -> str:
         """
@@ -316,9 +464,7 @@ def register_scene_tools(mcp: FastMCP):
             unity = get_unity_connection()
             
             # Check if the object exists
-            found_objects = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                "name": name
-            }).get("objects", [])
+            found_objects = find_objects_by_name(unity, name)
             
             if not found_objects:
                 if ignore_missing:
@@ -1,6 +1,11 @@
 from mcp.server.fastmcp import FastMCP, Context
-from typing import List
+from typing import List, Optional
 from unity_connection import get_unity_connection
+from config import config
+from pagination import paginate_listing
+from scene_mirror import submit_find_objects_by_name
+from component_cache import submit_component_types, has_component
+import project_index
 
 def register_script_tools(mcp: FastMCP):
     """Register all script-related tools with the MCP server."""
@@ -178,24 +183,37 @@ def register_script_tools(mcp: FastMCP):
             return f"Error updating script: {str(e)}"
 
     @mcp.tool()
-    def list_scripts(ctx: Context, folder_path: str = "Assets") -> str:
+    def list_scripts(
+        ctx: Context,
+        folder_path: str = "Assets",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> str:
         """List all script files in a specified folder.
         
         Args:
             ctx: The MCP context
             folder_path: Path to the folder to search (default: Assets)
+            limit: Optional page size; list one page of scripts instead of all of them
+            cursor: Optional cursor from the last line of the previous page
             
         Returns:
             str: List of script files or error message
         """
         try:
-            # Send command to Unity to list scripts
-            response = get_unity_connection().send_command("LIST_SCRIPTS", {
-                "folder_path": folder_path
-            })
-            scripts = response.get("scripts", [])
+            # Served from the on-disk project index when one is configured; Unity is only
+            # connected to when the listing has to come from the editor
+            if limit is None and cursor is None:
+                scripts = project_index.list_scripts(folder_path=folder_path)
+                next_cursor = None
+            else:
+                listing = lambda: project_index.iter_scripts(folder_path=folder_path)
+                page = paginate_listing(listing, limit or config.default_page_size, cursor)
+                scripts, next_cursor = page["items"], page["next_cursor"]
             if not scripts:
                 return "No scripts found in the specified folder"
+            if next_cursor is not None:
+                scripts.append(f"(more scripts: call again with cursor='{next_cursor}')")
             return "\n".join(scripts)
         except Exception as e:
             return f"Error listing scripts: {str(e)}"
@@ -221,10 +239,13 @@ def register_script_tools(mcp: FastMCP):
         try:
             unity = get_unity_connection()
             
+            # Issue both pre-checks up front on a multiplexed connection, where they run
+            # concurrently; on a serial one the component lookup waits for the object check
+            object_request = submit_find_objects_by_name(unity, object_name)
+            props_request = submit_component_types(unity, object_name) if unity.multiplexed else None
+            
             # Check if the object exists
-            object_response = unity.send_command("FIND_OBJECTS_BY_NAME", {
-                "name": object_name
-            })
+            object_response = unity.wait(object_request)
             
             objects = object_response.get("objects", [])
             if not objects:
@@ -251,18 +272,16 @@ def register_script_tools(mcp: FastMCP):
                         script_path = f"{script_path}/{script_basename}"
             
             # Check if the script is already attached
-            object_props = unity.send_command("GET_OBJECT_PROPERTIES", {
-                "name": object_name
-            })
+            if props_request is None:
+                props_request = submit_component_types(unity, object_name)
+            object_props = unity.wait(props_request)
             
             # Extract script name without .cs and without path for component type checking
             script_class_name = script_basename.replace(".cs", "")
             
             # Check if component is already attached
-            components = object_props.get("components", [])
-            for component in components:
-                if component.get("type") == script_class_name:
-                    return f"Script '{script_class_name}' is already attached to '{object_name}'."
+            if has_component(object_props, script_class_name):
+                return f"Script '{script_class_name}' is already attached to '{object_name}'."
             
             # Send command to Unity to attach the script
             params = {
@@ -1,9 +1,21 @@
 import socket
 import json
 import logging
-from dataclasses import dataclass
-from typing import Dict, Any
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from config import config
+from unity_protocol import (
+    FRAMING_LEGACY, FRAMING_LENGTH_PREFIX, FRAME_HEADER, PING_PAYLOAD, BATCH_COMMAND,
+    encode_frame, decode_frame_header, encode_command, build_handshake, parse_handshake_response,
+    normalize_batch_commands, batch_chunks, batch_reply_items, batch_item_error, batch_item_skipped,
+    is_unsupported_error, response_error, IncrementalJsonDecoder, JsonItemStream
+)
 
 # Configure logging using settings from config
 logging.basicConfig(
@@ -12,85 +24,292 @@ logging.basicConfig(
 )
 logger = logging.getLogger("UnityMCP")
 
+class StaleConnectionError(ConnectionError):
+    """Raised when the socket was already dead before a command reached Unity."""
+
+# Called as observer(command_type, params, result) after every successful command
+CommandObserver = Callable[[str, Dict[str, Any], Any], None]
+_command_observers: List[CommandObserver] = []
+
+def add_command_observer(observer: CommandObserver):
+    """Register a callback that sees every command Unity executed successfully.
+
+    Observers run on whichever thread received the reply, before the caller
+    gets the result, so state they keep is up to date when the caller resumes.
+    """
+    if observer not in _command_observers:
+        _command_observers.append(observer)
+
+def remove_command_observer(observer: CommandObserver):
+    """Unregister a callback added with add_command_observer."""
+    if observer in _command_observers:
+        _command_observers.remove(observer)
+
+def _notify_observers(command_type: str, params: Dict[str, Any], result: Any):
+    """Tell observers about a successful command; batches are reported item by item."""
+    if not _command_observers:
+        return
+    if command_type == BATCH_COMMAND:
+        items = (params or {}).get("commands", [])
+        outcomes = result.get("results", []) if isinstance(result, dict) else []
+        for item, outcome in zip(items, outcomes):
+            if isinstance(outcome, dict) and outcome.get("status") == "success":
+                _notify_observers(item.get("type"), item.get("params") or {}, outcome.get("result", {}))
+        return
+    for observer in list(_command_observers):
+        try:
+            observer(command_type, params or {}, result)
+        except Exception as e:
+            logger.error(f"Command observer failed on {command_type}: {str(e)}")
+
 @dataclass
 class UnityConnection:
     """Manages the socket connection to the Unity Editor."""
     host: str = config.unity_host
     port: int = config.unity_port
     sock: socket.socket = None  # Socket for Unity communication
+    framing: str = FRAMING_LEGACY  # Wire framing negotiated on connect
+    multiplexed: bool = False  # Whether replies are matched to requests by ID
+    batch: bool = False  # Whether the bridge executes BATCH commands
+    # Multiplexed mode: in-flight requests (future, command type, params) by ID, and the thread that resolves them
+    _pending: Dict[int, Tuple[Future, str, Dict[str, Any]]] = field(default_factory=dict, repr=False)
+    _pending_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _send_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _request_ids: itertools.count = field(default_factory=itertools.count, repr=False)
+    _reader: Optional[threading.Thread] = field(default=None, repr=False)
+    # Serial mode: one request/reply exchange at a time (tool calls and heartbeat share the socket)
+    _io_lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+    last_activity: float = 0.0  # time.monotonic() of the last completed exchange
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "pings_saved": 0, "heartbeat_pings": 0, "heartbeat_failures": 0, "reconnects": 0
+    })
 
     def connect(self) -> bool:
         """Establish a connection to the Unity Editor."""
         if self.sock:
             return True
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect((self.host, self.port))
+            self.sock = self._open_socket()
             logger.info(f"Connected to Unity at {self.host}:{self.port}")
-            return True
         except Exception as e:
             logger.error(f"Failed to connect to Unity: {str(e)}")
             self.sock = None
             return False
 
+        self.framing = FRAMING_LEGACY
+        self.multiplexed = False
+        self.batch = False
+        if config.unity_framing == "auto":
+            self._negotiate_framing()
+        if self.sock is not None and self.multiplexed:
+            self._start_reader()
+        return self.sock is not None
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Pipelined commands are small writes; don't let Nagle hold them back
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.connect((self.host, self.port))
+        return sock
+
+    def _negotiate_framing(self):
+        """Offer length-prefixed framing to the bridge, falling back to legacy mode.
+
+        The handshake itself is sent in legacy mode, so bridges that do not know
+        the command simply answer with an error and the connection stays legacy.
+        """
+        try:
+            self.sock.sendall(build_handshake(multiplex=config.unity_multiplex))
+            negotiated = parse_handshake_response(self.receive_full_response(self.sock))
+            self.framing = negotiated["framing"]
+            self.multiplexed = config.unity_multiplex and negotiated["multiplex"]
+            self.batch = negotiated["batch"]
+            logger.info(f"Negotiated {self.framing} framing with Unity"
+                        f"{' (multiplexed)' if self.multiplexed else ''}")
+        except Exception as e:
+            # Some bridges drop the socket on unknown commands; reconnect without a handshake
+            logger.warning(f"Framing handshake failed, using legacy framing: {str(e)}")
+            try:
+                self.sock.close()
+            except Exception:
+                pass
+            try:
+                self.sock = self._open_socket()
+            except Exception as e:
+                logger.error(f"Failed to reconnect to Unity: {str(e)}")
+                self.sock = None
+            self.framing = FRAMING_LEGACY
+            self.multiplexed = False
+            self.batch = False
+
+    def _start_reader(self):
+        """Start the thread that routes multiplexed replies to their callers."""
+        # Per-request deadlines are enforced by the waiting callers, not the socket
+        self.sock.settimeout(None)
+        self._reader = threading.Thread(
+            target=self._read_replies, args=(self.sock,), name="UnityMCP-reply-reader", daemon=True
+        )
+        self._reader.start()
+
+    def _read_replies(self, sock: socket.socket):
+        """Read framed replies and resolve the pending request each one answers."""
+        try:
+            while True:
+                length = decode_frame_header(self._recv_exactly(sock, FRAME_HEADER.size))
+                response = json.loads(bytes(self._recv_exactly(sock, length)).decode('utf-8'))
+
+                self.last_activity = time.monotonic()
+                with self._pending_lock:
+                    pending = self._pending.pop(response.get("id"), None)
+                if pending is None:
+                    logger.warning(f"Dropping Unity reply for unknown request ID {response.get('id')}")
+                    continue
+                future, command_type, params = pending
+
+                error_message = response_error(response)
+                if error_message is not None:
+                    logger.error(f"Unity error: {error_message}")
+                    future.set_exception(Exception(error_message))
+                else:
+                    result = response.get("result", {})
+                    _notify_observers(command_type, params, result)
+                    future.set_result(result)
+        except Exception as e:
+            if self.sock is sock:
+                logger.error(f"Multiplexed Unity connection lost: {str(e)}")
+                self.sock = None
+                try:
+                    sock.close()
+                except Exception:
+                    pass
+            self._fail_pending(ConnectionError(f"Connection to Unity lost: {str(e)}"))
+
+    def _fail_pending(self, error: Exception):
+        """Fail every in-flight request, e.g. after the socket dropped."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future, _, _ in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def submit(self, command_type: str, params: Dict[str, Any] = None) -> Future:
+        """Send a command without waiting for its reply.
+
+        On a multiplexed connection several submitted commands are in flight at
+        once and each Future resolves when its reply arrives. On a serial
+        connection the command is executed immediately and the Future is
+        already complete, so callers can use the same code in both modes.
+
+        Returns:
+            Future resolving to the command's result (or raising its error)
+        """
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Unity")
+
+        future = Future()
+        if not self.multiplexed:
+            try:
+                future.set_result(self.send_command(command_type, params))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        request_id = next(self._request_ids)
+        with self._pending_lock:
+            self._pending[request_id] = (future, command_type, params)
+        try:
+            logger.info(f"Sending command #{request_id}: {command_type} with params: {params}")
+            with self._send_lock:
+                self.send_payload(encode_command(command_type, params, request_id))
+        except Exception as e:
+            logger.error(f"Communication error with Unity: {str(e)}")
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+            self.disconnect()
+            raise StaleConnectionError(f"Lost connection to Unity while sending: {str(e)}")
+        return future
+
+    def wait(self, future: Future) -> Dict[str, Any]:
+        """Wait for a submitted command's result, applying the connection timeout."""
+        try:
+            return future.result(timeout=config.connection_timeout)
+        except FutureTimeoutError:
+            raise Exception("Timeout receiving Unity response")
+
     def disconnect(self):
         """Close the connection to the Unity Editor."""
         if self.sock:
+            sock, self.sock = self.sock, None
             try:
-                self.sock.close()
+                if self.multiplexed:
+                    # Wake the reply reader blocked in recv
+                    sock.shutdown(socket.SHUT_RDWR)
+                sock.close()
             except Exception as e:
                 logger.error(f"Error disconnecting from Unity: {str(e)}")
-            finally:
-                self.sock = None
+        self._fail_pending(ConnectionError("Disconnected from Unity"))
+
+    def send_payload(self, payload: bytes):
+        """Write one message to Unity using the negotiated framing."""
+        if self.framing == FRAMING_LENGTH_PREFIX:
+            self.sock.sendall(encode_frame(payload))
+        else:
+            self.sock.sendall(payload)
+
+    def receive_payload(self) -> bytes:
+        """Read one message from Unity using the negotiated framing."""
+        if self.framing == FRAMING_LENGTH_PREFIX:
+            return self.receive_frame(self.sock)
+        return self.receive_full_response(self.sock)
+
+    def _recv_exactly(self, sock, size: int) -> bytearray:
+        """Read exactly ``size`` bytes into a preallocated buffer."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = sock.recv_into(view[received:], min(size - received, config.buffer_size))
+            if count == 0:
+                raise ConnectionError(f"Connection closed after {received} of {size} bytes")
+            received += count
+        return buffer
+
+    def receive_frame(self, sock) -> bytes:
+        """Receive one length-prefixed message from Unity."""
+        sock.settimeout(config.connection_timeout)
+        try:
+            try:
+                header = self._recv_exactly(sock, FRAME_HEADER.size)
+            except ConnectionError as e:
+                raise StaleConnectionError(str(e))
+            length = decode_frame_header(header)
+            data = bytes(self._recv_exactly(sock, length))
+            logger.info(f"Received complete response ({length} bytes)")
+            return data
+        except socket.timeout:
+            logger.warning("Socket timeout during receive")
+            raise Exception("Timeout receiving Unity response")
 
     def receive_full_response(self, sock, buffer_size=config.buffer_size) -> bytes:
-        """Receive a complete response from Unity, handling chunked data."""
-        chunks = []
+        """Receive a complete unframed response from Unity, handling chunked data.
+
+        Chunks are received straight into the decoder's buffer, which tracks
+        JSON nesting as bytes arrive and reports the end of the response without
+        re-parsing what was already received.
+        """
+        decoder = IncrementalJsonDecoder()
         sock.settimeout(config.connection_timeout)  # Use timeout from config
         try:
             while True:
-                chunk = sock.recv(buffer_size)
-                if not chunk:
-                    if not chunks:
-                        raise Exception("Connection closed before receiving data")
-                    break
-                chunks.append(chunk)
-                
-                # Process the data received so far
-                data = b''.join(chunks)
-                decoded_data = data.decode('utf-8')
-                
-                # Check if we've received a complete response
-                try:
-                    # Special case for ping-pong
-                    if decoded_data.strip().startswith('{"status":"success","result":{"message":"pong"'):
-                        logger.debug("Received ping response")
-                        return data
-                    
-                    # Handle escaped quotes in the content
-                    if '"content":' in decoded_data:
-                        # Find the content field and its value
-                        content_start = decoded_data.find('"content":') + 9
-                        content_end = decoded_data.rfind('"', content_start)
-                        if content_end > content_start:
-                            # Replace escaped quotes in content with regular quotes
-                            content = decoded_data[content_start:content_end]
-                            content = content.replace('\\"', '"')
-                            decoded_data = decoded_data[:content_start] + content + decoded_data[content_end:]
-                    
-                    # Validate JSON format
-                    json.loads(decoded_data)
-                    
-                    # If we get here, we have valid JSON
+                count = sock.recv_into(decoder.write_view(buffer_size), buffer_size)
+                if count == 0:
+                    if decoder.length == 0:
+                        raise StaleConnectionError("Connection closed before receiving data")
+                    raise ConnectionError(f"Connection closed after {decoder.length} bytes of an incomplete response")
+                if decoder.commit(count):
+                    data = decoder.message()
                     logger.info(f"Received complete response ({len(data)} bytes)")
                     return data
-                except json.JSONDecodeError:
-                    # We haven't received a complete valid JSON response yet
-                    continue
-                except Exception as e:
-                    logger.warning(f"Error processing response chunk: {str(e)}")
-                    # Continue reading more chunks as this might not be the complete response
-                    continue
         except socket.timeout:
             logger.warning("Socket timeout during receive")
             raise Exception("Timeout receiving Unity response")
@@ -98,87 +317,598 @@ class UnityConnection:
             logger.error(f"Error during receive: {str(e)}")
             raise
 
+    def _exchange(self, payload: bytes) -> Dict[str, Any]:
+        """Send one message and read its reply on a serial connection."""
+        with self._io_lock:
+            try:
+                self.send_payload(payload)
+            except OSError as e:
+                raise StaleConnectionError(f"Send failed: {str(e)}")
+            response_data = self.receive_payload()
+        self.last_activity = time.monotonic()
+        return json.loads(response_data.decode('utf-8'))
+
     def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Send a command to Unity and return its response."""
+        """Send a command to Unity and return its response.
+
+        If the socket turns out to be dead before Unity could have seen the
+        command, the connection is re-established once and the command retried.
+        """
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Unity")
+        try:
+            return self._send_command_once(command_type, params)
+        except StaleConnectionError as e:
+            logger.warning(f"Unity connection went stale ({str(e)}), reconnecting")
+            self.disconnect()
+            self.stats["reconnects"] += 1
+            if not self.connect():
+                raise ConnectionError("Could not reconnect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
+            return self._send_command_once(command_type, params)
+
+    def send_batch(self, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run an ordered list of commands with as few round trips as possible.
+
+        Each command is a ``{"type": ..., "params": ...}`` dict. Bridges that
+        support ``BATCH`` get the list in chunks of ``config.batch_max_commands``;
+        otherwise the commands are pipelined (or run one by one on a serial
+        connection). Items fail independently of each other. If a whole chunk
+        fails (e.g. the connection drops while Unity runs it), the chunks before
+        it keep their results, its items report the error, and the commands
+        after it are not sent, so nothing Unity already ran is reported as
+        failed or run twice on a retry.
+
+        Returns:
+            One ``{"status": "success", "result": ...}`` or
+            ``{"status": "error", "error": ...}`` envelope per command, in order;
+            commands that were not sent also carry ``"skipped": True``
+        """
+        commands = normalize_batch_commands(commands)
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Unity")
+
+        results = []
+        for chunk in batch_chunks(commands, config.batch_max_commands):
+            if self.batch:
+                try:
+                    results.extend(batch_reply_items(self.send_command(BATCH_COMMAND, {"commands": chunk}), chunk))
+                    continue
+                except Exception as e:
+                    if not is_unsupported_error(e):
+                        logger.error(f"Batch failed after {len(results)} of {len(commands)} commands: {str(e)}")
+                        results.extend(batch_item_error(e) for _ in chunk)
+                        break
+                    # Advertised but not implemented; nothing in the chunk ran
+                    logger.warning(f"Unity did not run BATCH ({str(e)}), sending the commands one by one")
+                    self.batch = False
+
+            futures = []
+            for command in chunk:
+                try:
+                    futures.append(self.submit(command["type"], command["params"]))
+                except Exception as e:
+                    # The command never reached Unity; neither do the ones after it
+                    logger.error(f"Batch stopped after {len(results) + len(futures)} of {len(commands)} commands: {str(e)}")
+                    stopped = e
+                    break
+            for future in futures:
+                try:
+                    results.append({"status": "success", "result": self.wait(future)})
+                except Exception as e:
+                    results.append(batch_item_error(e))
+            if len(futures) < len(chunk):
+                results.extend(batch_item_skipped(stopped) for _ in commands[len(results):])
+                return results
+        results.extend(batch_item_skipped("an earlier part of the batch failed") for _ in commands[len(results):])
+        return results
+
+    def stream_command(self, command_type: str, params: Dict[str, Any] = None,
+                       items_key: Optional[str] = None) -> Iterator[Any]:
+        """Send a listing command and yield the items of its result as they arrive.
+
+        On a serial connection a background thread reads the reply and hands
+        over each item of ``result[items_key]`` (or of ``result`` itself) as
+        soon as it is decoded, through a queue of at most
+        ``config.stream_queue_items``. The caller sees the first items before
+        the rest of the listing has arrived and never holds all of it. Closing
+        the generator early returns at once; the thread discards the rest of
+        the reply. A multiplexed connection cannot route a reply before it is
+        complete, so there the listing is fetched whole and then iterated.
+
+        Streamed replies are not reported to command observers.
+        """
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Unity")
+        if self.multiplexed:
+            result = self.send_command(command_type, params)
+            yield from (result.get(items_key) or []) if items_key else (result or [])
+            return
+
+        path = ("result", items_key) if items_key else ("result",)
+        items: queue.Queue = queue.Queue(maxsize=max(1, config.stream_queue_items))
+        abandoned = threading.Event()
+
+        def hand_over(kind: str, value: Any):
+            while not abandoned.is_set():
+                try:
+                    items.put((kind, value), timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce():
+            try:
+                logger.info(f"Streaming command: {command_type} with params: {params}")
+                for attempt in range(2):
+                    stream = JsonItemStream(path)
+                    try:
+                        with self._io_lock:
+                            self._stream_reply(encode_command(command_type, params), stream,
+                                               lambda item: hand_over("item", item))
+                        break
+                    except StaleConnectionError as e:
+                        # Nothing was received yet, so the command can be resent
+                        if attempt or stream.item_count:
+                            raise
+                        logger.warning(f"Unity connection went stale ({str(e)}), reconnecting")
+                        self.disconnect()
+                        self.stats["reconnects"] += 1
+                        if not self.connect():
+                            raise ConnectionError("Could not reconnect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
+                        if self.multiplexed:
+                            raise ConnectionError("Reconnected with multiplexing; retry the listing")
+                self.last_activity = time.monotonic()
+
+                error_message = response_error(stream.finish())
+                if error_message is not None:
+                    logger.error(f"Unity error: {error_message}")
+                    raise Exception(error_message)
+                hand_over("end", None)
+            except Exception as e:
+                hand_over("error", e)
+
+        threading.Thread(target=produce, name="UnityMCP-stream-reader", daemon=True).start()
+        try:
+            while True:
+                kind, value = items.get()
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise Exception(f"Failed to communicate with Unity: {str(value)}")
+                else:
+                    return
+        finally:
+            abandoned.set()
+
+    def _stream_reply(self, payload: bytes, stream: JsonItemStream, emit: Callable[[Any], None]):
+        """Send one command and feed its reply to ``stream``, emitting items as they complete."""
+        try:
+            self.send_payload(payload)
+        except OSError as e:
+            raise StaleConnectionError(f"Send failed: {str(e)}")
+        sock = self.sock
+        sock.settimeout(config.connection_timeout)
+        try:
+            received = 0
+            if self.framing == FRAMING_LENGTH_PREFIX:
+                try:
+                    header = self._recv_exactly(sock, FRAME_HEADER.size)
+                except ConnectionError as e:
+                    raise StaleConnectionError(str(e))
+                remaining = decode_frame_header(header)
+                while remaining:
+                    chunk = sock.recv(min(remaining, config.buffer_size))
+                    if not chunk:
+                        raise ConnectionError(f"Connection closed after {received} bytes of a streamed response")
+                    received += len(chunk)
+                    remaining -= len(chunk)
+                    for item in stream.feed(chunk):
+                        emit(item)
+            else:
+                while not stream.complete:
+                    chunk = sock.recv(config.buffer_size)
+                    if not chunk:
+                        if received == 0:
+                            raise StaleConnectionError("Connection closed before receiving data")
+                        raise ConnectionError(f"Connection closed after {received} bytes of a streamed response")
+                    received += len(chunk)
+                    for item in stream.feed(chunk):
+                        emit(item)
+            logger.info(f"Received complete streamed response ({received} bytes, {stream.item_count} items)")
+        except StaleConnectionError:
+            raise
+        except Exception as e:
+            # The rest of the reply is still in the socket; the connection cannot be reused
+            logger.error(f"Error during streamed receive: {str(e)}")
+            self.disconnect()
+            raise
+
+    def _send_command_once(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a command over the current socket without retrying."""
+        # Multiplexed connections carry ping as an ordinary ID-tagged command
+        if self.multiplexed:
+            future = self.submit(command_type, params)
+            try:
+                result = self.wait(future)
+            except Exception as e:
+                if command_type == "ping":
+                    raise ConnectionError(f"Connection verification failed: {str(e)}")
+                raise Exception(f"Failed to communicate with Unity: {str(e)}")
+            return {"message": "pong"} if command_type == "ping" else result
         
         # Special handling for ping command
         if command_type == "ping":
             try:
                 logger.debug("Sending ping to verify connection")
-                self.sock.sendall(b"ping")
-                response_data = self.receive_full_response(self.sock)
-                response = json.loads(response_data.decode('utf-8'))
+                response = self._exchange(PING_PAYLOAD)
                 
                 if response.get("status") != "success":
                     logger.warning("Ping response was not successful")
-                    self.sock = None
+                    self.disconnect()
                     raise ConnectionError("Connection verification failed")
                     
                 return {"message": "pong"}
+            except StaleConnectionError:
+                raise
             except Exception as e:
                 logger.error(f"Ping error: {str(e)}")
-                self.sock = None
+                self.disconnect()
                 raise ConnectionError(f"Connection verification failed: {str(e)}")
         
         # Normal command handling
-        command = {"type": command_type, "params": params or {}}
         try:
             logger.info(f"Sending command: {command_type} with params: {params}")
-            self.sock.sendall(json.dumps(command).encode('utf-8'))
-            response_data = self.receive_full_response(self.sock)
-            response = json.loads(response_data.decode('utf-8'))
+            response = self._exchange(encode_command(command_type, params))
             
-            if response.get("status") == "error":
-                error_message = response.get("error") or response.get("message", "Unknown Unity error")
+            error_message = response_error(response)
+            if error_message is not None:
                 logger.error(f"Unity error: {error_message}")
                 raise Exception(error_message)
             
-            return response.get("result", {})
+            result = response.get("result", {})
+            _notify_observers(command_type, params, result)
+            return result
+        except StaleConnectionError:
+            raise
         except Exception as e:
             logger.error(f"Communication error with Unity: {str(e)}")
-            self.sock = None
+            self.disconnect()
             raise Exception(f"Failed to communicate with Unity: {str(e)}")
 
-# Global Unity connection
-_unity_connection = None
+@dataclass
+class AsyncUnityConnection:
+    """Manages an asyncio stream connection to the Unity Editor.
 
-def get_unity_connection() -> UnityConnection:
-    """Retrieve or establish a persistent Unity connection."""
-    global _unity_connection
-    if _unity_connection is not None:
-        try:
-            # Try to ping with a short timeout to verify connection
-            result = _unity_connection.send_command("ping")
-            # If we get here, the connection is still valid
-            logger.debug("Reusing existing Unity connection")
-            return _unity_connection
+    Command semantics match UnityConnection, but waiting on Unity never blocks
+    the event loop, so async tools and the Ollama calls keep running meanwhile.
+    """
+    host: str = config.unity_host
+    port: int = config.unity_port
+    reader: Optional[asyncio.StreamReader] = None
+    writer: Optional[asyncio.StreamWriter] = None
+    framing: str = FRAMING_LEGACY  # Wire framing negotiated on connect
+    batch: bool = False  # Whether the bridge executes BATCH commands
+    # One request/reply exchange on the stream at a time
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    stats: Dict[str, int] = field(default_factory=lambda: {"reconnects": 0})
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self) -> bool:
+        """Establish a connection to the Unity Editor."""
+        if self.connected:
+            return True
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port),
+                timeout=config.connection_timeout
+            )
+            logger.info(f"Connected to Unity at {self.host}:{self.port} (async)")
         except Exception as e:
-            logger.warning(f"Existing connection failed: {str(e)}")
+            logger.error(f"Failed to connect to Unity: {str(e)}")
+            self.reader = self.writer = None
+            return False
+
+        self.framing = FRAMING_LEGACY
+        self.batch = False
+        if config.unity_framing == "auto":
+            await self._negotiate_framing()
+        return self.connected
+
+    async def _negotiate_framing(self):
+        """Offer length-prefixed framing to the bridge, falling back to legacy mode."""
+        try:
+            self.writer.write(build_handshake())
+            await self.writer.drain()
+            data = await asyncio.wait_for(self._receive_legacy(), timeout=config.connection_timeout)
+            negotiated = parse_handshake_response(data)
+            self.framing = negotiated["framing"]
+            self.batch = negotiated["batch"]
+            logger.info(f"Negotiated {self.framing} framing with Unity")
+        except Exception as e:
+            # Some bridges drop the socket on unknown commands; reconnect without a handshake
+            logger.warning(f"Framing handshake failed, using legacy framing: {str(e)}")
+            await self.disconnect()
             try:
-                _unity_connection.disconnect()
-            except:
-                pass
-            _unity_connection = None
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port),
+                    timeout=config.connection_timeout
+                )
+            except Exception as e:
+                logger.error(f"Failed to reconnect to Unity: {str(e)}")
+                self.reader = self.writer = None
+            self.framing = FRAMING_LEGACY
+            self.batch = False
+
+    async def disconnect(self):
+        """Close the connection to the Unity Editor."""
+        if self.writer:
+            try:
+                self.writer.close()
+                await self.writer.wait_closed()
+            except Exception as e:
+                logger.error(f"Error disconnecting from Unity: {str(e)}")
+            finally:
+                self.reader = self.writer = None
+
+    async def _receive_legacy(self) -> bytes:
+        """Read chunks until they form a complete JSON document."""
+        decoder = IncrementalJsonDecoder()
+        while True:
+            chunk = await self.reader.read(config.buffer_size)
+            if not chunk:
+                if decoder.length == 0:
+                    raise StaleConnectionError("Connection closed before receiving data")
+                raise ConnectionError(f"Connection closed after {decoder.length} bytes of an incomplete response")
+            if decoder.feed(chunk):
+                return decoder.message()
+
+    async def _receive_frame(self) -> bytes:
+        """Read one length-prefixed message."""
+        try:
+            header = await self.reader.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                raise StaleConnectionError("Connection closed before receiving data")
+            raise ConnectionError(f"Connection closed after {len(e.partial)} of {FRAME_HEADER.size} bytes")
+        return await self.reader.readexactly(decode_frame_header(header))
+
+    async def _exchange(self, payload: bytes) -> Dict[str, Any]:
+        """Send one message and wait for its reply."""
+        async with self._lock:
+            try:
+                if self.framing == FRAMING_LENGTH_PREFIX:
+                    self.writer.write(encode_frame(payload))
+                else:
+                    self.writer.write(payload)
+                await self.writer.drain()
+            except OSError as e:
+                raise StaleConnectionError(f"Send failed: {str(e)}")
+
+            receive = self._receive_frame() if self.framing == FRAMING_LENGTH_PREFIX else self._receive_legacy()
+            try:
+                data = await asyncio.wait_for(receive, timeout=config.connection_timeout)
+            except asyncio.TimeoutError:
+                raise Exception("Timeout receiving Unity response")
+            except ConnectionResetError as e:
+                # Reset before the reply started: the editor dropped the socket (e.g. a domain reload)
+                raise StaleConnectionError(str(e))
+            logger.info(f"Received complete response ({len(data)} bytes)")
+            return json.loads(data.decode('utf-8'))
+
+    async def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a command to Unity and return its response.
+
+        Like UnityConnection.send_command, a stream that turns out to be dead
+        before Unity could have seen the command is re-established once and the
+        command retried.
+        """
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Unity")
+        try:
+            return await self._send_command_once(command_type, params)
+        except StaleConnectionError as e:
+            logger.warning(f"Unity connection went stale ({str(e)}), reconnecting")
+            await self.disconnect()
+            self.stats["reconnects"] += 1
+            if not await self.connect():
+                raise ConnectionError("Could not reconnect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
+            return await self._send_command_once(command_type, params)
+
+    async def _send_command_once(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Send a command over the current stream without retrying."""
+        # Special handling for ping command
+        if command_type == "ping":
+            try:
+                logger.debug("Sending ping to verify connection")
+                response = await self._exchange(PING_PAYLOAD)
+                if response.get("status") != "success":
+                    raise ConnectionError("Ping response was not successful")
+                return {"message": "pong"}
+            except StaleConnectionError:
+                raise
+            except Exception as e:
+                logger.error(f"Ping error: {str(e)}")
+                await self.disconnect()
+                raise ConnectionError(f"Connection verification failed: {str(e)}")
+
+        # Normal command handling
+        try:
+            logger.info(f"Sending command: {command_type} with params: {params}")
+            response = await self._exchange(encode_command(command_type, params))
+
+            error_message = response_error(response)
+            if error_message is not None:
+                logger.error(f"Unity error: {error_message}")
+                raise Exception(error_message)
+
+            result = response.get("result", {})
+            _notify_observers(command_type, params, result)
+            return result
+        except StaleConnectionError:
+            raise
+        except Exception as e:
+            logger.error(f"Communication error with Unity: {str(e)}")
+            await self.disconnect()
+            raise Exception(f"Failed to communicate with Unity: {str(e)}")
+
+    async def send_batch(self, commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run an ordered list of commands; see UnityConnection.send_batch."""
+        commands = normalize_batch_commands(commands)
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Unity")
+
+        results = []
+        for chunk in batch_chunks(commands, config.batch_max_commands):
+            if self.batch:
+                try:
+                    response = await self.send_command(BATCH_COMMAND, {"commands": chunk})
+                    results.extend(batch_reply_items(response, chunk))
+                    continue
+                except Exception as e:
+                    if not is_unsupported_error(e):
+                        logger.error(f"Batch failed after {len(results)} of {len(commands)} commands: {str(e)}")
+                        results.extend(batch_item_error(e) for _ in chunk)
+                        break
+                    # Advertised but not implemented; nothing in the chunk ran
+                    logger.warning(f"Unity did not run BATCH ({str(e)}), sending the commands one by one")
+                    self.batch = False
+
+            for command in chunk:
+                try:
+                    result = await self.send_command(command["type"], command["params"])
+                    results.append({"status": "success", "result": result})
+                except Exception as e:
+                    results.append(batch_item_error(e))
+        results.extend(batch_item_skipped("an earlier part of the batch failed") for _ in commands[len(results):])
+        return results
+
+# Global Unity connection
+_unity_connection: Optional[UnityConnection] = None
+_async_unity_connection: Optional[AsyncUnityConnection] = None
+
+# Background liveness tracking for the global connection
+_heartbeat_thread: Optional[threading.Thread] = None
+_connection_healthy: bool = False
+_last_heartbeat: Optional[float] = None
+
+def _heartbeat_loop():
+    """Ping the global connection while it sits idle and record whether it answered.
+
+    A failed heartbeat only drops the socket; reconnecting is left to the next
+    caller so an editor that is closed does not get hammered with connects.
+    """
+    global _connection_healthy, _last_heartbeat
+    while config.heartbeat_interval > 0:
+        time.sleep(config.heartbeat_interval)
+        connection = _unity_connection
+        if connection is None or connection.sock is None:
+            _connection_healthy = False
+            continue
+
+        # Any recent traffic already proves the connection is alive
+        if time.monotonic() - connection.last_activity < config.heartbeat_interval:
+            _connection_healthy = True
+            continue
+
+        # Ping over the current socket only; send_command would reconnect on a stale one
+        try:
+            connection._send_command_once("ping")
+            connection.stats["heartbeat_pings"] += 1
+            _connection_healthy = True
+        except Exception as e:
+            connection.stats["heartbeat_failures"] += 1
+            _connection_healthy = False
+            logger.warning(f"Unity heartbeat failed: {str(e)}")
+            connection.disconnect()
+        _last_heartbeat = time.time()
+
+def _ensure_heartbeat():
+    """Start the heartbeat thread once, unless it is disabled."""
+    global _heartbeat_thread
+    if config.heartbeat_interval <= 0 or (_heartbeat_thread is not None and _heartbeat_thread.is_alive()):
+        return
+    _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="UnityMCP-heartbeat", daemon=True)
+    _heartbeat_thread.start()
+
+def get_unity_connection() -> UnityConnection:
+    """Retrieve or establish a persistent Unity connection.
+
+    An established connection is returned immediately; its liveness is tracked
+    by the background heartbeat, and a socket that died in the meantime is
+    replaced by send_command on first use.
+    """
+    global _unity_connection, _connection_healthy
+    if _unity_connection is not None and _unity_connection.sock is not None:
+        _unity_connection.stats["pings_saved"] += 1
+        logger.debug("Reusing existing Unity connection")
+        return _unity_connection
     
-    # Create a new connection
-    logger.info("Creating new Unity connection")
-    _unity_connection = UnityConnection()
+    # Create a new connection, or reconnect the existing one in place
+    if _unity_connection is None:
+        logger.info("Creating new Unity connection")
+        _unity_connection = UnityConnection()
+    else:
+        logger.info("Reconnecting to Unity")
+        _unity_connection.stats["reconnects"] += 1
     if not _unity_connection.connect():
-        _unity_connection = None
+        _connection_healthy = False
         raise ConnectionError("Could not connect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
     
     try:
         # Verify the new connection works
         _unity_connection.send_command("ping")
         logger.info("Successfully established new Unity connection")
-        return _unity_connection
     except Exception as e:
         logger.error(f"Could not verify new connection: {str(e)}")
-        try:
-            _unity_connection.disconnect()
-        except:
-            pass
-        _unity_connection = None
-        raise ConnectionError(f"Could not establish valid Unity connection: {str(e)}") 
\ No newline at end of file
+        _unity_connection.disconnect()
+        _connection_healthy = False
+        raise ConnectionError(f"Could not establish valid Unity connection: {str(e)}")
+
+    _connection_healthy = True
+    _ensure_heartbeat()
+    return _unity_connection
+
+def get_connection_stats() -> Dict[str, Any]:
+    """Report the global connection's health and heartbeat counters."""
+    connection = _unity_connection
+    stats = dict(connection.stats) if connection is not None else {}
+    return {
+        "connected": connection is not None and connection.sock is not None,
+        "healthy": _connection_healthy,
+        "framing": connection.framing if connection is not None else None,
+        "multiplexed": connection.multiplexed if connection is not None else False,
+        "heartbeat_interval": config.heartbeat_interval,
+        "last_heartbeat": _last_heartbeat,
+        **stats
+    }
+
+async def get_async_unity_connection() -> AsyncUnityConnection:
+    """Retrieve or establish the persistent asyncio Unity connection.
+
+    Like get_unity_connection, an open connection is reused without a ping;
+    AsyncUnityConnection.send_command reconnects if the stream has closed.
+    """
+    global _async_unity_connection
+    if _async_unity_connection is not None and _async_unity_connection.connected:
+        logger.debug("Reusing existing async Unity connection")
+        return _async_unity_connection
+
+    # Create a new connection
+    logger.info("Creating new async Unity connection")
+    connection = AsyncUnityConnection()
+    if not await connection.connect():
+        raise ConnectionError("Could not connect to Unity. Ensure the Unity Editor and MCP Bridge are running.")
+
+    try:
+        await connection.send_command("ping")
+    except Exception as e:
+        logger.error(f"Could not verify new async connection: {str(e)}")
+        await connection.disconnect()
+        raise ConnectionError(f"Could not establish valid Unity connection: {str(e)}")
+
+    logger.info("Successfully established new async Unity connection")
+    _async_unity_connection = connection
+    return _async_unity_connection
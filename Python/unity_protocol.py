@@ -0,0 +1,423 @@
+"""
+Wire protocol helpers for the Unity bridge connection.
+
+The bridge historically speaks "legacy" framing: each message is a bare JSON
+document (or the literal ``ping``) and the reader has to work out where it ends.
+Bridges that understand the ``HANDSHAKE`` command can switch the connection to
+length-prefixed framing, where every message is preceded by a 4-byte big-endian
+payload length. On a framed connection the bridge can also agree to multiplexing:
+every command envelope then carries an ``id`` that the bridge echoes in its
+reply, so several commands can be in flight and replies may arrive out of order.
+Bridges may also accept ``BATCH`` commands, which carry an ordered list of
+commands and answer with one result envelope per item.
+Listing replies can be consumed as a stream: ``JsonItemStream`` picks the
+items of one array out of a response while its bytes are still arriving.
+This module holds the socket-independent parts of these modes so that the sync
+and async clients share them.
+"""
+
+import codecs
+import json
+import re
+import struct
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+
+# Framing modes
+FRAMING_LEGACY = "legacy"
+FRAMING_LENGTH_PREFIX = "length-prefix"
+
+# 4-byte unsigned big-endian payload length
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 256 * 1024 * 1024  # Refuse anything above 256 MB
+
+# Handshake command sent right after connecting
+HANDSHAKE_COMMAND = "HANDSHAKE"
+PROTOCOL_VERSION = 1
+
+# Command carrying an ordered list of commands
+BATCH_COMMAND = "BATCH"
+
+# How bridges phrase an error for a command they do not implement
+_UNSUPPORTED_ERROR = re.compile(r"unknown command|not implemented|unimplemented|not supported|unsupported", re.I)
+
+# Raw ping payload and the bridge's reply
+PING_PAYLOAD = b"ping"
+PONG_RESPONSE = {"status": "success", "result": {"message": "pong"}}
+
+class FramingError(Exception):
+    """Raised when a framed message is malformed or too large."""
+
+# Scanner patterns for IncrementalJsonDecoder. Multi-byte UTF-8 sequences never
+# contain ASCII bytes, so scanning the raw bytes is safe.
+_STRUCTURAL = re.compile(rb'["{}\[\]]')
+_STRING_TAIL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRING_PARTIAL = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_OPENERS = frozenset(b'{[')
+
+class IncrementalJsonDecoder:
+    """Finds the end of an unframed JSON response as its bytes arrive.
+
+    Data is received directly into a growable buffer (``write_view`` +
+    ``commit``, or ``feed`` for stream readers) and only the newly arrived bytes
+    are scanned. Nesting depth and string/escape state carry over between
+    chunks, so each byte is looked at once and the end of the top-level value is
+    known without trial parses.
+
+    Most chunks are handled in bulk: complete strings are stripped and brackets
+    counted in C. Only a chunk in which the depth could return to zero is walked
+    token by token to find the exact end. This assumes one response per read,
+    as the unframed protocol is strictly request/reply.
+    """
+
+    def __init__(self, initial_size: int = 65536):
+        self.buffer = bytearray(initial_size)
+        self.length = 0  # Bytes of the buffer holding received data
+        self._scanned = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escaped = False
+        self._end = -1
+
+    @property
+    def complete(self) -> bool:
+        return self._end >= 0
+
+    def write_view(self, size: int) -> memoryview:
+        """Return a writable view of at least ``size`` free bytes, growing the buffer if needed."""
+        free = len(self.buffer) - self.length
+        if free < size:
+            self.buffer.extend(bytes(max(len(self.buffer), size - free)))
+        return memoryview(self.buffer)[self.length:]
+
+    def commit(self, count: int) -> bool:
+        """Account for ``count`` bytes written into the view; return True once the value is complete."""
+        self.length += count
+        if self.length > MAX_FRAME_SIZE:
+            raise FramingError(f"Response exceeds the {MAX_FRAME_SIZE} byte limit")
+        return self._scan()
+
+    def feed(self, data: bytes) -> bool:
+        """Copy a received chunk into the buffer; return True once the value is complete."""
+        self.write_view(len(data))[:len(data)] = data
+        return self.commit(len(data))
+
+    def message(self) -> bytes:
+        """Return the complete JSON value."""
+        if self._end < 0:
+            raise FramingError("Response is not complete yet")
+        return bytes(memoryview(self.buffer)[:self._end])
+
+    def _skip_bulk(self, pos: int, end: int) -> bool:
+        """Consume ``buf[pos:end]`` in one go if the value cannot end inside it."""
+        region = self.buffer[pos:end]
+        stripped = _STRING.sub(b'', region)
+        # Whatever quote survives the strip opens a string that runs past the data
+        open_quote = stripped.find(b'"')
+        closed = stripped if open_quote < 0 else stripped[:open_quote]
+        depth = (self._depth + closed.count(b'{') + closed.count(b'[')
+                 - closed.count(b'}') - closed.count(b']'))
+        if depth <= 0:
+            return False
+
+        self._depth = depth
+        if open_quote >= 0:
+            self._in_string = True
+            trailing_backslashes = len(region) - len(region.rstrip(b'\\'))
+            self._escaped = trailing_backslashes % 2 == 1
+        return True
+
+    def _scan(self) -> bool:
+        if self._end >= 0:
+            return True
+        buf, pos, end = self.buffer, self._scanned, self.length
+        bulk = True
+        while pos < end:
+            if self._escaped:
+                # The byte after a backslash that ended the previous chunk
+                self._escaped = False
+                pos += 1
+                continue
+
+            if self._in_string:
+                match = _STRING_TAIL.match(buf, pos, end)
+                if match is None:
+                    # The string runs past the received data; remember a dangling backslash
+                    partial_end = _STRING_PARTIAL.match(buf, pos, end).end()
+                    self._escaped = partial_end < end
+                    pos = end
+                    break
+                self._in_string = False
+                pos = match.end()
+                continue
+
+            if bulk and self._started:
+                if self._skip_bulk(pos, end):
+                    pos = end
+                    break
+                # The value may close in this chunk; walk it token by token
+                bulk = False
+
+            match = _STRUCTURAL.search(buf, pos, end)
+            if match is None:
+                pos = end
+                break
+            pos = match.start()
+            byte = buf[pos]
+            pos += 1
+            if byte == 0x22:  # '"'
+                self._in_string = True
+            elif byte in _OPENERS:
+                self._depth += 1
+                self._started = True
+            else:
+                self._depth -= 1
+                if self._depth < 0:
+                    raise FramingError("Unbalanced closing bracket in response")
+                if self._depth == 0:
+                    self._scanned = self._end = pos
+                    return True
+        self._scanned = pos
+        return False
+
+# Tokens that matter for locating an array inside a JSON document
+_PATH_TOKEN = re.compile(r'["{}\[\],]')
+_JSON_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+class JsonItemStream:
+    """Yields the items of one array in a JSON response as its bytes arrive.
+
+    ``feed`` takes raw chunks of the response and returns the items completed
+    by them, so a long listing can be processed with only one item in memory
+    at a time. The array is found by its key path (``("result", "assets")``
+    for ``{"status": ..., "result": {"assets": [...]}}``). Everything else in
+    the document is kept and parsed by ``finish`` into the envelope, with the
+    streamed array left empty. ``complete`` reports when the top-level value
+    has ended, for unframed connections.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0
+        self._stack: List[list] = []  # [opener, current key, expecting a key] per open container
+        self._state = "prefix"  # "prefix", "items" (inside the array), "suffix" or "done"
+        self._prefix = ""  # Document text up to and including the array's "["
+        self._item_count = 0
+
+    @property
+    def complete(self) -> bool:
+        return self._state == "done"
+
+    @property
+    def item_count(self) -> int:
+        return self._item_count
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Add a chunk of the response; return the array items it completed."""
+        if self._state == "done":
+            if data.strip():
+                raise FramingError("Data after the end of the response")
+            return []
+        self._text += self._utf8.decode(data)
+        items: List[Any] = []
+        while True:
+            if self._state == "items":
+                if not self._read_items(items):
+                    break
+            elif self._state == "done" or not self._scan_tokens():
+                break
+        if self._state == "items":
+            # Only the unfinished item has to be kept
+            self._text = self._text[self._pos:]
+            self._pos = 0
+        return items
+
+    def _scan_tokens(self) -> bool:
+        """Walk the structure outside the array; return True on entering it or finishing."""
+        text = self._text
+        while True:
+            match = _PATH_TOKEN.search(text, self._pos)
+            if match is None:
+                self._pos = len(text)
+                return False
+            char, pos = match.group(), match.start()
+            top = self._stack[-1] if self._stack else None
+            if char == '"':
+                string = _JSON_STRING.match(text, pos)
+                if string is None:
+                    # The string continues in the next chunk
+                    self._pos = pos
+                    return False
+                if top is not None and top[0] == "{" and top[2]:
+                    top[1], top[2] = json.loads(string.group()), False
+                self._pos = string.end()
+                continue
+            self._pos = pos + 1
+            if char == ",":
+                if top is not None and top[0] == "{":
+                    top[2] = True
+            elif char == "{":
+                self._stack.append(["{", None, True])
+            elif char == "[":
+                in_path = self._state == "prefix" and all(entry[0] == "{" for entry in self._stack)
+                self._stack.append(["[", None, False])
+                if in_path and tuple(entry[1] for entry in self._stack[:-1]) == self.path:
+                    self._prefix = text[:self._pos]
+                    self._state = "items"
+                    return True
+            else:
+                if not self._stack:
+                    raise FramingError("Unbalanced closing bracket in response")
+                self._stack.pop()
+                if not self._stack:
+                    self._state = "done"
+                    return True
+
+    def _read_items(self, items: List[Any]) -> bool:
+        """Decode complete items; return True once the array has closed."""
+        text, decoder = self._text, _JSON_DECODER
+        while True:
+            pos = _WHITESPACE.match(text, self._pos).end()
+            if pos >= len(text):
+                self._pos = pos
+                return False
+            if text[pos] == "]":
+                self._stack.pop()
+                # Keep the closing bracket and what follows for the envelope
+                self._text, self._pos = text[pos:], 1
+                if not self._stack:
+                    self._state = "done"
+                    return True
+                self._state = "suffix"
+                return True
+            if text[pos] == ",":
+                self._pos = pos + 1
+                continue
+            try:
+                item, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                self._pos = pos
+                return False
+            if end >= len(text):
+                # A number at the very end of the data may still be growing
+                self._pos = pos
+                return False
+            items.append(item)
+            self._item_count += 1
+            self._pos = end
+
+    def finish(self) -> Dict[str, Any]:
+        """Parse the rest of the document into the response envelope."""
+        if self._state != "done":
+            raise FramingError("Response ended before the JSON value was complete")
+        if self._prefix:
+            return json.loads(self._prefix + self._text)
+        return json.loads(self._text)
+
+_JSON_DECODER = json.JSONDecoder()
+
+def encode_frame(payload: bytes) -> bytes:
+    """Prefix a payload with its length header."""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FramingError(f"Frame of {len(payload)} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+def decode_frame_header(header: bytes) -> int:
+    """Return the payload length announced by a frame header."""
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise FramingError(f"Announced frame of {length} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    return length
+
+def encode_command(command_type: str, params: Dict[str, Any] = None, request_id: Any = None) -> bytes:
+    """Serialize a command envelope to UTF-8 JSON, tagging it with a request ID if given."""
+    command = {"type": command_type, "params": params or {}}
+    if request_id is not None:
+        command["id"] = request_id
+    return json.dumps(command).encode('utf-8')
+
+def response_error(response: Dict[str, Any]) -> Optional[str]:
+    """The error message of a reply reporting a failed command, or None if the command succeeded."""
+    if response.get("status") == "error":
+        return response.get("error") or response.get("message", "Unknown Unity error")
+    return None
+
+def build_handshake(multiplex: bool = False) -> bytes:
+    """Build the handshake command offering the protocol features this client supports."""
+    return encode_command(HANDSHAKE_COMMAND, {
+        "protocol_version": PROTOCOL_VERSION,
+        "framing": [FRAMING_LENGTH_PREFIX],
+        "multiplex": multiplex,
+        "batch": True
+    })
+
+def normalize_batch_commands(commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate batch items and coerce them to ``{"type": ..., "params": ...}``."""
+    normalized = []
+    for index, command in enumerate(commands):
+        if not isinstance(command, dict) or not command.get("type"):
+            raise ValueError(f"Batch item {index} must be a dict with a non-empty 'type'")
+        normalized.append({"type": command["type"], "params": command.get("params") or {}})
+    return normalized
+
+def batch_chunks(commands: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Split a batch into the chunks that are sent as one ``BATCH`` command each."""
+    size = max(1, size)
+    for start in range(0, len(commands), size):
+        yield commands[start:start + size]
+
+def batch_reply_items(result: Any, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The per-item envelopes of a ``BATCH`` reply, checked against the chunk that was sent."""
+    items = result.get("results", []) if isinstance(result, dict) else []
+    if len(items) != len(chunk):
+        raise Exception(f"Unity returned {len(items)} results for a batch of {len(chunk)} commands")
+    return items
+
+def batch_item_error(error: Any) -> Dict[str, Any]:
+    """Result envelope for a batch item that failed."""
+    return {"status": "error", "error": str(error)}
+
+def batch_item_skipped(reason: Any) -> Dict[str, Any]:
+    """Result envelope for a batch item that was never sent because an earlier part of the batch failed."""
+    return {"status": "error", "error": f"Not run: {reason}", "skipped": True}
+
+def is_unsupported_error(error: Any) -> bool:
+    """Whether an error says the bridge does not implement the command, as opposed to a failed attempt."""
+    return _UNSUPPORTED_ERROR.search(str(error)) is not None
+
+def parse_handshake_response(data: bytes) -> Dict[str, Any]:
+    """Work out what the bridge agreed to from its handshake reply.
+
+    Bridges without handshake support answer with an error (or a generic
+    "not implemented" result), which maps to legacy framing.
+
+    Returns:
+        Dict with the negotiated ``framing`` mode, whether ``multiplex`` and
+        ``batch`` were accepted, and the raw ``result``
+    """
+    legacy = {"framing": FRAMING_LEGACY, "multiplex": False, "batch": False, "result": {}}
+    try:
+        response = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return legacy
+
+    if not isinstance(response, dict) or response.get("status") != "success":
+        return legacy
+    result = response.get("result")
+    if not isinstance(result, dict):
+        return legacy
+
+    framing = result.get("framing")
+    if framing != FRAMING_LENGTH_PREFIX:
+        return legacy
+    # Request IDs only work when replies are delimited by frames
+    return {
+        "framing": framing,
+        "multiplex": bool(result.get("multiplex")),
+        "batch": bool(result.get("batch")),
+        "result": result
+    }